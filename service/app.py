@@ -1,12 +1,41 @@
+import time
+
+# Measured before any other import so import cost is part of the startup time
+_process_started = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from config import settings
 from routers import chatbot, legal, market_research, bill_parser, fund_management
+from services import registry
+from services.llm_gateway import get_llm_gateway
+from utils.metrics import REGISTRY, MetricsMiddleware
+from utils.tracing import TracingMiddleware, build_exporter
 import uvicorn
 
+logger = logging.getLogger(__name__)
+
+startup_timings = {"import_seconds": round(time.perf_counter() - _process_started, 4)}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await registry.startup()
+    startup_timings["startup_seconds"] = round(time.perf_counter() - _process_started, 4)
+    logger.info(
+        f"Worker accepting requests {startup_timings['startup_seconds']}s after start "
+        f"(imports took {startup_timings['import_seconds']}s)"
+    )
+    yield
+    await registry.shutdown()
+
 app = FastAPI(
     title="FoundX GenAI Service",
     description="AI-powered startup assistance platform with document generation",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -17,6 +46,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.tracing_enabled:
+    app.add_middleware(
+        TracingMiddleware,
+        exporter=build_exporter(
+            settings.tracing_exporter, settings.tracing_export_path, settings.tracing_otlp_endpoint
+        ),
+        sample_rate=settings.tracing_sample_rate,
+        debug_header=settings.tracing_debug_header
+    )
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(chatbot.router, prefix="/api/v1")
 app.include_router(legal.router, prefix="/api/v1/legal")
 app.include_router(market_research.router, prefix="/api/v1")
@@ -29,7 +71,7 @@ def root():
         "message": "FoundX GenAI Service v2.0 - Restructured with proper separation of concerns",
         "version": "2.0.0",        
         "services": {
-            "chatbot": "/api/v1/ask, /api/v1/explain, /api/v1/generate-content",
+            "chatbot": "/api/v1/ask, /api/v1/ask/stream, /api/v1/explain, /api/v1/explain/stream, /api/v1/generate-content",
             "legal": "/api/v1/legal/create-nda, /api/v1/legal/create-cda, /api/v1/legal/create-employment-agreement, /api/v1/legal/create-founder-agreement",
             "market_research": "/api/v1/market-research/comprehensive, /api/v1/market-research/competitor-analysis, /api/v1/market-research/trend-analysis",
             "bill_parser": "/api/v1/bill-parser/parse-from-images, /api/v1/bill-parser/parse-from-files, /api/v1/bill-parser/validate-bill"
@@ -37,8 +79,26 @@ def root():
     }
 
 @app.get("/health")
+@app.get("/health/live")
 def health_check():
     return {"status": "healthy", "version": "2.0.0"}
 
+@app.get("/health/ready")
+def readiness_check():
+    """Readiness probe: 503 until the background service warm-up has finished"""
+    status = registry.readiness()
+    status["startup"] = startup_timings
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/health/llm")
+def llm_gateway_stats():
+    """Gemini gateway queue depth, in-flight calls and per-endpoint wait times"""
+    return get_llm_gateway().stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Request, stage latency, cache, token and error metrics in Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=4000)
\ No newline at end of file
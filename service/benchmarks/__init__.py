@@ -0,0 +1,8 @@
+"""
+Benchmark harness for the service.
+
+``run_endpoints`` drives every router in-process under the fake LLM and Serper
+backends; ``run_micro`` times the hot helpers in isolation. Both print JSON reports
+suitable for regression tracking. Run them from the ``service`` directory, e.g.
+``python -m benchmarks.run_endpoints --concurrency 1,16``.
+"""
@@ -0,0 +1,148 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import atexit
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+
+def use_fake_backends(llm_latency_ms: Optional[float] = None, search_latency_ms: Optional[float] = None) -> None:
+    """
+    Select the offline LLM and Serper backends.
+
+    Must run before ``config`` is imported, since settings are read once at import time.
+    Explicit latencies override the environment; otherwise the configured defaults apply.
+    """
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["SEARCH_BACKEND"] = "fake"
+    if llm_latency_ms is not None:
+        os.environ["FAKE_LLM_LATENCY_MS"] = str(llm_latency_ms)
+    if search_latency_ms is not None:
+        os.environ["FAKE_SEARCH_LATENCY_MS"] = str(search_latency_ms)
+
+
+CORPUS_TOPICS = {
+    "fundraising": ["seed round", "pre-money valuation", "SAFE note", "convertible note", "term sheet",
+                    "lead investor", "pro rata rights", "dilution", "cap table", "due diligence"],
+    "legal": ["non-disclosure agreement", "founder vesting", "one-year cliff", "IP assignment",
+              "liquidation preference", "board seat", "Delaware C-corp", "employment contract"],
+    "finance": ["burn rate", "runway", "gross margin", "unit economics", "CAC payback", "MRR growth",
+                "operating budget", "cash flow forecast", "churn"],
+    "growth": ["product-market fit", "customer discovery", "pricing page", "sales pipeline",
+               "content marketing", "referral loop", "activation rate", "retention cohort"],
+    "team": ["first hire", "equity split", "option pool", "hiring plan", "remote culture",
+             "performance review", "advisor agreement"],
+}
+
+SENTENCE_TEMPLATES = [
+    "Early-stage founders should review their {0} alongside the {1} before each board meeting.",
+    "A common mistake is negotiating the {0} without understanding how it affects the {1}.",
+    "Investors usually ask about the {0} first, then dig into the {1} during diligence.",
+    "Keep the {0} simple until the {1} shows a clear trend over at least two quarters.",
+    "The {0} and the {1} together determine how much leverage the company has.",
+    "Document the {0} in writing and revisit it whenever the {1} changes materially.",
+]
+
+
+def use_synthetic_knowledge_base(documents: int = 40, paragraphs: int = 24, seed: int = 0) -> str:
+    """
+    Point the knowledge base at a deterministic synthetic corpus of ``.txt`` files.
+
+    Results then don't depend on what happens to be deployed in ``knowledge_base/``.
+    Like ``use_fake_backends`` it must run before ``config`` is imported; the directory
+    is removed when the process exits.
+    """
+    directory = tempfile.mkdtemp(prefix="benchmark_kb_")
+    atexit.register(shutil.rmtree, directory, True)
+    rng = random.Random(seed)
+    topics = list(CORPUS_TOPICS)
+
+    for index in range(documents):
+        topic = topics[index % len(topics)]
+        lines = [f"{topic.title()} guide {index + 1}", ""]
+        for _ in range(paragraphs):
+            terms = CORPUS_TOPICS[topic] + CORPUS_TOPICS[rng.choice(topics)]
+            sentences = [rng.choice(SENTENCE_TEMPLATES).format(*rng.sample(terms, 2)) for _ in range(rng.randint(3, 6))]
+            lines.extend([" ".join(sentences), ""])
+        with open(os.path.join(directory, f"{topic}_{index + 1:03d}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+    os.environ["KNOWLEDGE_BASE_PATH"] = directory
+    return directory
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize_latencies(samples: List[float], scale: float = 1000.0) -> Dict[str, float]:
+    """Mean and tail latencies of ``samples`` (seconds), scaled to milliseconds by default"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(ordered) / len(ordered) * scale, 3),
+        "p50": round(percentile(ordered, 0.50) * scale, 3),
+        "p95": round(percentile(ordered, 0.95) * scale, 3),
+        "p99": round(percentile(ordered, 0.99) * scale, 3),
+        "max": round(ordered[-1] * scale, 3)
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+def environment_info() -> Dict[str, Any]:
+    """Where and on what the benchmark ran, so reports can be compared across runs"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def write_report(report: Dict[str, Any], output_path: Optional[str] = None) -> None:
+    """Print the report as JSON, and also save it when ``output_path`` is given"""
+    payload = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    print(payload)
+
+
+def use_temporary_output_dir() -> str:
+    """
+    Send generated legal PDFs to a temporary directory removed when the process exits.
+
+    Keeps benchmark runs out of the service's real ``generated_docs`` folder. Like
+    ``use_fake_backends`` it must run before ``config`` is imported.
+    """
+    directory = tempfile.mkdtemp(prefix="benchmark_docs_")
+    atexit.register(shutil.rmtree, directory, True)
+    os.environ["LEGAL_OUTPUT_DIR"] = directory
+    return directory
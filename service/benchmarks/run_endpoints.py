@@ -0,0 +1,158 @@
+"""
+End-to-end load benchmark for every router under the fake LLM and Serper backends.
+
+Requests go through the full ASGI stack in-process (routing, validation, dependencies,
+services, serialization) without sockets, so the numbers reflect this service's own
+overhead plus the simulated upstream latency. For each scenario and concurrency level
+it reports requests/sec, latency percentiles, CPU time per request and peak RSS.
+
+CPU time is process-wide and so includes the in-process client and worker threads
+(e.g. PDF rendering); peak RSS is the high-water mark of the whole run so far.
+
+Usage (from the ``service`` directory):
+
+    python -m benchmarks.run_endpoints --concurrency 1,8,32 --requests 100 --output bench.json
+    python -m benchmarks.run_endpoints --scenarios legal ask --llm-latency-ms 0
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+from benchmarks.common import (
+    environment_info, peak_rss_mb, summarize_latencies, use_fake_backends, use_synthetic_knowledge_base,
+    use_temporary_output_dir, write_report
+)
+from benchmarks.scenarios import SCENARIOS, Scenario, select_scenarios
+
+
+async def _send(client, scenario: Scenario, sequence: int, unique: bool) -> int:
+    response = await client.request(scenario.method, scenario.path, **scenario.request_kwargs(sequence, unique))
+    return response.status_code
+
+
+async def run_scenario(client, scenario: Scenario, requests: int, concurrency: int,
+                       unique: bool, sequence: "itertools.count") -> Dict[str, Any]:
+    """Issue ``requests`` requests from ``concurrency`` concurrent workers and summarize them"""
+    latencies: List[float] = []
+    status_codes: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                status = await _send(client, scenario, next(sequence), unique)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            status_codes[str(status)] += 1
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    wall_seconds = time.perf_counter() - wall_started
+    cpu_seconds = time.process_time() - cpu_started
+
+    return {
+        "scenario": scenario.name,
+        "group": scenario.group,
+        "path": scenario.path,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": requests - status_codes.get("200", 0),
+        "status_codes": dict(status_codes),
+        "wall_seconds": round(wall_seconds, 4),
+        "requests_per_second": round(requests / wall_seconds, 2) if wall_seconds > 0 else None,
+        "latency_ms": summarize_latencies(latencies),
+        "cpu_ms_per_request": round(cpu_seconds / requests * 1000, 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # Imported here so the fake backends are selected before settings are read
+    import httpx
+    from app import app
+    from config import settings
+    from services import registry
+    from services.llm_gateway import get_llm_gateway
+
+    scenarios = select_scenarios(args.scenarios)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    sequence = itertools.count()
+
+    await registry.warm_up()
+    rss_after_warm_up = peak_rss_mb()
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=args.timeout) as client:
+            for scenario in scenarios:
+                for _ in range(args.warmup):
+                    await _send(client, scenario, next(sequence), args.unique)
+                for concurrency in levels:
+                    results.append(await run_scenario(client, scenario, args.requests, concurrency, args.unique, sequence))
+    finally:
+        await registry.shutdown()
+
+    return {
+        "benchmark": "endpoints",
+        "environment": environment_info(),
+        "config": {
+            "requests_per_level": args.requests,
+            "concurrency_levels": levels,
+            "warmup_requests": args.warmup,
+            "unique_payloads": args.unique,
+            "knowledge_base": "configured" if args.real_knowledge_base else f"synthetic ({args.kb_documents} documents)",
+            "fake_llm_latency_ms": settings.fake_llm_latency_ms,
+            "fake_search_latency_ms": settings.fake_search_latency_ms,
+            "fake_latency_distribution": settings.fake_latency_distribution,
+            "llm_max_in_flight": settings.llm_max_in_flight,
+            "response_cache_enabled": settings.response_cache_enabled,
+            "semantic_cache_enabled": settings.semantic_cache_enabled,
+            "serper_cache_enabled": settings.serper_cache_enabled
+        },
+        "peak_rss_mb_after_warm_up": rss_after_warm_up,
+        "results": results,
+        "llm_gateway": get_llm_gateway().stats()
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="*", default=None,
+                        help=f"Scenario or group names (default: all). Available: {', '.join(s.name for s in SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per scenario")
+    parser.add_argument("--repeat-payloads", dest="unique", action="store_false",
+                        help="Send identical requests so caches and coalescing are exercised")
+    parser.add_argument("--llm-latency-ms", type=float, default=None, help="Median fake model latency")
+    parser.add_argument("--search-latency-ms", type=float, default=None, help="Median fake Serper latency")
+    parser.add_argument("--kb-documents", type=int, default=40, help="Size of the synthetic knowledge base")
+    parser.add_argument("--real-knowledge-base", action="store_true",
+                        help="Use the configured knowledge base instead of the synthetic one")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request client timeout in seconds")
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Keep the service's INFO logging")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    use_fake_backends(args.llm_latency_ms, args.search_latency_ms)
+    use_temporary_output_dir()
+    if not args.real_knowledge_base:
+        use_synthetic_knowledge_base(args.kb_documents)
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    write_report(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Micro-benchmarks for the hot helpers behind the endpoints.
+
+Each helper is called repeatedly with representative inputs and timed per call, so the
+report shows the spread (p50/p95/p99) and not just the mean. Times are in microseconds.
+
+Usage (from the ``service`` directory):
+
+    python -m benchmarks.run_micro --output micro.json
+    python -m benchmarks.run_micro --only retrieve_relevant_context --iterations 5000
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.common import (
+    environment_info, peak_rss_mb, summarize_latencies, use_fake_backends, use_synthetic_knowledge_base, write_report
+)
+
+QUESTIONS = [
+    "How do I validate my startup idea before building?",
+    "What should a seed-stage SaaS company spend on marketing?",
+    "Explain vesting schedules and cliffs for co-founders in detail",
+    "Briefly, what is a SAFE note?",
+    "How do we calculate runway and burn rate?",
+    "What are the legal requirements for hiring our first employee?",
+    "How should we split equity between three founders?",
+    "What metrics do investors look for at series A?",
+]
+
+LEGAL_CONTENT = {
+    "document_title": "NON-DISCLOSURE AGREEMENT",
+    "document_date": "January 15, 2024",
+    **{
+        f"section_{i}": {
+            "title": f"{i}. Section Heading",
+            "content": "The Receiving Party shall hold Confidential Information in strict confidence "
+                       "and shall not disclose it to any third party. " * 6 + "\n\n" +
+                       "Obligations survive termination for the period set out above. " * 4,
+            "subsections": [
+                {"title": f"{i}.{j} Subsection", "content": "Each party remains responsible for its representatives. " * 3}
+                for j in range(1, 4)
+            ]
+        }
+        for i in range(1, 11)
+    }
+}
+
+EXPENSE_TOTALS = {
+    "Development": 42000.0, "Marketing": 18000.0, "Operations": 25000.0,
+    "Legal": 3000.0, "Equipment": 6000.0, "Office": 4500.0, "Uncategorized": 1200.0
+}
+
+
+def time_calls(call: Callable[[int], Any], iterations: int) -> Dict[str, Any]:
+    """Time ``iterations`` calls of ``call(i)`` individually"""
+    samples: List[float] = []
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    for i in range(iterations):
+        started = time.perf_counter()
+        call(i)
+        samples.append(time.perf_counter() - started)
+    wall_seconds = time.perf_counter() - wall_started
+    cpu_seconds = time.process_time() - cpu_started
+
+    return {
+        "iterations": iterations,
+        "calls_per_second": round(iterations / wall_seconds, 2) if wall_seconds > 0 else None,
+        "latency_us": summarize_latencies(samples, scale=1_000_000),
+        "cpu_us_per_call": round(cpu_seconds / iterations * 1_000_000, 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def build_benchmarks(output_dir: str) -> Dict[str, Any]:
+    """Map of benchmark name to ``(call, default_iterations)``"""
+    from routers.fund_management import _calculate_optimization_score
+    from services.bill_parser_service import BillItem, BillParserService, BillParseResponse
+    from services.chatbot_rag import ChatbotRAGService
+    from utils.legal_generator import LegalDocumentGenerator
+
+    rag_service = ChatbotRAGService()
+    contexts = [rag_service._retrieve_relevant_context(question) for question in QUESTIONS]
+    legal_generator = LegalDocumentGenerator()
+    bill_parser = BillParserService()
+    bills = [
+        BillParseResponse(
+            vendor_name="Synthetic Supplies Ltd", bill_number="INV-1042", bill_date="2024-01-15",
+            subtotal=100.0, tax_amount=18.0, discount=5.0, total_amount=113.0, currency="USD",
+            items=[BillItem(description="Paper", quantity=2, unit_price=50.0, total_price=100.0)]
+        ),
+        BillParseResponse(vendor_name=None, total_amount=None, bill_date="15/01/2024", subtotal=10.0),
+    ]
+
+    return {
+        "retrieve_relevant_context": (
+            lambda i: rag_service._retrieve_relevant_context(QUESTIONS[i % len(QUESTIONS)]), 2000
+        ),
+        "build_qa_prompt": (
+            lambda i: rag_service._build_qa_prompt(
+                QUESTIONS[i % len(QUESTIONS)], contexts[i % len(contexts)], "Pre-revenue marketplace", "tech"
+            ), 20000
+        ),
+        "create_formatted_document": (
+            lambda i: legal_generator._create_formatted_document(
+                LEGAL_CONTENT, os.path.join(output_dir, f"document_{i % 4}.pdf"), LEGAL_CONTENT["document_title"]
+            ), 50
+        ),
+        "validate_bill_data": (lambda i: bill_parser.validate_bill_data(bills[i % len(bills)]), 50000),
+        "calculate_optimization_score": (
+            lambda i: _calculate_optimization_score(EXPENSE_TOTALS, 99700.0 + i % 7), 100000
+        ),
+    }
+
+
+def run(only: Optional[List[str]], iterations: Optional[int], knowledge_base: str) -> Dict[str, Any]:
+    results = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        benchmarks = build_benchmarks(output_dir)
+        unknown = set(only or []) - set(benchmarks)
+        if unknown:
+            raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+        for name, (call, default_iterations) in benchmarks.items():
+            if only and name not in only:
+                continue
+            count = iterations or default_iterations
+            # One untimed pass to settle lazy imports and caches
+            for i in range(min(count, 10)):
+                call(i)
+            results[name] = time_calls(call, count)
+
+    return {
+        "benchmark": "micro",
+        "environment": environment_info(),
+        "knowledge_base": knowledge_base,
+        "results": results
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="*", default=None, help="Benchmark names to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=None, help="Override every benchmark's call count")
+    parser.add_argument("--kb-documents", type=int, default=40, help="Size of the synthetic knowledge base")
+    parser.add_argument("--real-knowledge-base", action="store_true",
+                        help="Use the configured knowledge base instead of the synthetic one")
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    # The services construct LLM clients; keep them offline
+    use_fake_backends()
+    knowledge_base = "configured"
+    if not args.real_knowledge_base:
+        use_synthetic_knowledge_base(args.kb_documents)
+        knowledge_base = f"synthetic ({args.kb_documents} documents)"
+    logging.disable(logging.INFO)
+    write_report(run(args.only, args.iterations, knowledge_base), args.output)
+
+
+if __name__ == "__main__":
+    main()
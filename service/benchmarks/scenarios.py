@@ -0,0 +1,192 @@
+"""
+Request scenarios for the endpoint benchmark.
+
+Each scenario builds the request for a given sequence number. With ``unique`` payloads
+the text fields carry the number, so response caches and in-flight coalescing are
+bypassed and every request reaches the (fake) model; otherwise every request is the
+same and the run measures the cached path.
+"""
+import base64
+from typing import Any, Callable, Dict, List, Optional
+
+# Bytes are never decoded by the fake backend; the bill parser only forwards them
+SAMPLE_IMAGE = b"\x89PNG\r\n\x1a\n" + b"\x00" * 256
+SAMPLE_IMAGE_B64 = base64.b64encode(SAMPLE_IMAGE).decode()
+
+
+class Scenario:
+    """One endpoint and how to build its requests"""
+
+    def __init__(self, name: str, group: str, path: str, build: Callable[[str], Dict[str, Any]],
+                 method: str = "POST", stream: bool = False):
+        self.name = name
+        self.group = group
+        self.path = path
+        self.build = build
+        self.method = method
+        self.stream = stream
+
+    def request_kwargs(self, sequence: int, unique: bool) -> Dict[str, Any]:
+        """httpx keyword arguments for the ``sequence``-th request"""
+        return self.build(f" #{sequence}" if unique else "")
+
+
+def _json(payload: Any) -> Dict[str, Any]:
+    return {"json": payload}
+
+
+def _parties(tag: str) -> Dict[str, Any]:
+    return {
+        "company_name": f"Acme Analytics{tag}",
+        "company_address": "1 Market Street, San Francisco, CA",
+        "other_party_name": "Jordan Lee",
+        "other_party_address": "22 Elm Road, Austin, TX",
+        "purpose": "Evaluating a potential partnership",
+        "duration": "2 years",
+        "effective_date": "2024-01-15"
+    }
+
+
+def _company(tag: str) -> Dict[str, Any]:
+    return {
+        "company_name": f"Acme Analytics{tag}",
+        "website": "https://acme.example.com",
+        "service_description": "Self-serve analytics for small online shops",
+        "contact_email": "legal@acme.example.com",
+        "jurisdiction": "Delaware"
+    }
+
+
+def _expenses() -> List[Dict[str, Any]]:
+    return [
+        {"description": "AWS hosting", "amount": 1800, "category": "Development"},
+        {"description": "Google Ads", "amount": 950, "category": "Marketing"},
+        {"description": "Payroll", "amount": 24000, "category": "Operations"},
+        {"description": "Incorporation fees", "amount": 400, "category": "Legal"},
+        {"description": "Laptops", "amount": 3200, "category": "Equipment"}
+    ]
+
+
+def _analysis_payload(tag: str) -> Dict[str, Any]:
+    return {
+        "query_type": "expense_analysis",
+        "data": {"monthly_burn": 32000, "runway_months": 14, "note": f"benchmark{tag}"},
+        "context": "Seed-stage B2B SaaS",
+        "analysis_level": "detailed"
+    }
+
+
+def _budget_payload(tag: str) -> Dict[str, Any]:
+    return {
+        "startup_stage": "seed", "monthly_revenue": 12000, "team_size": 6,
+        "industry": f"B2B SaaS{tag}", "funding_raised": 1500000, "burn_rate": 45000
+    }
+
+
+def _fundraising_payload(tag: str) -> Dict[str, Any]:
+    return {
+        "current_stage": "seed", "target_amount": 3000000, "industry": f"fintech{tag}",
+        "traction_metrics": {"mrr": 25000, "growth_rate": "15% MoM", "customers": 120},
+        "team_background": "Two ex-Stripe engineers and a former bank product lead",
+        "market_size": "$12B"
+    }
+
+
+def _health_payload(tag: str) -> Dict[str, Any]:
+    return {
+        "monthly_expenses": [{"month": "2024-01", "amount": 41000, "note": f"benchmark{tag}"}],
+        "revenue_data": [{"month": "2024-01", "amount": 12000}],
+        "funding_sources": [{"source": "Seed round", "amount": 1500000}],
+        "burn_rate": 29000, "runway_months": 16
+    }
+
+
+def _expense_payload(tag: str) -> List[Dict[str, Any]]:
+    expenses = _expenses()
+    expenses[0]["description"] += tag
+    return expenses
+
+
+def _files(tag: str) -> Dict[str, Any]:
+    return {
+        "files": [("files", (f"bill{tag.strip(' #')}.png", SAMPLE_IMAGE, "image/png"))],
+        "data": {"bill_type": "invoice", "extract_text_only": "false"}
+    }
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("ask", "chatbot", "/api/v1/ask", lambda tag: _json({
+        "question": f"How should we structure our seed round?{tag}",
+        "context": "Pre-revenue marketplace", "startup_type": "tech"
+    })),
+    Scenario("ask_stream", "chatbot", "/api/v1/ask/stream", lambda tag: _json({
+        "question": f"How do I price a B2B SaaS product?{tag}"
+    }), stream=True),
+    Scenario("explain", "chatbot", "/api/v1/explain", lambda tag: _json({
+        "clause": f"1x non-participating liquidation preference{tag}",
+        "document_type": "legal", "detail_level": "medium"
+    })),
+    Scenario("explain_stream", "chatbot", "/api/v1/explain/stream", lambda tag: _json({
+        "clause": f"Four-year vesting with a one-year cliff{tag}"
+    }), stream=True),
+    Scenario("generate_content", "chatbot", "/api/v1/generate-content", lambda tag: _json({
+        "content_type": "pitch_deck", "user_info": _company(tag)
+    })),
+
+    Scenario("create_nda", "legal", "/api/v1/legal/create-nda",
+             lambda tag: _json({"parties_info": _parties(tag)})),
+    Scenario("create_cda", "legal", "/api/v1/legal/create-cda",
+             lambda tag: _json({"parties_info": _parties(tag)})),
+    Scenario("create_employment_agreement", "legal", "/api/v1/legal/create-employment-agreement",
+             lambda tag: _json({"employment_info": {
+                 "company_name": f"Acme Analytics{tag}", "employee_name": "Sam Rivera",
+                 "position": "Senior Engineer", "salary": "$150,000", "start_date": "2024-02-01"
+             }})),
+    Scenario("create_founder_agreement", "legal", "/api/v1/legal/create-founder-agreement",
+             lambda tag: _json({"founders_info": {
+                 "company_name": f"Acme Analytics{tag}",
+                 "founders": [{"name": "Alex Kim", "equity": 50}, {"name": "Priya Shah", "equity": 50}],
+                 "vesting_schedule": "4 years with 1 year cliff"
+             }})),
+    Scenario("create_terms_of_service", "legal", "/api/v1/legal/create-terms-of-service",
+             lambda tag: _json({"company_info": _company(tag)})),
+    Scenario("create_privacy_policy", "legal", "/api/v1/legal/create-privacy-policy",
+             lambda tag: _json({"company_info": _company(tag)})),
+
+    Scenario("parse_from_images", "bill_parser", "/api/v1/bill-parser/parse-from-images",
+             lambda tag: _json({"images": [SAMPLE_IMAGE_B64], "bill_type": "invoice"})),
+    Scenario("parse_from_files", "bill_parser", "/api/v1/bill-parser/parse-from-files", _files),
+
+    Scenario("market_comprehensive", "market_research", "/api/v1/market-research/comprehensive",
+             lambda tag: _json({"market_query": f"edtech in india{tag}", "include_news": True})),
+    Scenario("market_competitor_analysis", "market_research", "/api/v1/market-research/competitor-analysis",
+             lambda tag: _json({"company_name": f"Acme Learning{tag}", "industry": "edtech"})),
+    Scenario("market_trend_analysis", "market_research", "/api/v1/market-research/trend-analysis",
+             lambda tag: _json({"industry": f"climate tech{tag}"})),
+    Scenario("market_quick_search", "market_research", "/api/v1/market-research/quick-search",
+             lambda tag: {"params": {"query": f"plant-based snacks{tag}", "search_type": "news"}}, method="GET"),
+    Scenario("market_trend_analysis_stream", "market_research", "/api/v1/market-research/trend-analysis/stream",
+             lambda tag: _json({"industry": f"climate tech{tag}"}), stream=True),
+
+    Scenario("analyze_finances", "fund_management", "/api/v1/fund-management/analyze-finances",
+             lambda tag: _json(_analysis_payload(tag))),
+    Scenario("budget_recommendations", "fund_management", "/api/v1/fund-management/budget-recommendations",
+             lambda tag: _json(_budget_payload(tag))),
+    Scenario("fundraising_strategy", "fund_management", "/api/v1/fund-management/fundraising-strategy",
+             lambda tag: _json(_fundraising_payload(tag))),
+    Scenario("financial_health_check", "fund_management", "/api/v1/fund-management/financial-health-check",
+             lambda tag: _json(_health_payload(tag))),
+    Scenario("expense_categorization", "fund_management", "/api/v1/fund-management/expense-categorization",
+             lambda tag: _json(_expense_payload(tag))),
+]
+
+
+def select_scenarios(names: Optional[List[str]] = None) -> List[Scenario]:
+    """Scenarios matching any of ``names`` (scenario or group names); all when empty"""
+    if not names:
+        return list(SCENARIOS)
+    selected = [scenario for scenario in SCENARIOS if scenario.name in names or scenario.group in names]
+    unknown = set(names) - {scenario.name for scenario in SCENARIOS} - {scenario.group for scenario in SCENARIOS}
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return selected
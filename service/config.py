@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -23,9 +23,93 @@ class Settings(BaseSettings):
     max_file_size_mb: float = 50.0
     allowed_file_types: List[str] = [".pdf", ".docx", ".txt"]
     
+    # Legal Documents Configuration
+    legal_output_dir: str = "generated_docs/legal"
+    
+    # Backend Selection ("fake" uses offline stubs for load testing)
+    llm_backend: str = "gemini"  # gemini or fake
+    search_backend: str = "serper"  # serper or fake
+    fake_llm_latency_ms: float = 800.0
+    fake_search_latency_ms: float = 300.0
+    fake_latency_distribution: str = "lognormal"  # fixed, uniform or lognormal
+    fake_latency_sigma: float = 0.5
+    fake_seed: int = 0
+    
+    # LLM Gateway Configuration
+    llm_model_name: str = "gemini-2.5-flash"
+    llm_max_in_flight: int = 8
+    llm_priority_aging_seconds: float = 10.0
+    llm_endpoint_priorities: Dict[str, int] = {}  # e.g. {"market_research": 1}; lower runs first
+    llm_deadline_seconds: float = 60.0
+    llm_max_retries: int = 2
+    llm_retry_backoff_seconds: float = 0.5
+    llm_retry_backoff_max_seconds: float = 8.0
+    llm_hedge_requests: bool = False  # Send a second request once a call outlives the recent p95
+    llm_hedge_percentile: float = 0.95
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30.0
+    
+    # Serper HTTP Client Configuration (one pooled session per worker)
+    serper_timeout_seconds: float = 30.0
+    serper_connect_timeout_seconds: float = 5.0
+    serper_pool_size: int = 100
+    serper_pool_per_host: int = 20
+    serper_keepalive_seconds: float = 60.0
+    serper_dns_cache_seconds: int = 300
+    serper_max_concurrent_requests: int = 16  # Requests in flight per worker; more wait for a slot
+    serper_task_timeout_seconds: float = 15.0  # Per search in a fan-out, including the wait for a slot
+    
+    # Serper Cache Configuration
+    serper_cache_enabled: bool = True
+    serper_cache_path: str = ""  # SQLite file shared by all workers; empty keeps the cache in memory
+    serper_cache_max_entries: int = 2048
+    serper_cache_search_ttl_seconds: float = 21600.0
+    serper_cache_news_ttl_seconds: float = 1800.0
+    serper_cache_images_ttl_seconds: float = 86400.0
+    serper_cache_stale_seconds: float = 3600.0  # Expired results are still served (and refreshed) this long
+    
+    # Market Research Configuration
+    market_research_single_call: bool = True  # One JSON-mode analysis call; False drafts then reformats
+    market_research_prompt_token_budget: int = 2500  # Search results sent to the model, ~4 chars per token
+    market_research_snippet_chars: int = 300
+    
+    # Startup Configuration
+    warm_up_services: bool = True
+    
     # Knowledge Base Configuration
     knowledge_base_path: str = "./knowledge_base"
     auto_refresh_kb: bool = True
+    kb_refresh_interval_seconds: float = 30.0
+    kb_extraction_cache: bool = True
+    rag_top_k: int = 5
+    rag_chunk_size: int = 800
+    rag_chunk_overlap: int = 150
+    rag_context_char_budget: int = 3000
+    rag_retrieval_mode: str = "bm25"  # bm25, dense or hybrid
+    rag_embedding_dim: int = 384
+    
+    # Response Cache Configuration
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: float = 3600.0
+    response_cache_max_entries: int = 1024
+    response_cache_path: str = ""  # SQLite file shared by all workers; empty keeps the cache in memory
+    semantic_cache_enabled: bool = True
+    # Minimum cosine similarity between questions, compared on stemmed content words and
+    # their bigrams. Hits also need the same negations, question and time words
+    # ("before"/"after"), so this only judges the remaining wording
+    semantic_cache_threshold: float = 0.9
+    semantic_cache_max_entries: int = 512
+    
+    # Observability Configuration
+    metrics_enabled: bool = True  # Request metrics middleware; /metrics is served either way
+    tracing_enabled: bool = True
+    # "X-Debug-Trace: 1" returns the span tree (queries, timings, errors) with the response;
+    # only enable where every client may see service internals
+    tracing_debug_header: bool = False
+    tracing_exporter: str = ""  # "" (none), jsonl or otlp
+    tracing_export_path: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_sample_rate: float = 1.0  # Fraction of traces exported; debug traces always are
     
     # Logging Configuration
     log_level: str = "INFO"
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from fastapi.responses import JSONResponse
 from typing import List, Optional
+from utils.resilience import LLMUnavailableError
+from utils.metrics import time_stage
 import logging
 from pydantic import BaseModel
 
 from services.bill_parser_service import BillParserService, BillParseResponse
+from services.registry import get_bill_parser_service
 
 logger = logging.getLogger(__name__)
 
-bill_parser = BillParserService()
-
 router = APIRouter(prefix="/api/v1/bill-parser", tags=["Bill Parser"])
 
 class BillParseRequest(BaseModel):
@@ -30,7 +31,10 @@ class BillValidationResponse(BaseModel):
     warnings: List[str]
 
 @router.post("/parse-from-images", response_model=List[BillParseResponse])
-async def parse_bills_from_images(request: BillParseRequest):
+async def parse_bills_from_images(
+    request: BillParseRequest,
+    bill_parser: BillParserService = Depends(get_bill_parser_service)
+):
     """
     Parse bills from base64 encoded images
     
@@ -73,6 +77,8 @@ async def parse_bills_from_images(request: BillParseRequest):
         
     except HTTPException:
         raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error parsing bills from images: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -81,7 +87,8 @@ async def parse_bills_from_images(request: BillParseRequest):
 async def parse_bills_from_files(
     files: List[UploadFile] = File(...),
     bill_type: str = Form("auto"),
-    extract_text_only: bool = Form(False)
+    extract_text_only: bool = Form(False),
+    bill_parser: BillParserService = Depends(get_bill_parser_service)
 ):
     """
     Parse bills from uploaded image/PDF files
@@ -107,7 +114,8 @@ async def parse_bills_from_files(
                     detail=f"Unsupported file format: {file.filename}. Supported: {', '.join(supported_formats)}"
                 )
             
-            content = await file.read()
+            with time_stage("file_upload_read"):
+                content = await file.read()
             file_data.append(content)
         
         if extract_text_only:
@@ -134,12 +142,17 @@ async def parse_bills_from_files(
         
     except HTTPException:
         raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error parsing bills from files: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/validate-bill", response_model=BillValidationResponse)
-async def validate_bill(bill: BillParseResponse):
+async def validate_bill(
+    bill: BillParseResponse,
+    bill_parser: BillParserService = Depends(get_bill_parser_service)
+):
     """
     Validate parsed bill data for accuracy and completeness
     
@@ -154,7 +167,7 @@ async def validate_bill(bill: BillParseResponse):
         raise HTTPException(status_code=500, detail=f"Validation error: {str(e)}")
 
 @router.get("/supported-formats")
-async def get_supported_formats():
+async def get_supported_formats(bill_parser: BillParserService = Depends(get_bill_parser_service)):
     """
     Get list of supported file formats for bill parsing
     """
@@ -164,7 +177,7 @@ async def get_supported_formats():
     }
 
 @router.get("/health")
-async def health_check():
+async def health_check(bill_parser: BillParserService = Depends(get_bill_parser_service)):
     """
     Check the health and configuration status of the bill parser service
     """
@@ -179,7 +192,8 @@ async def health_check():
 @router.post("/parse-from-file-path")
 async def parse_bill_from_path(
     file_path: str = Query(..., description="Path to the bill file"),
-    bill_type: str = Query("auto", description="Type of bill to parse")
+    bill_type: str = Query("auto", description="Type of bill to parse"),
+    bill_parser: BillParserService = Depends(get_bill_parser_service)
 ):
     """
     Parse bill from file system path (for internal use)
@@ -203,6 +217,10 @@ async def parse_bill_from_path(
         raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error parsing bill from file path: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
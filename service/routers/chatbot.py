@@ -1,14 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from services.chatbot_rag import ChatbotRAGService
+from services.registry import get_chatbot_service
+from utils.sse import format_sse, sse_response
+from utils.resilience import LLMUnavailableError
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["GenAI Chatbot"])
 
-rag_service = ChatbotRAGService()
-
 class QuestionRequest(BaseModel):
     question: str
     context: Optional[str] = None
@@ -35,7 +36,10 @@ class ContentResponse(BaseModel):
     confidence: float
 
 @router.post("/ask", response_model=ChatResponse)
-async def ask_question(request: QuestionRequest):
+async def ask_question(
+    request: QuestionRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
     """
     Q&A endpoint for startup-related questions using RAG
     """
@@ -58,12 +62,19 @@ async def ask_question(request: QuestionRequest):
             confidence=result.get("confidence", 0.0)
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing question: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
 
 @router.post("/explain", response_model=ChatResponse)
-async def explain_clause(request: ExplainRequest):
+async def explain_clause(
+    request: ExplainRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
     """
     Explain a legal or business clause in simple terms
     """
@@ -86,12 +97,73 @@ async def explain_clause(request: ExplainRequest):
             confidence=result.get("confidence", 0.0)
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error explaining clause: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error explaining clause: {str(e)}")
 
+@router.post("/ask/stream")
+async def ask_question_stream(
+    request: QuestionRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
+    """
+    Streaming variant of /ask: answer text as `chunk` server-sent events,
+    followed by a `done` event carrying sources and confidence
+    """
+    if not request.question or len(request.question.strip()) < 3:
+        raise HTTPException(status_code=400, detail="Question must be at least 3 characters long")
+    
+    logger.info(f"Streaming answer to question: {request.question[:100]}...")
+    
+    async def events():
+        async for event, data in rag_service.ask_question_stream(
+            question=request.question,
+            context=request.context,
+            startup_type=request.startup_type
+        ):
+            yield format_sse(data, event=event)
+    
+    try:
+        return await sse_response(events())
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.post("/explain/stream")
+async def explain_clause_stream(
+    request: ExplainRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
+    """
+    Streaming variant of /explain: explanation text as `chunk` server-sent events,
+    followed by a `done` event carrying sources and confidence
+    """
+    if not request.clause or len(request.clause.strip()) < 5:
+        raise HTTPException(status_code=400, detail="Clause must be at least 5 characters long")
+    
+    logger.info(f"Streaming explanation of clause: {request.clause[:100]}...")
+    
+    async def events():
+        async for event, data in rag_service.explain_clause_stream(
+            clause=request.clause,
+            document_type=request.document_type,
+            detail_level=request.detail_level
+        ):
+            yield format_sse(data, event=event)
+    
+    try:
+        return await sse_response(events())
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 @router.post("/generate-content", response_model=ContentResponse)
-async def generate_content(request: ContentGenerationRequest):
+async def generate_content(
+    request: ContentGenerationRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
     """
     Generate structured content for various document types (pitch deck, business plan, legal docs)
     """
@@ -110,6 +182,17 @@ async def generate_content(request: ContentGenerationRequest):
             confidence=result.get("confidence", 0.0)
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating content: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error generating content: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error generating content: {str(e)}")
+
+@router.get("/cache-stats")
+async def cache_stats(rag_service: ChatbotRAGService = Depends(get_chatbot_service)):
+    """
+    Hit/miss counters of the /ask and /explain response caches
+    """
+    return rag_service.cache_stats()
@@ -1,14 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from services.chatbot_rag import ChatbotRAGService
+from services.registry import get_chatbot_service
+from utils.sse import format_sse, sse_response
+from utils.resilience import LLMUnavailableError
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Fund Management AI"])
 
-rag_service = ChatbotRAGService()
-
 class FundManagementAnalysisRequest(BaseModel):
     query_type: str  # 'expense_analysis', 'budget_planning', 'funding_strategy', 'financial_insights'
     data: Dict[str, Any]  # Relevant financial data
@@ -47,7 +48,10 @@ class AIResponse(BaseModel):
     sources: List[str]
 
 @router.post("/analyze-finances", response_model=AIResponse)
-async def analyze_finances(request: FundManagementAnalysisRequest):
+async def analyze_finances(
+    request: FundManagementAnalysisRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
     """
     AI-powered financial analysis for startups
     """
@@ -59,7 +63,7 @@ async def analyze_finances(request: FundManagementAnalysisRequest):
         prompt = _build_financial_analysis_prompt(request.query_type, request.data, request.context)
         
         # Generate AI response
-        analysis = await rag_service._generate_response(prompt)
+        analysis = await rag_service._generate_response(prompt, endpoint="fund_management")
         
         # Extract recommendations and insights
         recommendations = _extract_recommendations(analysis)
@@ -75,12 +79,19 @@ async def analyze_finances(request: FundManagementAnalysisRequest):
             sources=["startup_financial_knowledge", "industry_best_practices"]
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error in financial analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Financial analysis failed: {str(e)}")
 
 @router.post("/budget-recommendations", response_model=AIResponse)
-async def get_budget_recommendations(request: BudgetRecommendationRequest):
+async def get_budget_recommendations(
+    request: BudgetRecommendationRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
     """
     Generate AI-powered budget recommendations for startups
     """
@@ -88,27 +99,9 @@ async def get_budget_recommendations(request: BudgetRecommendationRequest):
         if not rag_service.is_ai_configured():
             raise HTTPException(status_code=503, detail="AI service is not configured")
 
-        prompt = f"""
-        As a startup financial advisor, provide detailed budget recommendations for a {request.startup_stage} startup with the following characteristics:
-        
-        - Industry: {request.industry}
-        - Team Size: {request.team_size} people
-        - Monthly Revenue: ${request.monthly_revenue or 'Not specified'}
-        - Funding Raised: ${request.funding_raised or 'Not specified'}
-        - Current Burn Rate: ${request.burn_rate or 'Not specified'}
-        
-        Please provide:
-        1. Recommended monthly budget allocation by category (Development, Marketing, Operations, etc.)
-        2. Key spending priorities for this stage
-        3. Cost optimization opportunities
-        4. Budget monitoring recommendations
-        5. Red flags to watch for
-        
-        Structure your response with specific dollar amounts and percentages where possible.
-        Focus on practical, actionable advice for this startup stage and industry.
-        """
+        prompt = _build_budget_prompt(request)
         
-        analysis = await rag_service._generate_response(prompt)
+        analysis = await rag_service._generate_response(prompt, endpoint="fund_management")
         
         return AIResponse(
             analysis=analysis,
@@ -119,12 +112,19 @@ async def get_budget_recommendations(request: BudgetRecommendationRequest):
             sources=["startup_budgeting_best_practices", "industry_benchmarks"]
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error in budget recommendations: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Budget recommendation failed: {str(e)}")
 
 @router.post("/fundraising-strategy", response_model=AIResponse)
-async def get_fundraising_strategy(request: FundraisingStrategyRequest):
+async def get_fundraising_strategy(
+    request: FundraisingStrategyRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
     """
     AI-powered fundraising strategy and recommendations
     """
@@ -132,31 +132,9 @@ async def get_fundraising_strategy(request: FundraisingStrategyRequest):
         if not rag_service.is_ai_configured():
             raise HTTPException(status_code=503, detail="AI service is not configured")
 
-        prompt = f"""
-        As a startup fundraising expert, analyze this startup's fundraising needs and provide strategic recommendations:
-        
-        Current Details:
-        - Stage: {request.current_stage}
-        - Target Funding: ${request.target_amount:,.0f}
-        - Industry: {request.industry}
-        - Team Background: {request.team_background}
-        - Market Size: {request.market_size or 'Not specified'}
-        
-        Traction Metrics:
-        {request.traction_metrics}
-        
-        Please provide:
-        1. Fundraising strategy and timeline recommendations
-        2. Investor type recommendations (angels, VCs, etc.)
-        3. Key metrics and milestones to highlight
-        4. Potential valuation ranges and deal terms
-        5. Common pitfalls to avoid
-        6. Preparation checklist
-        
-        Be specific about the fundraising process, typical timeframes, and success factors.
-        """
+        prompt = _build_fundraising_prompt(request)
         
-        analysis = await rag_service._generate_response(prompt)
+        analysis = await rag_service._generate_response(prompt, endpoint="fund_management")
         
         return AIResponse(
             analysis=analysis,
@@ -167,12 +145,19 @@ async def get_fundraising_strategy(request: FundraisingStrategyRequest):
             sources=["fundraising_best_practices", "investor_relations_knowledge"]
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error in fundraising strategy: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Fundraising strategy failed: {str(e)}")
 
 @router.post("/financial-health-check", response_model=AIResponse)
-async def financial_health_check(request: FinancialHealthRequest):
+async def financial_health_check(
+    request: FinancialHealthRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
     """
     Comprehensive financial health analysis for startups
     """
@@ -180,42 +165,9 @@ async def financial_health_check(request: FinancialHealthRequest):
         if not rag_service.is_ai_configured():
             raise HTTPException(status_code=503, detail="AI service is not configured")
 
-        # Calculate key metrics
-        total_monthly_expenses = sum(exp.get('amount', 0) for exp in request.monthly_expenses)
-        total_monthly_revenue = sum(rev.get('amount', 0) for rev in request.revenue_data)
-        cash_flow = total_monthly_revenue - total_monthly_expenses
-        
-        prompt = f"""
-        As a startup financial analyst, provide a comprehensive financial health assessment:
-        
-        Financial Metrics:
-        - Monthly Expenses: ${total_monthly_expenses:,.0f}
-        - Monthly Revenue: ${total_monthly_revenue:,.0f}
-        - Net Cash Flow: ${cash_flow:,.0f}
-        - Current Burn Rate: ${request.burn_rate:,.0f}
-        - Runway: {request.runway_months:.1f} months
+        prompt = _build_health_check_prompt(request)
         
-        Expense Breakdown:
-        {request.monthly_expenses}
-        
-        Revenue Sources:
-        {request.revenue_data}
-        
-        Funding Sources:
-        {request.funding_sources}
-        
-        Please provide:
-        1. Overall financial health assessment (scale 1-10 with explanation)
-        2. Critical areas of concern
-        3. Opportunities for improvement
-        4. Runway extension strategies
-        5. Key financial KPIs to track
-        6. Immediate action recommendations
-        
-        Focus on actionable insights and specific recommendations for improving financial stability.
-        """
-        
-        analysis = await rag_service._generate_response(prompt)
+        analysis = await rag_service._generate_response(prompt, endpoint="fund_management")
         
         return AIResponse(
             analysis=analysis,
@@ -226,12 +178,19 @@ async def financial_health_check(request: FinancialHealthRequest):
             sources=["financial_health_indicators", "startup_financial_management"]
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error in financial health check: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Financial health check failed: {str(e)}")
 
 @router.post("/expense-categorization", response_model=Dict[str, Any])
-async def categorize_expenses(expenses: List[Dict[str, Any]]):
+async def categorize_expenses(
+    expenses: List[Dict[str, Any]],
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
     """
     AI-powered expense categorization and optimization suggestions
     """
@@ -239,32 +198,10 @@ async def categorize_expenses(expenses: List[Dict[str, Any]]):
         if not rag_service.is_ai_configured():
             raise HTTPException(status_code=503, detail="AI service is not configured")
 
-        # Analyze spending patterns
-        category_totals = {}
-        for expense in expenses:
-            category = expense.get('category', 'Uncategorized')
-            amount = expense.get('amount', 0)
-            category_totals[category] = category_totals.get(category, 0) + amount
-        
-        total_expenses = sum(category_totals.values())
+        category_totals, total_expenses = _total_expenses_by_category(expenses)
+        prompt = _build_expense_categorization_prompt(category_totals, total_expenses)
         
-        prompt = f"""
-        Analyze these startup expense categories and provide optimization recommendations:
-        
-        Expense Breakdown:
-        {category_totals}
-        
-        Total Monthly Expenses: ${total_expenses:,.0f}
-        
-        Please provide:
-        1. Category-wise spending analysis
-        2. Potential cost reduction opportunities
-        3. Spending pattern insights
-        4. Benchmark comparisons for startup expenses
-        5. Recommendations for expense optimization
-        """
-        
-        analysis = await rag_service._generate_response(prompt)
+        analysis = await rag_service._generate_response(prompt, endpoint="fund_management")
         
         return {
             "analysis": analysis,
@@ -273,10 +210,235 @@ async def categorize_expenses(expenses: List[Dict[str, Any]]):
             "recommendations": _extract_recommendations(analysis)
         }
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error in expense categorization: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Expense categorization failed: {str(e)}")
 
+async def _stream_analysis(rag_service: ChatbotRAGService, prompt: str, summarize):
+    """
+    Stream the analysis as `chunk` server-sent events, then a `done` event built by
+    ``summarize(analysis)`` from the complete text
+    """
+    if not rag_service.is_ai_configured():
+        raise HTTPException(status_code=503, detail="AI service is not configured")
+    
+    async def events():
+        parts = []
+        async for text in rag_service._generate_response_stream(prompt, endpoint="fund_management"):
+            parts.append(text)
+            yield format_sse({"text": text}, event="chunk")
+        yield format_sse(summarize("".join(parts)), event="done")
+    
+    try:
+        return await sse_response(events())
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+def _analysis_summary(confidence: float, sources: List[str]):
+    """Build the trailing event of an AIResponse-shaped stream"""
+    def summarize(analysis: str) -> Dict[str, Any]:
+        return {
+            "recommendations": _extract_recommendations(analysis),
+            "insights": _extract_insights(analysis),
+            "action_items": _extract_action_items(analysis),
+            "confidence": confidence,
+            "sources": sources
+        }
+    return summarize
+
+@router.post("/analyze-finances/stream")
+async def analyze_finances_stream(
+    request: FundManagementAnalysisRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
+    """
+    Streaming variant of /analyze-finances
+    """
+    prompt = _build_financial_analysis_prompt(request.query_type, request.data, request.context)
+    return await _stream_analysis(
+        rag_service, prompt,
+        _analysis_summary(0.85, ["startup_financial_knowledge", "industry_best_practices"])
+    )
+
+@router.post("/budget-recommendations/stream")
+async def get_budget_recommendations_stream(
+    request: BudgetRecommendationRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
+    """
+    Streaming variant of /budget-recommendations
+    """
+    return await _stream_analysis(
+        rag_service, _build_budget_prompt(request),
+        _analysis_summary(0.88, ["startup_budgeting_best_practices", "industry_benchmarks"])
+    )
+
+@router.post("/fundraising-strategy/stream")
+async def get_fundraising_strategy_stream(
+    request: FundraisingStrategyRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
+    """
+    Streaming variant of /fundraising-strategy
+    """
+    return await _stream_analysis(
+        rag_service, _build_fundraising_prompt(request),
+        _analysis_summary(0.87, ["fundraising_best_practices", "investor_relations_knowledge"])
+    )
+
+@router.post("/financial-health-check/stream")
+async def financial_health_check_stream(
+    request: FinancialHealthRequest,
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
+    """
+    Streaming variant of /financial-health-check
+    """
+    return await _stream_analysis(
+        rag_service, _build_health_check_prompt(request),
+        _analysis_summary(0.90, ["financial_health_indicators", "startup_financial_management"])
+    )
+
+@router.post("/expense-categorization/stream")
+async def categorize_expenses_stream(
+    expenses: List[Dict[str, Any]],
+    rag_service: ChatbotRAGService = Depends(get_chatbot_service)
+):
+    """
+    Streaming variant of /expense-categorization; the `done` event carries the
+    category breakdown, optimization score and recommendations
+    """
+    category_totals, total_expenses = _total_expenses_by_category(expenses)
+    
+    def summarize(analysis: str) -> Dict[str, Any]:
+        return {
+            "category_breakdown": category_totals,
+            "optimization_score": _calculate_optimization_score(category_totals, total_expenses),
+            "recommendations": _extract_recommendations(analysis)
+        }
+    
+    return await _stream_analysis(rag_service, _build_expense_categorization_prompt(category_totals, total_expenses), summarize)
+
+def _build_budget_prompt(request: BudgetRecommendationRequest) -> str:
+    """Build budget recommendation prompt"""
+    return f"""
+    As a startup financial advisor, provide detailed budget recommendations for a {request.startup_stage} startup with the following characteristics:
+    
+    - Industry: {request.industry}
+    - Team Size: {request.team_size} people
+    - Monthly Revenue: ${request.monthly_revenue or 'Not specified'}
+    - Funding Raised: ${request.funding_raised or 'Not specified'}
+    - Current Burn Rate: ${request.burn_rate or 'Not specified'}
+    
+    Please provide:
+    1. Recommended monthly budget allocation by category (Development, Marketing, Operations, etc.)
+    2. Key spending priorities for this stage
+    3. Cost optimization opportunities
+    4. Budget monitoring recommendations
+    5. Red flags to watch for
+    
+    Structure your response with specific dollar amounts and percentages where possible.
+    Focus on practical, actionable advice for this startup stage and industry.
+    """
+
+def _build_fundraising_prompt(request: FundraisingStrategyRequest) -> str:
+    """Build fundraising strategy prompt"""
+    return f"""
+    As a startup fundraising expert, analyze this startup's fundraising needs and provide strategic recommendations:
+    
+    Current Details:
+    - Stage: {request.current_stage}
+    - Target Funding: ${request.target_amount:,.0f}
+    - Industry: {request.industry}
+    - Team Background: {request.team_background}
+    - Market Size: {request.market_size or 'Not specified'}
+    
+    Traction Metrics:
+    {request.traction_metrics}
+    
+    Please provide:
+    1. Fundraising strategy and timeline recommendations
+    2. Investor type recommendations (angels, VCs, etc.)
+    3. Key metrics and milestones to highlight
+    4. Potential valuation ranges and deal terms
+    5. Common pitfalls to avoid
+    6. Preparation checklist
+    
+    Be specific about the fundraising process, typical timeframes, and success factors.
+    """
+
+def _build_health_check_prompt(request: FinancialHealthRequest) -> str:
+    """Build financial health check prompt"""
+    # Calculate key metrics
+    total_monthly_expenses = sum(exp.get('amount', 0) for exp in request.monthly_expenses)
+    total_monthly_revenue = sum(rev.get('amount', 0) for rev in request.revenue_data)
+    cash_flow = total_monthly_revenue - total_monthly_expenses
+    
+    return f"""
+    As a startup financial analyst, provide a comprehensive financial health assessment:
+    
+    Financial Metrics:
+    - Monthly Expenses: ${total_monthly_expenses:,.0f}
+    - Monthly Revenue: ${total_monthly_revenue:,.0f}
+    - Net Cash Flow: ${cash_flow:,.0f}
+    - Current Burn Rate: ${request.burn_rate:,.0f}
+    - Runway: {request.runway_months:.1f} months
+    
+    Expense Breakdown:
+    {request.monthly_expenses}
+    
+    Revenue Sources:
+    {request.revenue_data}
+    
+    Funding Sources:
+    {request.funding_sources}
+    
+    Please provide:
+    1. Overall financial health assessment (scale 1-10 with explanation)
+    2. Critical areas of concern
+    3. Opportunities for improvement
+    4. Runway extension strategies
+    5. Key financial KPIs to track
+    6. Immediate action recommendations
+    
+    Focus on actionable insights and specific recommendations for improving financial stability.
+    """
+
+def _total_expenses_by_category(expenses: List[Dict[str, Any]]) -> Tuple[Dict[str, float], float]:
+    """Sum expense amounts per category"""
+    # Analyze spending patterns
+    category_totals = {}
+    for expense in expenses:
+        category = expense.get('category', 'Uncategorized')
+        amount = expense.get('amount', 0)
+        category_totals[category] = category_totals.get(category, 0) + amount
+    
+    total_expenses = sum(category_totals.values())
+    
+    return category_totals, total_expenses
+
+def _build_expense_categorization_prompt(category_totals: Dict[str, float], total_expenses: float) -> str:
+    """Build expense categorization prompt"""
+    return f"""
+    Analyze these startup expense categories and provide optimization recommendations:
+    
+    Expense Breakdown:
+    {category_totals}
+    
+    Total Monthly Expenses: ${total_expenses:,.0f}
+    
+    Please provide:
+    1. Category-wise spending analysis
+    2. Potential cost reduction opportunities
+    3. Spending pattern insights
+    4. Benchmark comparisons for startup expenses
+    5. Recommendations for expense optimization
+    """
+
 def _build_financial_analysis_prompt(query_type: str, data: Dict[str, Any], context: Optional[str]) -> str:
     """Build context-specific financial analysis prompt"""
     
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 from services.legal_service import LegalService
+from services.registry import get_legal_service
+from utils.resilience import LLMUnavailableError
 import logging
 import os
 import base64
@@ -10,9 +12,6 @@ import base64
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Legal Document Generation"])
 
-# Initialize the legal service
-legal_service = LegalService()
-
 class NDARequest(BaseModel):
     parties_info: Dict[str, Any]  # Company info, other party info, etc.
     use_ai: bool = True  # Whether to use AI for content generation
@@ -59,7 +58,7 @@ class LegalDocumentResponse(BaseModel):
     message: Optional[str] = None
 
 @router.post("/create-nda")
-async def create_nda(request: NDARequest):
+async def create_nda(request: NDARequest, legal_service: LegalService = Depends(get_legal_service)):
     """
     Generate a Non-Disclosure Agreement (NDA) document with AI-powered content generation
     
@@ -105,12 +104,16 @@ async def create_nda(request: NDARequest):
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating NDA: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating NDA: {str(e)}")
 
 @router.post("/create-cda")
-async def create_cda(request: CDARequest):
+async def create_cda(request: CDARequest, legal_service: LegalService = Depends(get_legal_service)):
     """
     Generate a Confidentiality Disclosure Agreement (CDA) document with AI-powered content generation
     CDA is essentially the same as NDA with different terminology
@@ -157,12 +160,19 @@ async def create_cda(request: CDARequest):
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating CDA: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating CDA: {str(e)}")
 
 @router.post("/create-employment-agreement")
-async def create_employment_agreement(request: EmploymentAgreementRequest):
+async def create_employment_agreement(
+    request: EmploymentAgreementRequest,
+    legal_service: LegalService = Depends(get_legal_service)
+):
     """
     Generate an Employment Agreement document with AI-powered content generation
     
@@ -208,12 +218,19 @@ async def create_employment_agreement(request: EmploymentAgreementRequest):
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating employment agreement: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating employment agreement: {str(e)}")
 
 @router.post("/create-founder-agreement")
-async def create_founder_agreement(request: FounderAgreementRequest):
+async def create_founder_agreement(
+    request: FounderAgreementRequest,
+    legal_service: LegalService = Depends(get_legal_service)
+):
     """
     Generate a Founder Agreement document with AI-powered content generation
     
@@ -256,12 +273,19 @@ async def create_founder_agreement(request: FounderAgreementRequest):
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating founder agreement: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating founder agreement: {str(e)}")
 
 @router.post("/create-terms-of-service")
-async def create_terms_of_service(request: TermsOfServiceRequest):
+async def create_terms_of_service(
+    request: TermsOfServiceRequest,
+    legal_service: LegalService = Depends(get_legal_service)
+):
     """
     Generate a Terms of Service document with AI-powered content generation
     
@@ -304,12 +328,19 @@ async def create_terms_of_service(request: TermsOfServiceRequest):
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating Terms of Service: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating Terms of Service: {str(e)}")
 
 @router.post("/create-privacy-policy")
-async def create_privacy_policy(request: PrivacyPolicyRequest):
+async def create_privacy_policy(
+    request: PrivacyPolicyRequest,
+    legal_service: LegalService = Depends(get_legal_service)
+):
     """
     Generate a Privacy Policy document with AI-powered content generation
     
@@ -354,6 +385,10 @@ async def create_privacy_policy(request: PrivacyPolicyRequest):
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating Privacy Policy: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating Privacy Policy: {str(e)}")
@@ -422,7 +457,8 @@ async def get_legal_templates():
     }
 
 @router.post("/preview-content")
-async def preview_legal_content(document_type: str, parties_info: Dict[str, Any]):
+async def preview_legal_content(document_type: str, parties_info: Dict[str, Any],
+                                legal_service: LegalService = Depends(get_legal_service)):
     """
     Preview AI-generated content for legal documents without creating the PDF
     
@@ -432,11 +468,7 @@ async def preview_legal_content(document_type: str, parties_info: Dict[str, Any]
     try:
         logger.info(f"Previewing AI content for {document_type}")
         
-        # Import here to avoid circular imports
-        from services.content_generator import ContentGeneratorService
-        content_generator = ContentGeneratorService()
-        
-        content_structure = await content_generator.generate_legal_document_content(
+        content_structure = await legal_service.content_generator.generate_legal_document_content(
             document_type, parties_info
         )
         
@@ -447,6 +479,10 @@ async def preview_legal_content(document_type: str, parties_info: Dict[str, Any]
             "message": "Content generated successfully. Use this content structure to create the document."
         }
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error previewing {document_type} content: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error previewing content: {str(e)}")
\ No newline at end of file
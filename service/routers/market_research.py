@@ -1,18 +1,19 @@
 """
 Market Research Router for FastAPI
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
 from services.market_research_service import MarketResearchService
+from services.registry import get_market_research_service
+from utils.resilience import LLMUnavailableError
+from utils.sse import format_sse, sse_response
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/market-research", tags=["Market Research"])
 
-market_research_service = MarketResearchService()
-
 class MarketResearchRequest(BaseModel):
     market_query: str = Field(..., description="Market or industry to research")
     location: str = Field(default="us", description="Geographic location for research")
@@ -37,7 +38,10 @@ class MarketResearchResponse(BaseModel):
     location: str
 
 @router.post("/comprehensive", response_model=MarketResearchResponse)
-async def comprehensive_market_research(request: MarketResearchRequest):
+async def comprehensive_market_research(
+    request: MarketResearchRequest,
+    market_research_service: MarketResearchService = Depends(get_market_research_service)
+):
     """
     Perform comprehensive market research including web search, news analysis, and AI insights
     """
@@ -58,6 +62,10 @@ async def comprehensive_market_research(request: MarketResearchRequest):
             location=request.location
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Comprehensive market research failed: {str(e)}")
         raise HTTPException(
@@ -65,8 +73,36 @@ async def comprehensive_market_research(request: MarketResearchRequest):
             detail=f"Market research failed: {str(e)}"
         )
 
+@router.post("/comprehensive/stream")
+async def comprehensive_market_research_stream(
+    request: MarketResearchRequest,
+    market_research_service: MarketResearchService = Depends(get_market_research_service)
+):
+    """
+    Streaming variant of /comprehensive: a `search` server-sent event with the raw hits of each
+    search as it completes, then a `metadata` event, then an `analysis` event
+    """
+    logger.info(f"Streaming comprehensive market research for: {request.market_query}")
+    
+    async def events():
+        async for event, data in market_research_service.comprehensive_market_research_stream(
+            market_query=request.market_query,
+            location=request.location,
+            include_news=request.include_news,
+            include_images=request.include_images
+        ):
+            yield format_sse(data, event=event)
+    
+    try:
+        return await sse_response(events())
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 @router.post("/competitor-analysis", response_model=MarketResearchResponse)
-async def competitor_analysis(request: CompetitorAnalysisRequest):
+async def competitor_analysis(
+    request: CompetitorAnalysisRequest,
+    market_research_service: MarketResearchService = Depends(get_market_research_service)
+):
     """
     Perform detailed competitor analysis for a company in specific industry
     """
@@ -86,6 +122,10 @@ async def competitor_analysis(request: CompetitorAnalysisRequest):
             location=request.location
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Competitor analysis failed: {str(e)}")
         raise HTTPException(
@@ -93,8 +133,35 @@ async def competitor_analysis(request: CompetitorAnalysisRequest):
             detail=f"Competitor analysis failed: {str(e)}"
         )
 
+@router.post("/competitor-analysis/stream")
+async def competitor_analysis_stream(
+    request: CompetitorAnalysisRequest,
+    market_research_service: MarketResearchService = Depends(get_market_research_service)
+):
+    """
+    Streaming variant of /competitor-analysis: a `search` server-sent event with the raw hits of each
+    search as it completes, then a `metadata` event, then an `analysis` event
+    """
+    logger.info(f"Streaming competitor analysis for: {request.company_name} in {request.industry}")
+    
+    async def events():
+        async for event, data in market_research_service.competitor_analysis_stream(
+            company_name=request.company_name,
+            industry=request.industry,
+            location=request.location
+        ):
+            yield format_sse(data, event=event)
+    
+    try:
+        return await sse_response(events())
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 @router.post("/trend-analysis", response_model=MarketResearchResponse)
-async def trend_analysis(request: TrendAnalysisRequest):
+async def trend_analysis(
+    request: TrendAnalysisRequest,
+    market_research_service: MarketResearchService = Depends(get_market_research_service)
+):
     """
     Analyze industry trends and future predictions
     """
@@ -114,6 +181,10 @@ async def trend_analysis(request: TrendAnalysisRequest):
             location=request.location
         )
         
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Trend analysis failed: {str(e)}")
         raise HTTPException(
@@ -121,11 +192,36 @@ async def trend_analysis(request: TrendAnalysisRequest):
             detail=f"Trend analysis failed: {str(e)}"
         )
 
+@router.post("/trend-analysis/stream")
+async def trend_analysis_stream(
+    request: TrendAnalysisRequest,
+    market_research_service: MarketResearchService = Depends(get_market_research_service)
+):
+    """
+    Streaming variant of /trend-analysis: a `search` server-sent event with the raw hits of each
+    search as it completes, then a `metadata` event, then an `analysis` event
+    """
+    logger.info(f"Streaming trend analysis for: {request.industry}")
+    
+    async def events():
+        async for event, data in market_research_service.trend_analysis_stream(
+            industry=request.industry,
+            time_period=request.time_period,
+            location=request.location
+        ):
+            yield format_sse(data, event=event)
+    
+    try:
+        return await sse_response(events())
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 @router.get("/quick-search")
 async def quick_market_search(
     query: str = Query(..., description="Search query for market data"),
     location: str = Query(default="us", description="Geographic location"),
-    search_type: str = Query(default="search", description="Type of search: search, news, or images")
+    search_type: str = Query(default="search", description="Type of search: search, news, or images"),
+    market_research_service: MarketResearchService = Depends(get_market_research_service)
 ):
     """
     Quick market data search without full analysis
@@ -150,6 +246,8 @@ async def quick_market_search(
             "location": location
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Quick search failed: {str(e)}")
         raise HTTPException(
@@ -158,7 +256,9 @@ async def quick_market_search(
         )
 
 @router.get("/health")
-async def market_research_health():
+async def market_research_health(
+    market_research_service: MarketResearchService = Depends(get_market_research_service)
+):
     """
     Health check for market research service
     """
@@ -170,7 +270,8 @@ async def market_research_health():
             "status": "healthy",
             "service": "market_research",
             "serper_api": "connected" if market_research_service.serper_api_key else "not_configured",
-            "gemini_api": "connected" if market_research_service.gemini_api_key else "not_configured"
+            "gemini_api": "connected" if market_research_service.llm.is_configured else "not_configured",
+            "serper_cache": market_research_service.cache_stats()
         }
         
     except Exception as e:
@@ -179,5 +280,5 @@ async def market_research_health():
             "service": "market_research",
             "error": str(e),
             "serper_api": "connected" if market_research_service.serper_api_key else "not_configured",
-            "gemini_api": "connected" if market_research_service.gemini_api_key else "not_configured"
+            "gemini_api": "connected" if market_research_service.llm.is_configured else "not_configured"
         }
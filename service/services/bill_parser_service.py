@@ -1,13 +1,13 @@
-import google.generativeai as genai
 from typing import List, Dict, Any, Optional
-import os
 import logging
 import json
 from datetime import datetime
 from pathlib import Path
 from pydantic import BaseModel
 import base64
-from config import settings
+from services.llm_gateway import get_llm_gateway
+from utils.resilience import LLMUnavailableError
+from utils.metrics import time_stage
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -48,8 +48,8 @@ class BinaryContent:
 
 class Agent:
     """AI Agent for processing bills similar to your OCR implementation"""
-    def __init__(self, model, output_type, headers=None, system_prompt: str = ""):
-        self.model = model
+    def __init__(self, llm, output_type, headers=None, system_prompt: str = ""):
+        self.llm = llm
         self.output_type = output_type
         self.headers = headers or {}
         self.system_prompt = system_prompt
@@ -81,7 +81,7 @@ class Agent:
                     'data': image_part['data']
                 })
             
-            response = await self.model.generate_content_async(content_parts)
+            response = await self.llm.generate(content_parts, endpoint="bill_parser")
             
             if not response.text:
                 raise Exception("Empty response from AI model")
@@ -96,7 +96,8 @@ class Agent:
                     if response_text.endswith('```'):
                         response_text = response_text[:-3]
                     
-                    parsed_data = json.loads(response_text)
+                    with time_stage("json_parse"):
+                        parsed_data = json.loads(response_text)
                     
                     if isinstance(parsed_data, list):
                         bills = [BillParseResponse(**bill) for bill in parsed_data]
@@ -124,36 +125,20 @@ class BillParserService:
     """
     
     def __init__(self):
-        self.setup_gemini()
+        self.llm = get_llm_gateway()
         self.headers = {
             'User-Agent': 'FoundX-BillParser/1.0'
         }
     
-    def setup_gemini(self):
-        """Configure Gemini AI with API key"""
-        api_key = settings.gemini_api_key or os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            logger.warning("GEMINI_API_KEY not found in environment variables or settings")
-            self.model = None
-            return
-        
-        try:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-            logger.info("Gemini AI configured successfully for bill parsing")
-        except Exception as e:
-            logger.error(f"Error configuring Gemini AI: {str(e)}")
-            self.model = None
-
     async def parse_bills_from_images(self, images: List[bytes], bill_type: str = "auto") -> List[BillParseResponse]:
         """
         Parse bills from images using AI similar to your OCR implementation
         """
-        if not self.model:
+        if not self.llm.is_configured:
             raise Exception("Gemini AI is not configured. Please check your API key.")
         
         agent = Agent(
-            model=self.model,
+            llm=self.llm,
             output_type=List[BillParseResponse],
             headers=self.headers,
             system_prompt=(
@@ -239,6 +224,8 @@ class BillParserService:
                 *binary_images
             ])
             return result.output
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error parsing bills from images: {e}")
             return [BillParseResponse(
@@ -253,6 +240,8 @@ class BillParserService:
         """
         try:
             return await self.parse_bills_from_images([pdf_bytes], bill_type)
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error parsing PDF bill: {e}")
             return [BillParseResponse(
@@ -327,11 +316,11 @@ class BillParserService:
         """
         Extract plain text from images without structured parsing
         """
-        if not self.model:
+        if not self.llm.is_configured:
             raise Exception("Gemini AI is not configured. Please check your API key.")
         
         agent = Agent(
-            model=self.model,
+            llm=self.llm,
             output_type=str,
             headers=self.headers,
             system_prompt=(
@@ -353,6 +342,8 @@ class BillParserService:
                 *binary_images
             ])
             return [result.output] if isinstance(result.output, str) else result.output
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error extracting text: {e}")
             return [f"Error extracting text: {str(e)}"]
@@ -367,4 +358,4 @@ class BillParserService:
         """
         Check if AI service is properly configured
         """
-        return self.model is not None
+        return self.llm.is_configured
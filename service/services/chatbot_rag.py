@@ -1,12 +1,14 @@
 import re
-import google.generativeai as genai
-from typing import Dict, List, Optional, Any
-import os
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 import logging
 from pathlib import Path
 import asyncio
 import json
 from utils.file_utils import PDFProcessor, DocumentProcessor
+from services.knowledge_base import KnowledgeBase
+from services.llm_gateway import get_llm_gateway
+from utils.cache import TwoTierCache, make_cache_key, normalize_text
+from utils.metrics import time_stage
 from config import settings
 
 logging.basicConfig(level=logging.INFO)
@@ -18,101 +20,170 @@ class ChatbotRAGService:
     """
     
     def __init__(self):
-        self.setup_gemini()
-        self.knowledge_base_path = Path("knowledge_base")
-        self.knowledge_base_path.mkdir(exist_ok=True)
+        self.llm = get_llm_gateway()
+        self.knowledge_base_path = Path(settings.knowledge_base_path)
         self.document_processor = DocumentProcessor()
         self.pdf_processor = PDFProcessor()
-        self.knowledge_base = {}
+        self.retrieval_mode = settings.rag_retrieval_mode.lower()
+        self.kb = KnowledgeBase(self.knowledge_base_path, self.retrieval_mode)
+        self._refresh_task = None
+        self.response_cache = None
+        if settings.response_cache_enabled:
+            self.response_cache = TwoTierCache(
+                "chatbot_responses",
+                max_entries=settings.response_cache_max_entries,
+                ttl_seconds=settings.response_cache_ttl_seconds,
+                disk_path=settings.response_cache_path or None
+            )
+        self.semantic_cache = None
+        if settings.semantic_cache_enabled:
+            # Imported lazily so numpy is only loaded when the semantic cache is enabled
+            from utils.semantic_cache import SemanticCache, question_embedder
+            self.semantic_cache = SemanticCache(
+                question_embedder(settings.rag_embedding_dim),
+                max_entries=settings.semantic_cache_max_entries,
+                threshold=settings.semantic_cache_threshold,
+                ttl_seconds=settings.response_cache_ttl_seconds
+            )
         self._load_knowledge_base()
     
-    def setup_gemini(self):
-        """Configure Gemini AI with API key"""
-        api_key = settings.gemini_api_key or os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            logger.warning("GEMINI_API_KEY not found in environment variables or settings")
-            self.model = None
+    def _cached_answer(self, cache_key: Optional[str], semantic_key: Optional[Tuple[str, str]]) -> Optional[str]:
+        """Look the answer up in the exact cache, then the semantic cache"""
+        if cache_key and self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if semantic_key and self.semantic_cache is not None:
+            return self.semantic_cache.get(*semantic_key)
+        return None
+    
+    def _store_answer(self, cache_key: Optional[str], semantic_key: Optional[Tuple[str, str]], answer: str):
+        """Cache a generated answer; empty answers are never stored"""
+        if not answer or not answer.strip():
             return
+        if cache_key and self.response_cache is not None:
+            self.response_cache.set(cache_key, answer)
+        if semantic_key and self.semantic_cache is not None:
+            self.semantic_cache.set(*semantic_key, answer)
+    
+    async def _generate_response(self, prompt: str, cache_key: Optional[str] = None,
+                                 semantic_key: Optional[Tuple[str, str]] = None,
+                                 endpoint: str = "chatbot") -> str:
+        """
+        Generate a response using Gemini AI.
+        
+        When ``cache_key`` is given, a cached answer is returned without calling Gemini and
+        successful answers are stored. ``semantic_key`` is a ``(question, scope)`` pair that
+        additionally lets paraphrases of an earlier question with the same scope reuse its
+        answer. ``endpoint`` selects the LLM gateway priority.
+        
+        Raises:
+            LLMUnavailableError: if Gemini is unconfigured, degraded or timed out
+        """
+        cached = self._cached_answer(cache_key, semantic_key)
+        if cached is not None:
+            return cached
         
         try:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-            logger.info("Gemini AI configured successfully")
+            response = await self.llm.generate(prompt, endpoint=endpoint, coalesce=True)
+            self._store_answer(cache_key, semantic_key, response.text)
+            return response.text
         except Exception as e:
-            logger.error(f"Error configuring Gemini AI: {str(e)}")
-            self.model = None
+            logger.error(f"Error generating response with Gemini: {str(e)}")
+            raise
     
-    async def _generate_response(self, prompt: str) -> str:
-        """Generate a response using Gemini AI"""
-        if not self.model:
-            logger.warning("Gemini model not configured, returning fallback response")
-            return "I'm sorry, the AI service is currently unavailable. Please try again later."
+    async def _generate_response_stream(self, prompt: str, cache_key: Optional[str] = None,
+                                        semantic_key: Optional[Tuple[str, str]] = None,
+                                        endpoint: str = "chatbot_stream") -> AsyncIterator[str]:
+        """
+        Stream a Gemini response as text chunks as soon as they are produced.
         
+        Caching behaves like ``_generate_response``: a hit is yielded as a single chunk, and
+        the assembled answer is stored only if the whole stream completed successfully.
+        Errors propagate to the caller, which reports them in-band.
+        """
+        cached = self._cached_answer(cache_key, semantic_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
         try:
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
-            return response.text
+            async for chunk in self.llm.stream(prompt, endpoint=endpoint):
+                text = chunk.text
+                if text:
+                    parts.append(text)
+                    yield text
         except Exception as e:
-            logger.error(f"Error generating response with Gemini: {str(e)}")
-            return f"I encountered an error while processing your request: {str(e)}"
+            logger.error(f"Error streaming response from Gemini: {str(e)}")
+            raise
+        
+        self._store_answer(cache_key, semantic_key, "".join(parts))
     
     
     def _load_knowledge_base(self):
-        """Load knowledge base from files and initialize with startup templates"""
+        """Load (or incrementally refresh) the knowledge base from disk"""
         try:
-            self._load_startup_templates()
-            
-            if self.knowledge_base_path.exists():
-                for file_path in self.knowledge_base_path.glob("*.txt"):
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            self.knowledge_base[file_path.stem] = content
-                            logger.info(f"Loaded knowledge base file: {file_path.name}")
-                    except Exception as e:
-                        logger.error(f"Error loading {file_path}: {str(e)}")
-                
-                for file_path in self.knowledge_base_path.glob("*.pdf"):
-                    try:
-                        content = self.pdf_processor.extract_text(str(file_path))
-                        if content:
-                            self.knowledge_base[file_path.stem] = content
-                            logger.info(f"Loaded PDF knowledge base file: {file_path.name}")
-                    except Exception as e:
-                        logger.error(f"Error loading PDF {file_path}: {str(e)}")
-            
+            self.kb.refresh()
             logger.info(f"Knowledge base loaded with {len(self.knowledge_base)} documents")
-            
         except Exception as e:
             logger.error(f"Error loading knowledge base: {str(e)}")
-            self._load_startup_templates()
-
-    def _load_startup_templates(self):
-        """Load predefined startup knowledge and templates"""
-        self.knowledge_base.update({
-            "startup_basics": """
-            Startup fundamentals include: business model validation, market research,
-            MVP development, funding strategies, legal structure, team building,
-            and growth planning. Key stages: ideation, validation, MVP, growth, scaling.
-            """,
-            "legal_clauses": """
-            Common startup legal clauses: equity distribution, vesting schedules,
-            non-disclosure agreements, employment terms, intellectual property rights,
-            investment terms, board composition, liquidation preferences.
-            """,
-            "funding_types": """
-            Startup funding stages: Pre-seed, Seed, Series A/B/C, Bridge rounds.
-            Funding sources: bootstrapping, friends & family, angel investors,
-            venture capital, crowdfunding, government grants.
-            """
-        })
+    
+    @property
+    def knowledge_base(self) -> Dict[str, str]:
+        return self.kb.snapshot.documents
+    
+    def start_auto_refresh(self):
+        """Start polling the knowledge base directory when settings.auto_refresh_kb is enabled"""
+        if settings.auto_refresh_kb and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(
+                self.kb.auto_refresh(settings.kb_refresh_interval_seconds)
+            )
+            logger.info(f"Knowledge base auto-refresh every {settings.kb_refresh_interval_seconds}s")
+    
+    async def stop_auto_refresh(self):
+        """Cancel the background knowledge base refresh task"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+    
+    def _prepare_question(self, question: str, context: Optional[str],
+                          startup_type: Optional[str]) -> Tuple[str, str, str, Tuple[str, str]]:
+        """Retrieve context and build the prompt and cache keys for a question"""
+        with time_stage("retrieval"):
+            relevant_context = self._retrieve_relevant_context(question, startup_type)
+        response_type = self._classify_response_type(question)
+        with time_stage("prompt_build"):
+            prompt = self._build_qa_prompt(question, relevant_context, context, startup_type, response_type)
+        # The prompt is fully determined by these parts, up to case and whitespace
+        cache_key = make_cache_key(
+            "ask",
+            normalize_text(question),
+            make_cache_key(relevant_context),
+            normalize_text(context),
+            normalize_text(startup_type)
+        )
+        # Paraphrases may share an answer only if everything else in the prompt matches;
+        # the response type picks the length instructions, so it is part of the prompt
+        semantic_scope = make_cache_key(
+            sorted(relevant_context.split("\n\n")),
+            normalize_text(context),
+            normalize_text(startup_type),
+            response_type
+        )
+        return relevant_context, prompt, cache_key, (question, semantic_scope)
     
     async def ask_question(self, question: str, context: Optional[str] = None, 
                           startup_type: Optional[str] = None) -> Dict[str, Any]:
         """Process a startup-related question using RAG approach"""
         try:
-            relevant_context = self._retrieve_relevant_context(question, startup_type)
-            prompt = self._build_qa_prompt(question, relevant_context, context, startup_type)
-            response = await self._generate_response(prompt)
+            relevant_context, prompt, cache_key, semantic_key = self._prepare_question(question, context, startup_type)
+            response = await self._generate_response(prompt, cache_key, semantic_key)
             
             return {
                 "answer": response,
@@ -124,13 +195,45 @@ class ChatbotRAGService:
             logger.error(f"Error in ask_question: {str(e)}")
             raise
     
+    async def ask_question_stream(self, question: str, context: Optional[str] = None,
+                                  startup_type: Optional[str] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of ``ask_question``.
+        
+        Yields ``("chunk", {"text": ...})`` events while the answer is generated, then a
+        final ``("done", {"sources": ..., "confidence": ...})`` event.
+        """
+        relevant_context, prompt, cache_key, semantic_key = self._prepare_question(question, context, startup_type)
+        parts = []
+        async for text in self._generate_response_stream(prompt, cache_key, semantic_key):
+            parts.append(text)
+            yield "chunk", {"text": text}
+        
+        yield "done", {
+            "sources": self._get_sources_used(relevant_context),
+            "confidence": self._calculate_confidence(question, "".join(parts))
+        }
+    
+    def _prepare_explanation(self, clause: str, document_type: str, detail_level: str) -> Tuple[str, str]:
+        """Build the prompt and cache key for a clause explanation"""
+        legal_context = self.knowledge_base.get("legal_clauses", "")
+        with time_stage("prompt_build"):
+            prompt = self._build_explanation_prompt(clause, document_type, detail_level, legal_context)
+        cache_key = make_cache_key(
+            "explain",
+            normalize_text(clause),
+            make_cache_key(legal_context),
+            normalize_text(document_type),
+            normalize_text(detail_level)
+        )
+        return prompt, cache_key
+    
     async def explain_clause(self, clause: str, document_type: str = "legal", 
                            detail_level: str = "medium") -> Dict[str, Any]:
         """Explain a legal or business clause in simple terms"""
         try:
-            legal_context = self.knowledge_base.get("legal_clauses", "")
-            prompt = self._build_explanation_prompt(clause, document_type, detail_level, legal_context)
-            explanation = await self._generate_response(prompt)
+            prompt, cache_key = self._prepare_explanation(clause, document_type, detail_level)
+            explanation = await self._generate_response(prompt, cache_key)
             
             return {
                 "explanation": explanation,
@@ -142,6 +245,15 @@ class ChatbotRAGService:
             logger.error(f"Error in explain_clause: {str(e)}")
             raise
     
+    async def explain_clause_stream(self, clause: str, document_type: str = "legal",
+                                    detail_level: str = "medium") -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Streaming variant of ``explain_clause`` yielding ``chunk`` events and a final ``done`` event"""
+        prompt, cache_key = self._prepare_explanation(clause, document_type, detail_level)
+        async for text in self._generate_response_stream(prompt, cache_key):
+            yield "chunk", {"text": text}
+        
+        yield "done", {"sources": ["legal_knowledge_base"], "confidence": 0.85}
+    
     async def generate_content_structure(self, content_type: str, user_info: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate structured content based on user input - separate from document creation
@@ -314,12 +426,12 @@ class ChatbotRAGService:
         """Parse AI response into structured content"""
         try:
             import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                return json.loads(json_str)
-            else:
-                return self._get_fallback_structure(content_type)
+            with time_stage("json_parse"):
+                json_match = re.search(r'\{.*\}', response, re.DOTALL)
+                if json_match:
+                    json_str = json_match.group()
+                    return json.loads(json_str)
+            return self._get_fallback_structure(content_type)
         except Exception as e:
             logger.error(f"Error parsing AI response: {str(e)}")
             return self._get_fallback_structure(content_type)
@@ -342,29 +454,47 @@ class ChatbotRAGService:
             }
         return {"error": "Fallback content not available"}
     
+    def _search_chunks(self, snapshot, question: str, top_k: int) -> List[str]:
+        """Rank passage ids using the configured retrieval mode (bm25, dense or hybrid)"""
+        if self.retrieval_mode == "dense":
+            return [chunk_id for chunk_id, _ in snapshot.dense_index.search(question, top_k)]
+        
+        lexical = [chunk_id for chunk_id, _ in snapshot.search_index.search(question, top_k)]
+        if self.retrieval_mode != "hybrid":
+            return lexical
+        
+        # Reciprocal rank fusion of the lexical and semantic rankings
+        semantic = [chunk_id for chunk_id, _ in snapshot.dense_index.search(question, top_k)]
+        fused = {}
+        for ranking in (lexical, semantic):
+            for rank, chunk_id in enumerate(ranking):
+                fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (60 + rank)
+        return sorted(fused, key=fused.get, reverse=True)[:top_k]
+    
     # Helper methods remain the same...
     def _retrieve_relevant_context(self, question: str, startup_type: Optional[str] = None) -> str:
-        """Retrieve relevant context from knowledge base"""
-        relevant_docs = []
-        question_lower = question.lower()
+        """Retrieve the best ranked passages for the question within the context budget"""
+        snapshot = self.kb.snapshot
+        relevant_passages = []
+        remaining = settings.rag_context_char_budget
         
-        for doc_name, content in self.knowledge_base.items():
-            if any(keyword in content.lower() for keyword in question_lower.split()):
-                relevant_docs.append(f"From {doc_name}: {content[:500]}...")
+        for chunk_id in self._search_chunks(snapshot, question, settings.rag_top_k):
+            if remaining <= 0:
+                break
+            chunk = snapshot.chunks[chunk_id]
+            # Collapse whitespace so each passage stays on a single "From ..." line
+            passage = " ".join(chunk["text"].split())
+            if len(passage) > remaining:
+                if relevant_passages:
+                    continue
+                passage = passage[:remaining]
+            relevant_passages.append(f"From {chunk['source']}: {passage}")
+            remaining -= len(passage)
         
-        return "\n\n".join(relevant_docs) if relevant_docs else "No specific context found."
-    
-    import re
-
-    def _build_qa_prompt(
-        self,
-        question: str,
-        context: str,
-        additional_context: Optional[str] = None,
-        startup_type: Optional[str] = None
-    ) -> str:
-        """Build a dynamic prompt for startup advisory Q&A with better response length control."""
+        return "\n\n".join(relevant_passages) if relevant_passages else "No specific context found."
 
+    def _classify_response_type(self, question: str) -> str:
+        """Classify the desired answer length (detailed, brief or moderate) from the question wording"""
         # Define keywords that indicate the desired response length and complexity
         detailed_keywords = [
             "explain", "describe", "elaborate", "analyze", "in detail", "breakdown", 
@@ -383,13 +513,25 @@ class ChatbotRAGService:
         
         # Classify response type based on keywords and question length
         if has_detailed_keywords:
-            response_type = "detailed"
+            return "detailed"
         elif has_brief_keywords:
-            response_type = "brief"
+            return "brief"
         elif question_length > 15:  # Longer questions typically need more detailed answers
-            response_type = "moderate"
+            return "moderate"
         else:
-            response_type = "moderate"  # Default to moderate length
+            return "moderate"  # Default to moderate length
+
+    def _build_qa_prompt(
+        self,
+        question: str,
+        context: str,
+        additional_context: Optional[str] = None,
+        startup_type: Optional[str] = None,
+        response_type: Optional[str] = None
+    ) -> str:
+        """Build a dynamic prompt for startup advisory Q&A with better response length control."""
+
+        response_type = response_type or self._classify_response_type(question)
         
         # Create base prompt
         prompt = (
@@ -469,6 +611,15 @@ class ChatbotRAGService:
         confidence += min(0.1, term_matches * 0.02)
         return round(confidence, 2)
 
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the exact and semantic response caches"""
+        return {
+            "exact": {"enabled": False} if self.response_cache is None
+            else {"enabled": True, **self.response_cache.stats()},
+            "semantic": {"enabled": False} if self.semantic_cache is None
+            else {"enabled": True, **self.semantic_cache.stats()}
+        }
+
     def is_ai_configured(self) -> bool:
         """Check if the AI service is properly configured"""
-        return self.model is not None
+        return self.llm.is_configured
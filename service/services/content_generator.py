@@ -1,10 +1,9 @@
-import google.generativeai as genai
 from typing import Dict, Any
-import os
 import logging
 import json
 from datetime import datetime
-from config import settings
+from services.llm_gateway import get_llm_gateway
+from utils.metrics import time_stage
 
 logger = logging.getLogger(__name__)
 
@@ -14,31 +13,12 @@ class ContentGeneratorService:
     """
     
     def __init__(self):
-        self.setup_gemini()
-    
-    def setup_gemini(self):
-        """Configure Gemini AI with API key"""
-        api_key = settings.gemini_api_key or os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            logger.warning("GEMINI_API_KEY not found in environment variables or settings")
-            self.model = None
-            return
-        
-        try:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-            logger.info("Gemini AI configured successfully for content generation")
-        except Exception as e:
-            logger.error(f"Error configuring Gemini AI: {str(e)}")
-            self.model = None
+        self.llm = get_llm_gateway()
     
     async def _generate_response(self, prompt: str) -> str:
         """Generate a response using Gemini AI"""
-        if not self.model:
-            raise Exception("Gemini AI is not configured. Please check your API key.")
-        
         try:
-            response = await self.model.generate_content_async(prompt)
+            response = await self.llm.generate(prompt, endpoint="content_generation")
             logger.info(f"Gemini response received, length: {len(response.text) if response.text else 0}")
             
             if not response.text:
@@ -175,7 +155,8 @@ class ContentGeneratorService:
                 raise Exception("Empty response from AI")
             
             try:
-                content_structure = json.loads(response)
+                with time_stage("json_parse"):
+                    content_structure = json.loads(response)
                 return content_structure
             except json.JSONDecodeError as json_err:
                 logger.error(f"Error parsing JSON response: {str(json_err)}")
@@ -285,7 +266,8 @@ class ContentGeneratorService:
                 raise Exception("Empty response from AI")
             
             try:
-                content_structure = json.loads(response)
+                with time_stage("json_parse"):
+                    content_structure = json.loads(response)
                 return content_structure
             except json.JSONDecodeError as json_err:
                 logger.error(f"Error parsing JSON response: {str(json_err)}")
@@ -354,7 +336,8 @@ class ContentGeneratorService:
                 raise Exception("Empty response from AI")
             
             try:
-                content_structure = json.loads(response)
+                with time_stage("json_parse"):
+                    content_structure = json.loads(response)
                 return content_structure
             except json.JSONDecodeError as json_err:
                 logger.error(f"Error parsing JSON response: {str(json_err)}")
@@ -429,7 +412,8 @@ class ContentGeneratorService:
                 raise Exception("Empty response from AI")
             
             try:
-                content_structure = json.loads(response)
+                with time_stage("json_parse"):
+                    content_structure = json.loads(response)
                 return content_structure
             except json.JSONDecodeError as json_err:
                 logger.error(f"Error parsing JSON response: {str(json_err)}")
@@ -514,7 +498,8 @@ class ContentGeneratorService:
                 raise Exception("Empty response from AI")
             
             try:
-                content_structure = json.loads(response)
+                with time_stage("json_parse"):
+                    content_structure = json.loads(response)
                 return content_structure
             except json.JSONDecodeError as json_err:
                 logger.error(f"Error parsing JSON response for Terms of Service: {str(json_err)}")
@@ -601,7 +586,8 @@ class ContentGeneratorService:
                 raise Exception("Empty response from AI")
             
             try:
-                content_structure = json.loads(response)
+                with time_stage("json_parse"):
+                    content_structure = json.loads(response)
                 return content_structure
             except json.JSONDecodeError as json_err:
                 logger.error(f"Error parsing JSON response for Privacy Policy: {str(json_err)}")
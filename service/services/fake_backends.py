@@ -0,0 +1,203 @@
+"""
+Offline stand-ins for Gemini and Serper used for load testing.
+
+Selected with ``llm_backend = "fake"`` and ``search_backend = "fake"``. Responses are
+deterministic functions of the request and latencies are drawn from a seeded
+distribution, so benchmark runs are reproducible on a machine without network access
+and measure only this service's own overhead.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+MARKET_ANALYSIS_FIELDS = [
+    "market_overview", "key_insights", "market_size", "competitors",
+    "trends", "opportunities", "challenges", "recommendations"
+]
+
+
+class LatencyModel:
+    """
+    Seeded latency sampler.
+
+    ``distribution`` is ``fixed`` (always the median), ``uniform`` (median ± sigma·median)
+    or ``lognormal`` (median ``median_ms``, shape ``sigma``), the latter giving the long
+    right tail real providers show.
+    """
+
+    def __init__(self, median_ms: float = 800.0, distribution: str = "lognormal",
+                 sigma: float = 0.5, seed: int = 0):
+        self.median_ms = median_ms
+        self.distribution = distribution
+        self.sigma = sigma
+        self._random = random.Random(seed)
+
+    def sample_seconds(self) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        if self.distribution == "fixed":
+            return self.median_ms / 1000
+        if self.distribution == "uniform":
+            spread = self.median_ms * min(self.sigma, 1.0)
+            return self._random.uniform(self.median_ms - spread, self.median_ms + spread) / 1000
+        return self.median_ms * self._random.lognormvariate(0.0, self.sigma) / 1000
+
+
+def _seed_for(*parts: Any) -> int:
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return int.from_bytes(hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _prompt_text(contents: Any) -> str:
+    """Flatten the text parts of a ``generate_content`` payload"""
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, (list, tuple)):
+        return "\n".join(part for part in contents if isinstance(part, str))
+    return str(contents)
+
+
+def _embedded_json_template(prompt: str) -> Optional[Any]:
+    """Return the first JSON object spelled out in the prompt, if any"""
+    start = prompt.find("{")
+    while start != -1:
+        depth = 0
+        for end in range(start, len(prompt)):
+            if prompt[end] == "{":
+                depth += 1
+            elif prompt[end] == "}":
+                depth -= 1
+                if depth == 0:
+                    try:
+                        return json.loads(prompt[start:end + 1])
+                    except ValueError:
+                        break
+        start = prompt.find("{", start + 1)
+    return None
+
+
+class FakeResponse:
+    """Mimics the ``text`` attribute of a Gemini response or stream chunk"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStreamResponse:
+    """Async iterator of ``FakeResponse`` chunks released at a steady rate"""
+
+    def __init__(self, chunks: List[str], chunk_delay: float):
+        self._chunks = chunks
+        self._chunk_delay = chunk_delay
+
+    async def __aiter__(self) -> AsyncIterator[FakeResponse]:
+        for chunk in self._chunks:
+            await asyncio.sleep(self._chunk_delay)
+            yield FakeResponse(chunk)
+
+
+class FakeGenerativeModel:
+    """
+    Drop-in for ``genai.GenerativeModel`` with canned or templated answers.
+
+    Prompts asking for JSON get the JSON skeleton embedded in the prompt echoed back
+    (or a built-in template for market analyses and bills); everything else gets a
+    deterministic advisory text. Streaming spreads the sampled latency over the chunks,
+    with a fifth of it before the first chunk.
+    """
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+
+    def _answer(self, prompt: str) -> str:
+        rng = random.Random(_seed_for(prompt))
+        wants_json = "json" in prompt.lower()
+
+        if wants_json and "market_overview" in prompt:
+            return json.dumps({
+                field: (f"Synthetic {field.replace('_', ' ')} #{rng.randint(1, 999)}"
+                        if field in ("market_overview", "market_size")
+                        else [f"Synthetic {field.replace('_', ' ')} item {i + 1}" for i in range(4)])
+                for field in MARKET_ANALYSIS_FIELDS
+            })
+        if wants_json and "vendor_name" in prompt:
+            total = round(rng.uniform(20, 2000), 2)
+            return json.dumps([{
+                "vendor_name": "Synthetic Supplies Ltd", "bill_number": f"INV-{rng.randint(1000, 9999)}",
+                "bill_date": "2024-01-15", "subtotal": round(total / 1.18, 2), "tax_amount": round(total - total / 1.18, 2),
+                "total_amount": total, "currency": "USD", "bill_type": "invoice", "confidence": 0.9,
+                "items": [{"description": "Synthetic item", "quantity": 1, "unit_price": total, "total_price": total}]
+            }])
+        if wants_json:
+            template = _embedded_json_template(prompt)
+            if template is not None:
+                return json.dumps(template)
+            return json.dumps({"summary": "Synthetic structured response", "sections": []})
+
+        topics = ["runway", "unit economics", "hiring plan", "customer discovery", "pricing", "fundraising"]
+        rng.shuffle(topics)
+        lines = [
+            f"Key insight: focus on {topics[0]} before scaling.",
+            f"We recommend reviewing {topics[1]} every month.",
+            f"You should consider benchmarking {topics[2]} against peers.",
+            f"Important: {topics[3]} drives most early-stage risk.",
+            f"Action item: start tracking {topics[4]} weekly.",
+            f"Next step: implement a simple model for {topics[5]}.",
+        ]
+        return "\n".join(lines * 3)
+
+    async def generate_content_async(self, contents: Any, stream: bool = False, **kwargs) -> Any:
+        text = self._answer(_prompt_text(contents))
+        delay = self.latency.sample_seconds()
+        if not stream:
+            await asyncio.sleep(delay)
+            return FakeResponse(text)
+
+        await asyncio.sleep(delay * 0.2)
+        chunks = re.findall(r".{1,80}(?:\s|$)|.{1,80}", text, flags=re.S) or [text]
+        return FakeStreamResponse(chunks, delay * 0.8 / len(chunks))
+
+
+class FakeSerperClient:
+    """Returns Serper-shaped search, news and image results derived from the query"""
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+
+    async def post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency.sample_seconds())
+        query = payload.get("q", "")
+        num = int(payload.get("num", 10))
+        rng = random.Random(_seed_for(endpoint, query))
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-") or "query"
+
+        if endpoint == "news":
+            results = [{
+                "title": f"{query.title()} update {i + 1}",
+                "link": f"https://news.example.com/{slug}/{i + 1}",
+                "snippet": f"Analysts expect {query} to grow {rng.randint(5, 40)}% next year.",
+                "date": f"{i + 1} days ago",
+                "source": f"Example News {i % 3 + 1}"
+            } for i in range(num)]
+            return {"searchParameters": payload, "news": results}
+
+        if endpoint == "images":
+            results = [{
+                "title": f"{query.title()} chart {i + 1}",
+                "imageUrl": f"https://images.example.com/{slug}/{i + 1}.png",
+                "link": f"https://example.com/{slug}/charts/{i + 1}",
+                "source": "example.com"
+            } for i in range(num)]
+            return {"searchParameters": payload, "images": results}
+
+        results = [{
+            "title": f"{query.title()} - result {i + 1}",
+            "link": f"https://example.com/{slug}/{i + 1}",
+            "snippet": f"The {query} market is valued at ${rng.randint(1, 900)}B with "
+                       f"{rng.randint(3, 30)}% CAGR according to example research.",
+            "position": i + 1
+        } for i in range(num)]
+        return {"searchParameters": payload, "organic": results}
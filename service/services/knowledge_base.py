@@ -0,0 +1,205 @@
+"""
+Knowledge base loading, indexing and incremental refresh for the RAG service
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from utils.extraction_cache import ExtractionCache
+from utils.file_utils import PDFProcessor
+from utils.search_index import BM25Index
+from utils.text_chunker import chunk_text
+
+logger = logging.getLogger(__name__)
+
+STARTUP_TEMPLATES = {
+    "startup_basics": """
+            Startup fundamentals include: business model validation, market research,
+            MVP development, funding strategies, legal structure, team building,
+            and growth planning. Key stages: ideation, validation, MVP, growth, scaling.
+            """,
+    "legal_clauses": """
+            Common startup legal clauses: equity distribution, vesting schedules,
+            non-disclosure agreements, employment terms, intellectual property rights,
+            investment terms, board composition, liquidation preferences.
+            """,
+    "funding_types": """
+            Startup funding stages: Pre-seed, Seed, Series A/B/C, Bridge rounds.
+            Funding sources: bootstrapping, friends & family, angel investors,
+            venture capital, crowdfunding, government grants.
+            """
+}
+
+
+class KnowledgeBaseSnapshot:
+    """
+    Immutable view of the indexed knowledge base.
+
+    Requests read ``KnowledgeBase.snapshot`` once and use it for the whole retrieval,
+    so a refresh swapping in a new snapshot never affects a request already in flight.
+    """
+
+    def __init__(self, documents: Dict[str, str], chunks: Dict[str, Dict[str, Any]],
+                 chunks_by_source: Dict[str, List[str]], search_index: BM25Index,
+                 dense_index: Optional[Any], fingerprints: Dict[str, Dict[str, Any]]):
+        self.documents = documents
+        self.chunks = chunks
+        self.chunks_by_source = chunks_by_source
+        self.search_index = search_index
+        self.dense_index = dense_index
+        self.fingerprints = fingerprints
+
+
+class KnowledgeBase:
+    """
+    Loads .txt and .pdf files from the knowledge base directory and keeps them indexed.
+
+    Each file is fingerprinted by mtime, size and SHA-256. ``refresh`` only re-extracts
+    and re-chunks files whose content actually changed, reuses stored embeddings for
+    untouched passages, and atomically replaces ``snapshot`` when done. PDF extractions
+    are persisted by content hash, so restarts and other workers skip PyPDF2 entirely.
+    """
+
+    def __init__(self, base_path: Path, retrieval_mode: str = "bm25"):
+        self.base_path = Path(base_path)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.retrieval_mode = retrieval_mode
+        self.pdf_processor = PDFProcessor()
+        self.extraction_cache = None
+        if settings.kb_extraction_cache:
+            self.extraction_cache = ExtractionCache(self.base_path / ".cache" / "extracted")
+        self.snapshot = KnowledgeBaseSnapshot({}, {}, {}, BM25Index(), None, {})
+        self._refresh_lock = threading.Lock()
+
+    def _scan_files(self) -> Dict[str, Path]:
+        files = {}
+        if self.base_path.exists():
+            for pattern in ("*.txt", "*.pdf"):
+                for file_path in sorted(self.base_path.glob(pattern)):
+                    files[file_path.name] = file_path
+        return files
+
+    @staticmethod
+    def _hash_file(file_path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _extract(self, file_path: Path, content_hash: str) -> str:
+        if file_path.suffix.lower() == ".pdf":
+            return self._extract_pdf(file_path, content_hash)
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _extract_pdf(self, file_path: Path, content_hash: str) -> str:
+        if self.extraction_cache is None:
+            return self.pdf_processor.extract_text(str(file_path))
+        
+        cached = self.extraction_cache.get(content_hash)
+        if cached is not None:
+            return cached["text"]
+        
+        extraction = self.pdf_processor.extract_text_with_offsets(str(file_path))
+        if extraction["text"]:
+            self.extraction_cache.put(content_hash, extraction["text"], extraction["page_offsets"])
+        return extraction["text"]
+
+    def refresh(self) -> bool:
+        """
+        Bring the index up to date with the knowledge base directory.
+
+        Returns:
+            True if a new snapshot was swapped in, False if nothing changed
+        """
+        with self._refresh_lock:
+            current = self.snapshot
+            files = self._scan_files()
+            fingerprints = {}
+            changed = {}
+
+            for name, file_path in files.items():
+                try:
+                    stat = file_path.stat()
+                    previous = current.fingerprints.get(name)
+                    if previous and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size:
+                        fingerprints[name] = previous
+                        continue
+
+                    content_hash = self._hash_file(file_path)
+                    fingerprint = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": content_hash}
+                    if previous and previous["sha256"] == content_hash:
+                        # Touched but not modified; keep the existing extraction
+                        fingerprints[name] = {**fingerprint, "source": previous["source"]}
+                        continue
+
+                    fingerprints[name] = {**fingerprint, "source": file_path.stem}
+                    changed[file_path.stem] = self._extract(file_path, content_hash)
+                    logger.info(f"Loaded knowledge base file: {file_path.name}")
+                except Exception as e:
+                    logger.error(f"Error loading {file_path}: {str(e)}")
+                    if name in current.fingerprints:
+                        fingerprints[name] = current.fingerprints[name]
+
+            live_sources = {fingerprint["source"] for fingerprint in fingerprints.values()}
+            removed = {fingerprint["source"] for fingerprint in current.fingerprints.values()} - live_sources
+            if current.search_index.doc_ids and not changed and not removed:
+                return False
+
+            documents = dict(STARTUP_TEMPLATES)
+            for fingerprint in fingerprints.values():
+                source = fingerprint["source"]
+                if source in changed:
+                    if changed[source]:
+                        documents[source] = changed[source]
+                elif source in current.documents:
+                    documents[source] = current.documents[source]
+
+            chunks = {}
+            chunks_by_source = {}
+            for source, content in documents.items():
+                if current.documents.get(source) is content and source in current.chunks_by_source:
+                    chunk_ids = current.chunks_by_source[source]
+                    chunks.update({chunk_id: current.chunks[chunk_id] for chunk_id in chunk_ids})
+                else:
+                    source_chunks = chunk_text(content, source, settings.rag_chunk_size, settings.rag_chunk_overlap)
+                    chunk_ids = [chunk["id"] for chunk in source_chunks]
+                    chunks.update({chunk["id"]: chunk for chunk in source_chunks})
+                chunks_by_source[source] = chunk_ids
+
+            passages = {chunk_id: chunk["text"] for chunk_id, chunk in chunks.items()}
+            search_index = BM25Index()
+            search_index.build(passages)
+
+            dense_index = None
+            if self.retrieval_mode in ("dense", "hybrid"):
+                # Imported lazily so the default BM25 mode never pays for numpy at startup
+                from utils.embeddings import DenseVectorIndex, HashingEmbedder
+                dense_index = DenseVectorIndex(
+                    HashingEmbedder(settings.rag_embedding_dim),
+                    store_dir=self.base_path / ".index"
+                )
+                dense_index.build(passages)
+
+            self.snapshot = KnowledgeBaseSnapshot(
+                documents, chunks, chunks_by_source, search_index, dense_index, fingerprints
+            )
+            logger.info(
+                f"Knowledge base indexed {len(chunks)} passages from {len(documents)} documents "
+                f"({len(changed)} changed, {len(removed)} removed)"
+            )
+            return True
+
+    async def auto_refresh(self, interval_seconds: float) -> None:
+        """Poll the knowledge base directory forever, refreshing off the event loop"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"Error refreshing knowledge base: {str(e)}")
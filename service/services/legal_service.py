@@ -6,6 +6,7 @@ from pathlib import Path
 from datetime import datetime
 from utils.legal_generator import LegalDocumentGenerator
 from services.content_generator import ContentGeneratorService
+from config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +18,7 @@ class LegalService:
     def __init__(self):
         self.legal_generator = LegalDocumentGenerator()
         self.content_generator = ContentGeneratorService()
-        self.output_dir = Path("generated_docs/legal")
+        self.output_dir = Path(settings.legal_output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def _add_document_metadata(self, content_structure: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,422 @@
+"""
+Shared, concurrency-limited Gemini client used by every service.
+
+Gemini is configured once per worker and every call goes through ``LLMGateway``,
+which caps the number of requests in flight and queues the rest. Waiting calls are
+admitted by endpoint priority (lower runs first), FIFO within a priority, and gain
+one priority level per ``llm_priority_aging_seconds`` spent waiting so background
+work is never starved by interactive traffic. Calls made with ``coalesce=True`` that
+carry the same prompt as a call already in flight share its result instead of
+issuing another upstream request.
+
+Every call runs under a deadline with bounded, jittered retries on transient errors,
+can be hedged with a second request once it outlives the recent p95 latency, and is
+rejected immediately while the circuit breaker is open. Callers see
+``LLMUnavailableError`` whenever the provider could not produce an answer.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from config import settings
+from utils.cache import make_cache_key
+from utils.metrics import ERRORS, STAGE_LATENCY, record_llm_tokens, time_stage
+from utils.tracing import annotate, start_span, trace_span
+from utils.resilience import (
+    CircuitBreaker, LatencyTracker, LLMUnavailableError, backoff_delay, hedged, is_retryable
+)
+
+logger = logging.getLogger(__name__)
+
+def _prompt_text(contents: Any) -> str:
+    """Text parts of a ``generate_content`` payload, for token accounting"""
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, (list, tuple)):
+        return "".join(part for part in contents if isinstance(part, str))
+    return ""
+
+
+def _response_text(response: Any) -> str:
+    try:
+        return response.text or ""
+    except Exception:
+        # Blocked or empty candidates make ``.text`` raise
+        return ""
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_BATCH = 2
+
+# Overridable per endpoint with settings.llm_endpoint_priorities
+ENDPOINT_PRIORITIES: Dict[str, int] = {
+    "chatbot": PRIORITY_INTERACTIVE,
+    "chatbot_stream": PRIORITY_INTERACTIVE,
+    "fund_management": PRIORITY_DEFAULT,
+    "content_generation": PRIORITY_DEFAULT,
+    "market_research": PRIORITY_BATCH,
+    "bill_parser": PRIORITY_BATCH,
+}
+
+
+class LLMGateway:
+    """Admission-controlled access to a single shared ``GenerativeModel``"""
+
+    def __init__(self, max_in_flight: int = 8, aging_seconds: float = 10.0,
+                 endpoint_priorities: Optional[Dict[str, int]] = None,
+                 deadline_seconds: float = 60.0, max_retries: int = 2,
+                 backoff_seconds: float = 0.5, backoff_max_seconds: float = 8.0,
+                 hedge_percentile: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.max_in_flight = max(1, max_in_flight)
+        self.aging_seconds = aging_seconds
+        self.endpoint_priorities = {**ENDPOINT_PRIORITIES, **(endpoint_priorities or {})}
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.model = None
+        self._in_flight = 0
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._pending_calls: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            "requests": 0, "errors": 0, "queued": 0, "max_queue_depth": 0, "coalesced": 0,
+            "retries": 0, "hedged": 0, "timeouts": 0, "rejected": 0
+        }
+        self._endpoint_stats: Dict[str, Dict[str, Any]] = {}
+
+    def configure(self, model_name: str = "gemini-2.5-flash") -> None:
+        """Configure the Gemini SDK and build the shared model (or the offline fake)"""
+        if settings.llm_backend == "fake":
+            from services.fake_backends import FakeGenerativeModel, LatencyModel
+            self.model = FakeGenerativeModel(LatencyModel(
+                settings.fake_llm_latency_ms, settings.fake_latency_distribution,
+                settings.fake_latency_sigma, settings.fake_seed
+            ))
+            logger.info(f"Using fake LLM backend (median {settings.fake_llm_latency_ms}ms)")
+            return
+
+        api_key = settings.gemini_api_key or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            logger.warning("GEMINI_API_KEY not found in environment variables or settings")
+            return
+
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            self.model = genai.GenerativeModel(model_name)
+            logger.info(f"Gemini AI configured successfully ({model_name}, max {self.max_in_flight} in flight)")
+        except Exception as e:
+            logger.error(f"Error configuring Gemini AI: {str(e)}")
+            self.model = None
+
+    @property
+    def is_configured(self) -> bool:
+        return self.model is not None
+
+    def json_generation_config(self, schema: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        ``generation_config`` asking the model to answer in JSON, constrained to ``schema``
+        when the SDK supports response schemas. None when the installed SDK has no JSON
+        mode, in which case callers rely on the prompt and parse the text themselves.
+        """
+        if settings.llm_backend == "fake":
+            fields = {"response_mime_type", "response_schema"}
+        else:
+            try:
+                import google.ai.generativelanguage as glm
+                fields = set(glm.GenerationConfig.meta.fields)
+            except Exception:
+                fields = set()
+
+        if "response_mime_type" not in fields:
+            return None
+        config = {"response_mime_type": "application/json"}
+        if schema is not None and "response_schema" in fields:
+            config["response_schema"] = schema
+        return config
+
+    def is_available(self) -> bool:
+        """Configured and not currently failing fast"""
+        return self.is_configured and not self.breaker.is_open()
+
+    def _check_available(self) -> None:
+        if self.model is None:
+            ERRORS.inc(component="llm", type="not_configured")
+            raise LLMUnavailableError("AI service is not configured")
+        if not self.breaker.allow():
+            self._stats["rejected"] += 1
+            ERRORS.inc(component="llm", type="circuit_open")
+            raise LLMUnavailableError("AI service is temporarily unavailable, please retry shortly")
+
+    def _can_hedge(self) -> bool:
+        # Only hedge into spare capacity; a hedge that has to queue cannot help the tail
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._stats["hedged"] += 1
+            return True
+        return False
+
+    def _priority(self, endpoint: str) -> int:
+        return self.endpoint_priorities.get(endpoint, PRIORITY_DEFAULT)
+
+    async def _acquire(self, endpoint: str) -> float:
+        enqueued = time.perf_counter()
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            waiter = [self._priority(endpoint), enqueued, next(self._sequence), future]
+            self._waiters.append(waiter)
+            self._stats["queued"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiters))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif future.done() and not future.cancelled():
+                    # The slot was handed over just before cancellation; pass it on
+                    self._release()
+                raise
+
+        waited = time.perf_counter() - enqueued
+        STAGE_LATENCY.observe(waited, stage="llm_queue")
+        endpoint_stats = self._endpoint_stats.setdefault(
+            endpoint, {"requests": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+        )
+        endpoint_stats["requests"] += 1
+        endpoint_stats["wait_seconds_total"] += waited
+        endpoint_stats["wait_seconds_max"] = max(endpoint_stats["wait_seconds_max"], waited)
+        self._stats["requests"] += 1
+        return waited
+
+    def _release(self) -> None:
+        now = time.perf_counter()
+        while self._waiters:
+            # Effective priority improves by one level per aging interval spent waiting
+            waiter = min(
+                self._waiters,
+                key=lambda w: (w[0] - (now - w[1]) / self.aging_seconds if self.aging_seconds > 0 else w[0], w[2])
+            )
+            self._waiters.remove(waiter)
+            if not waiter[3].done():
+                # Hand the slot straight to the waiter; the in-flight count is unchanged
+                waiter[3].set_result(None)
+                return
+        self._in_flight -= 1
+
+    async def generate(self, contents: Any, endpoint: str = "default", coalesce: bool = False, **kwargs) -> Any:
+        """
+        Run ``generate_content_async`` once a slot is free and return the SDK response.
+
+        With ``coalesce=True``, concurrent calls with identical contents and options await
+        one shared upstream call (single-flight). Nothing is kept once that call finishes.
+        Raises ``LLMUnavailableError`` if the provider is unconfigured, failing fast, or
+        did not answer within the deadline after retries.
+        """
+        self._check_available()
+
+        if not coalesce:
+            return await self._generate(contents, endpoint, **kwargs)
+
+        key = make_cache_key(contents, kwargs)
+        call = self._pending_calls.get(key)
+        if call is None:
+            # Run as its own task so one caller disconnecting doesn't cancel the others
+            call = asyncio.ensure_future(self._generate(contents, endpoint, **kwargs))
+            self._pending_calls[key] = call
+            call.add_done_callback(lambda _: self._pending_calls.pop(key, None))
+            return await asyncio.shield(call)
+
+        self._stats["coalesced"] += 1
+        # The shared call's spans belong to the request that started it
+        with trace_span("llm_coalesced", endpoint=endpoint):
+            return await asyncio.shield(call)
+
+    async def _generate(self, contents: Any, endpoint: str, **kwargs) -> Any:
+        try:
+            with time_stage("llm_wait", endpoint=endpoint):
+                response = await asyncio.wait_for(
+                    self._generate_with_retries(contents, endpoint, kwargs), self.deadline_seconds
+                )
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            ERRORS.inc(component="llm", type="timeout")
+            self.breaker.record_failure()
+            raise LLMUnavailableError(f"AI service did not respond within {self.deadline_seconds:g}s")
+        except Exception as e:
+            ERRORS.inc(component="llm", type=type(e).__name__)
+            if not is_retryable(e):
+                # The provider answered; the request itself was bad
+                self.breaker.record_success()
+                raise
+            self.breaker.record_failure()
+            raise LLMUnavailableError(f"AI service is unavailable: {str(e)}") from e
+
+        self.breaker.record_success()
+        return response
+
+    async def _generate_with_retries(self, contents: Any, endpoint: str, kwargs: Dict[str, Any]) -> Any:
+        hedge_after = self.latency.percentile(self.hedge_percentile) if self.hedge_percentile else None
+        attempt = 0
+        while True:
+            try:
+                return await hedged(lambda: self._attempt(contents, endpoint, kwargs), hedge_after, self._can_hedge)
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt, self.backoff_seconds, self.backoff_max_seconds)
+                logger.warning(f"Retrying {endpoint} Gemini call in {delay:.2f}s after: {str(e)}")
+                self._stats["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, contents: Any, endpoint: str, kwargs: Dict[str, Any]) -> Any:
+        with trace_span("llm_call", endpoint=endpoint):
+            annotate(queue_seconds=round(await self._acquire(endpoint), 6))
+            started = time.perf_counter()
+            try:
+                response = await self.model.generate_content_async(contents, **kwargs)
+                self.latency.record(time.perf_counter() - started)
+                record_llm_tokens(
+                    endpoint, len(_prompt_text(contents)), len(_response_text(response)),
+                    getattr(response, "usage_metadata", None)
+                )
+                return response
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+            finally:
+                self._release()
+
+    async def stream(self, contents: Any, endpoint: str = "default", **kwargs) -> AsyncIterator[Any]:
+        """
+        Yield streamed response chunks, holding the slot until the stream ends or is closed.
+
+        The deadline and retries apply until the first chunk arrives; once text has been
+        sent to the client a failure is raised as is, since the stream cannot be replayed.
+        The ``llm_wait`` stage of a stream is its time to first chunk.
+        """
+        self._check_available()
+
+        # Not made current: the consumer may resume this generator from another task
+        span = start_span("llm_stream", endpoint=endpoint)
+        attempt = 0
+        started = time.perf_counter()
+        error = None
+        try:
+            while True:
+                waited = await self._acquire(endpoint)
+                if span is not None:
+                    span.set_attribute("queue_seconds", round(waited, 6))
+                received = False
+                output_chars = 0
+                usage = None
+                try:
+                    response = await asyncio.wait_for(
+                        self.model.generate_content_async(contents, stream=True, **kwargs), self.deadline_seconds
+                    )
+                    chunks = response.__aiter__()
+                    try:
+                        first = await asyncio.wait_for(chunks.__anext__(), self.deadline_seconds)
+                    except StopAsyncIteration:
+                        self.breaker.record_success()
+                        return
+                    received = True
+                    STAGE_LATENCY.observe(time.perf_counter() - started, stage="llm_wait")
+                    if span is not None:
+                        span.set_attribute("first_chunk_seconds", round(time.perf_counter() - started, 6))
+                    self.breaker.record_success()
+                    chunk = first
+                    while True:
+                        output_chars += len(_response_text(chunk))
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        yield chunk
+                        try:
+                            chunk = await chunks.__anext__()
+                        except StopAsyncIteration:
+                            return
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    ERRORS.inc(component="llm", type=type(e).__name__)
+                    if received:
+                        raise
+                    if not is_retryable(e):
+                        self.breaker.record_success()
+                        raise
+                    if attempt >= self.max_retries:
+                        self.breaker.record_failure()
+                        raise LLMUnavailableError(f"AI service is unavailable: {str(e)}") from e
+                finally:
+                    self._release()
+                    if received:
+                        record_llm_tokens(endpoint, len(_prompt_text(contents)), output_chars, usage)
+
+                delay = backoff_delay(attempt, self.backoff_seconds, self.backoff_max_seconds)
+                logger.warning(f"Retrying {endpoint} Gemini stream in {delay:.2f}s")
+                self._stats["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if span is not None:
+                span.set_attribute("attempts", attempt + 1)
+                span.end(error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight count and per-endpoint wait times"""
+        return {
+            **self._stats,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "latency_p95_seconds": self.latency.percentile(0.95),
+            "circuit_breaker": self.breaker.stats(),
+            "endpoints": {
+                endpoint: {
+                    **endpoint_stats,
+                    "priority": self._priority(endpoint),
+                    "wait_seconds_avg": round(endpoint_stats["wait_seconds_total"] / endpoint_stats["requests"], 6)
+                }
+                for endpoint, endpoint_stats in self._endpoint_stats.items()
+            }
+        }
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Return the worker-wide gateway, configuring Gemini on first use"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                gateway = LLMGateway(
+                    max_in_flight=settings.llm_max_in_flight,
+                    aging_seconds=settings.llm_priority_aging_seconds,
+                    endpoint_priorities=settings.llm_endpoint_priorities,
+                    deadline_seconds=settings.llm_deadline_seconds,
+                    max_retries=settings.llm_max_retries,
+                    backoff_seconds=settings.llm_retry_backoff_seconds,
+                    backoff_max_seconds=settings.llm_retry_backoff_max_seconds,
+                    hedge_percentile=settings.llm_hedge_percentile if settings.llm_hedge_requests else None,
+                    breaker=CircuitBreaker(
+                        settings.llm_breaker_failure_threshold, settings.llm_breaker_reset_seconds
+                    )
+                )
+                gateway.configure(settings.llm_model_name)
+                _gateway = gateway
+    return _gateway
@@ -3,30 +3,247 @@ Market Research Service using Serper API and Gemini AI
 """
 import asyncio
 import json
-from typing import Dict, List, Optional
-import aiohttp
-import google.generativeai as genai
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 from config import settings
+from services.llm_gateway import get_llm_gateway
+from utils.cache import TwoTierCache, make_cache_key
+from utils.json_repair import extract_json
+from utils.metrics import CACHE_REQUESTS, ERRORS, time_stage
+from utils.search_compaction import compact_search_data
+from utils.tracing import annotate, start_span, trace_span
+from utils.resilience import LLMUnavailableError
+
+logger = logging.getLogger(__name__)
+
+SERPER_API_LABELS = {"search": "API", "news": "News API", "images": "Images API"}
+SERPER_RESULT_KEYS = {"search": "organic", "news": "news", "images": "images"}
+
+MARKET_ANALYSIS_FIELDS = [
+    'market_overview', 'key_insights', 'market_size', 'competitors',
+    'trends', 'opportunities', 'challenges', 'recommendations'
+]
+
+# Response schema for JSON mode: the two summaries are strings, every other field a list of strings
+MARKET_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        field: {"type": "STRING"} if field in ('market_overview', 'market_size')
+        else {"type": "ARRAY", "items": {"type": "STRING"}}
+        for field in MARKET_ANALYSIS_FIELDS
+    },
+    "required": MARKET_ANALYSIS_FIELDS
+}
 
 class MarketResearchService:
     def __init__(self):
         self.serper_api_key = settings.serper_api_key
-        self.gemini_api_key = settings.gemini_api_key
-
-        genai.configure(api_key=self.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.llm = get_llm_gateway()
         
         self.serper_base_url = "https://google.serper.dev"
+        
+        # Created on first use so it binds to the running event loop
+        self._session = None
+        self._session_loop = None
+        
+        # Serper results are cached for a per-endpoint TTL and then served stale for up to
+        # serper_cache_stale_seconds while a background fetch refreshes them
+        self.serper_cache = None
+        self.serper_cache_ttls = {
+            "search": settings.serper_cache_search_ttl_seconds,
+            "news": settings.serper_cache_news_ttl_seconds,
+            "images": settings.serper_cache_images_ttl_seconds
+        }
+        if settings.serper_cache_enabled:
+            self.serper_cache = TwoTierCache(
+                "serper",
+                max_entries=settings.serper_cache_max_entries,
+                ttl_seconds=max(self.serper_cache_ttls.values()) + settings.serper_cache_stale_seconds,
+                disk_path=settings.serper_cache_path or None
+            )
+        self._pending_fetches: Dict[str, asyncio.Future] = {}
+        
+        # Caps Serper requests in flight per worker; created per event loop like the session
+        self._request_slots = None
+        self._request_slots_loop = None
+        
+        self.search_client = None
+        if settings.search_backend == "fake":
+            from services.fake_backends import FakeSerperClient, LatencyModel
+            self.search_client = FakeSerperClient(LatencyModel(
+                settings.fake_search_latency_ms, settings.fake_latency_distribution,
+                settings.fake_latency_sigma, settings.fake_seed
+            ))
+    
+    def _get_session(self):
+        """
+        Return the worker's pooled Serper session, creating it on first use.
+        
+        Connections are kept alive and reused across requests, DNS lookups are cached and
+        concurrent connections to Serper are capped, so a fan-out of searches pays for the
+        TCP and TLS handshakes once instead of once per call.
+        """
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=settings.serper_pool_size,
+                limit_per_host=settings.serper_pool_per_host,
+                ttl_dns_cache=settings.serper_dns_cache_seconds,
+                keepalive_timeout=settings.serper_keepalive_seconds,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=settings.serper_timeout_seconds,
+                    sock_connect=settings.serper_connect_timeout_seconds
+                ),
+                headers={
+                    'X-API-KEY': self.serper_api_key,
+                    'Content-Type': 'application/json',
+                }
+            )
+            self._session_loop = loop
+        return self._session
+    
+    def _get_request_slots(self) -> asyncio.Semaphore:
+        """Semaphore limiting concurrent Serper requests (all go to one host) on this loop"""
+        loop = asyncio.get_running_loop()
+        if self._request_slots is None or self._request_slots_loop is not loop:
+            self._request_slots = asyncio.Semaphore(max(1, settings.serper_max_concurrent_requests))
+            self._request_slots_loop = loop
+        return self._request_slots
+    
+    async def close(self) -> None:
+        """Close the pooled Serper session and its connections"""
+        for fetch in list(self._pending_fetches.values()):
+            fetch.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+    
+    async def _post_serper(self, endpoint: str, payload: Dict) -> Dict:
+        """
+        POST a query to a Serper endpoint (search, news or images)
+        """
+        # Wait for a slot before the request so queueing doesn't eat into the HTTP timeout
+        async with self._get_request_slots():
+            with time_stage("serper_fetch", endpoint=endpoint, query=payload.get("q", "")):
+                try:
+                    if self.search_client is not None:
+                        return await self.search_client.post(endpoint, payload)
+                    
+                    async with self._get_session().post(
+                        f"{self.serper_base_url}/{endpoint}",
+                        json=payload
+                    ) as response:
+                        if response.status == 200:
+                            return await response.json()
+                        else:
+                            raise Exception(f"Serper {SERPER_API_LABELS[endpoint]} error: {response.status}")
+                except Exception as e:
+                    ERRORS.inc(component="serper", type=type(e).__name__)
+                    raise
+    
+    async def _cached_serper(self, endpoint: str, payload: Dict) -> Dict:
+        """
+        Serper lookup through the cache, keyed on (endpoint, query, gl, num).
+        
+        Fresh entries are returned directly. Entries past their TTL but within the stale
+        window are returned as well, with a background fetch refreshing them. Concurrent
+        misses for the same key share one upstream call.
+        """
+        if self.serper_cache is None:
+            return await self._post_serper(endpoint, payload)
+        
+        key = make_cache_key("serper", endpoint, payload.get("q"), payload.get("gl"), payload.get("num"))
+        entry = self.serper_cache.get(key)
+        if entry is not None:
+            if time.time() - entry["fetched_at"] >= self.serper_cache_ttls[endpoint]:
+                CACHE_REQUESTS.inc(cache="serper", result="stale")
+                self._fetch_into_cache(key, endpoint, payload)
+            return entry["data"]
+        
+        return await asyncio.shield(self._fetch_into_cache(key, endpoint, payload))
+    
+    def _fetch_into_cache(self, key: str, endpoint: str, payload: Dict) -> asyncio.Future:
+        """Start (or join) the upstream fetch for ``key``; successful results are cached"""
+        fetch = self._pending_fetches.get(key)
+        if fetch is None:
+            # Own task so it finishes even if the request that started it goes away
+            fetch = asyncio.ensure_future(self._fetch_and_store(key, endpoint, payload))
+            self._pending_fetches[key] = fetch
+            fetch.add_done_callback(lambda done: self._finish_fetch(key, done))
+        return fetch
+    
+    async def _fetch_and_store(self, key: str, endpoint: str, payload: Dict) -> Dict:
+        data = await self._post_serper(endpoint, payload)
+        self.serper_cache.set(
+            key, {"fetched_at": time.time(), "data": data},
+            ttl_seconds=self.serper_cache_ttls[endpoint] + settings.serper_cache_stale_seconds
+        )
+        return data
+    
+    def _finish_fetch(self, key: str, fetch: asyncio.Future) -> None:
+        self._pending_fetches.pop(key, None)
+        # Background refreshes have no awaiting caller; don't let their errors go unseen
+        if not fetch.cancelled() and fetch.exception() is not None:
+            logger.warning(f"Error fetching Serper results for cache: {str(fetch.exception())}")
+    
+    def cache_stats(self) -> Optional[Dict]:
+        """Serper cache counters, or None when the cache is disabled"""
+        return self.serper_cache.stats() if self.serper_cache is not None else None
+    
+    def _search(self, endpoint: str, query: str, location: str):
+        if endpoint == "news":
+            return self.search_news_data(query, location)
+        if endpoint == "images":
+            return self.search_images(query)
+        return self.search_market_data(query, location)
+    
+    async def fan_out(self, searches: List[Tuple[str, str]], location: str = "us") -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Run ``(endpoint, query)`` searches concurrently in a single wave
+        
+        Yields ``(index, result)`` pairs in completion order, so callers can use fast
+        results while slow ones are still running. Each search is bounded by
+        ``serper_task_timeout_seconds``; a failed or timed-out search yields its exception
+        as the result. Concurrency against Serper is capped in ``_post_serper``.
+        """
+        timeout = settings.serper_task_timeout_seconds
+        
+        async def run(index: int, endpoint: str, query: str) -> Tuple[int, Any]:
+            try:
+                return index, await asyncio.wait_for(self._search(endpoint, query, location), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Serper {endpoint} request timed out after {timeout:g}s: {query}")
+                return index, TimeoutError(f"Serper {endpoint} request timed out after {timeout:g}s")
+            except Exception as e:
+                logger.warning(f"Serper {endpoint} request failed: {str(e)}")
+                return index, e
+        
+        tasks = [asyncio.ensure_future(run(index, endpoint, query)) for index, (endpoint, query) in enumerate(searches)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def run_searches(self, searches: List[Tuple[str, str]], location: str = "us") -> List[Any]:
+        """Results of ``fan_out`` in the order of ``searches``"""
+        results: List[Any] = [None] * len(searches)
+        async for index, result in self.fan_out(searches, location):
+            results[index] = result
+        return results
     
     async def search_market_data(self, query: str, location: str = "us") -> Dict:
         """
         Search for market data using Serper API
         """
-        headers = {
-            'X-API-KEY': self.serper_api_key,
-            'Content-Type': 'application/json',
-        }
-        
         payload = {
             'q': query,
             'gl': location,
@@ -34,29 +251,15 @@ class MarketResearchService:
             'num': 20
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(
-                    f"{self.serper_base_url}/search",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        raise Exception(f"Serper API error: {response.status}")
-            except Exception as e:
-                raise Exception(f"Failed to fetch search data: {str(e)}")
+        try:
+            return await self._cached_serper("search", payload)
+        except Exception as e:
+            raise Exception(f"Failed to fetch search data: {str(e)}")
     
     async def search_news_data(self, query: str, location: str = "us") -> Dict:
         """
         Search for news data using Serper API
         """
-        headers = {
-            'X-API-KEY': self.serper_api_key,
-            'Content-Type': 'application/json',
-        }
-        
         payload = {
             'q': query,
             'gl': location,
@@ -64,62 +267,54 @@ class MarketResearchService:
             'num': 15
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(
-                    f"{self.serper_base_url}/news",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        raise Exception(f"Serper News API error: {response.status}")
-            except Exception as e:
-                raise Exception(f"Failed to fetch news data: {str(e)}")
+        try:
+            return await self._cached_serper("news", payload)
+        except Exception as e:
+            raise Exception(f"Failed to fetch news data: {str(e)}")
     
     async def search_images(self, query: str) -> Dict:
         """
         Search for images using Serper API
         """
-        headers = {
-            'X-API-KEY': self.serper_api_key,
-            'Content-Type': 'application/json',
-        }
-        
         payload = {
             'q': query,
             'num': 10
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(
-                    f"{self.serper_base_url}/images",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        raise Exception(f"Serper Images API error: {response.status}")
-            except Exception as e:
-                raise Exception(f"Failed to fetch image data: {str(e)}")
+        try:
+            return await self._cached_serper("images", payload)
+        except Exception as e:
+            raise Exception(f"Failed to fetch image data: {str(e)}")
     
     async def parse_market_data_with_gemini(self, raw_data: Dict, analysis_type: str) -> Dict:
         """
         Parse and analyze market data using Gemini AI
+        
+        By default this is a single call in JSON mode (schema-constrained where the SDK
+        supports it) whose answer is parsed, and repaired if needed, locally. With
+        ``market_research_single_call`` disabled the analysis is drafted first and then
+        reformatted into JSON by a second call.
         """
-        prompt = self._generate_analysis_prompt(raw_data, analysis_type)
+        with time_stage("prompt_build"):
+            prompt = self._generate_analysis_prompt(raw_data, analysis_type)
         
         try:
-            response = await asyncio.to_thread(
-                self.model.generate_content, prompt
-            )
-            
-            analysis_text = response.text
-            
-            structure_prompt = f"""
+            if settings.market_research_single_call:
+                generation_config = self.llm.json_generation_config(MARKET_ANALYSIS_SCHEMA)
+                kwargs = {"generation_config": generation_config} if generation_config else {}
+                with trace_span("market_analysis.structured", analysis_type=analysis_type,
+                                json_mode=generation_config is not None):
+                    response = await self.llm.generate(prompt, endpoint="market_research", coalesce=True, **kwargs)
+                
+                analysis_text = response.text
+                json_text = analysis_text
+            else:
+                with trace_span("market_analysis.draft", analysis_type=analysis_type):
+                    response = await self.llm.generate(prompt, endpoint="market_research", coalesce=True)
+                
+                analysis_text = response.text
+                
+                structure_prompt = f"""
             Please convert the following market analysis into a well-structured JSON format with these sections:
             - market_overview: A brief summary
             - key_insights: Array of important findings
@@ -135,24 +330,19 @@ class MarketResearchService:
             
             Return only valid JSON without any markdown formatting.
             """
-            
-            structured_response = await asyncio.to_thread(
-                self.model.generate_content, structure_prompt
-            )
+                
+                with trace_span("market_analysis.structure", analysis_type=analysis_type):
+                    structured_response = await self.llm.generate(structure_prompt, endpoint="market_research", coalesce=True)
+                json_text = structured_response.text
             
             try:
-                json_text = structured_response.text.strip()
-                if json_text.startswith('```json'):
-                    json_text = json_text[7:-3]
-                elif json_text.startswith('```'):
-                    json_text = json_text[3:-3]
-                
-                parsed_json = json.loads(json_text)
-                
-                expected_fields = ['market_overview', 'key_insights', 'market_size', 'competitors', 'trends', 'opportunities', 'challenges', 'recommendations']
+                with time_stage("json_parse"):
+                    parsed_json = extract_json(json_text)
+                if not isinstance(parsed_json, dict):
+                    raise ValueError(f"Expected a JSON object, got {type(parsed_json).__name__}")
                 
                 result = {}
-                for field in expected_fields:
+                for field in MARKET_ANALYSIS_FIELDS:
                     if field in parsed_json:
                         result[field] = parsed_json[field]
                     elif field == 'market_overview' or field == 'market_size':
@@ -162,9 +352,8 @@ class MarketResearchService:
                 
                 return result
                 
-            except json.JSONDecodeError as e:
-                print(f"JSON parsing error: {e}")
-                print(f"Attempting to parse: {json_text[:200]}...")
+            except ValueError as e:
+                logger.warning(f"Error parsing market analysis JSON: {str(e)}; starts with: {json_text[:200]}")
                 
                 return {
                     "market_overview": analysis_text[:500] if len(analysis_text) > 500 else analysis_text,
@@ -178,18 +367,28 @@ class MarketResearchService:
                     "raw_analysis": analysis_text
                 }
                 
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to analyze data with Gemini: {str(e)}")
     
     def _generate_analysis_prompt(self, data: Dict, analysis_type: str) -> str:
         """
         Generate appropriate prompt for Gemini based on analysis type
+        
+        The search results are compacted first: only title, snippet, date and source of
+        the best-ranked unique results are kept, up to ``market_research_prompt_token_budget``.
         """
+        compact_data = compact_search_data(
+            data, settings.market_research_prompt_token_budget, settings.market_research_snippet_chars
+        )
+        annotate(search_results_kept=len(compact_data["results"]))
+        
         base_prompt = f"""
         You are an expert market research analyst. Analyze the following search results and provide detailed insights for {analysis_type}.
         
         Search Results:
-        {json.dumps(data, indent=2)}
+        {json.dumps(compact_data, ensure_ascii=False, separators=(",", ":"))}
         
         Please provide a comprehensive analysis with exactly these sections:
         1. Market Overview: A concise summary of the current market state (2-3 sentences)
@@ -216,61 +415,31 @@ class MarketResearchService:
         
         return base_prompt
     
-    async def comprehensive_market_research(self, 
-                                          market_query: str, 
-                                          location: str = "us",
-                                          include_news: bool = True,
-                                          include_images: bool = False) -> Dict:
-        """
-        Perform comprehensive market research combining search, news, and AI analysis
-        """
-        try:
-            tasks = []
-            
-            tasks.append(self.search_market_data(market_query, location))
-            
-            if include_news:
-                news_query = f"{market_query} market trends news industry"
-                tasks.append(self.search_news_data(news_query, location))
-            
-            if include_images:
-                image_query = f"{market_query} market analysis charts"
-                tasks.append(self.search_images(image_query))
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            search_data = results[0] if not isinstance(results[0], Exception) else {}
-            news_data = results[1] if len(results) > 1 and include_news and not isinstance(results[1], Exception) else {}
-            image_data = results[2] if len(results) > 2 and include_images and not isinstance(results[2], Exception) else {}
-            
-            combined_data = {
-                "search_results": search_data,
-                "news_results": news_data,
-                "image_results": image_data if include_images else {}
+    def _comprehensive_plan(self, market_query: str, include_news: bool, include_images: bool) -> "ResearchPlan":
+        searches = [("search", market_query)]
+        
+        if include_news:
+            news_query = f"{market_query} market trends news industry"
+            searches.append(("news", news_query))
+        
+        if include_images:
+            image_query = f"{market_query} market analysis charts"
+            searches.append(("images", image_query))
+        
+        def combine(results: List[Any]) -> Dict:
+            by_endpoint = {
+                endpoint: result for (endpoint, _), result in zip(searches, results)
+                if not isinstance(result, Exception)
             }
-            
-            analysis = await self.parse_market_data_with_gemini(combined_data, market_query)
-            
             return {
-                "query": market_query,
-                "location": location,
-                "timestamp": asyncio.get_event_loop().time(),
-                "raw_data": combined_data,
-                "analysis": analysis,
-                "metadata": {
-                    "search_results_count": len(search_data.get("organic", [])),
-                    "news_results_count": len(news_data.get("news", [])),
-                    "image_results_count": len(image_data.get("images", [])) if include_images else 0
-                }
+                "search_results": by_endpoint.get("search", {}),
+                "news_results": by_endpoint.get("news", {}),
+                "image_results": by_endpoint.get("images", {})
             }
-            
-        except Exception as e:
-            raise Exception(f"Comprehensive market research failed: {str(e)}")
+        
+        return ResearchPlan("comprehensive", market_query, searches, "analysis", market_query, combine)
     
-    async def competitor_analysis(self, company_name: str, industry: str, location: str = "us") -> Dict:
-        """
-        Perform competitor analysis for a specific company/industry
-        """
+    def _competitor_plan(self, company_name: str, industry: str) -> "ResearchPlan":
         queries = [
             f"{company_name} competitors {industry}",
             f"{industry} market leaders companies",
@@ -278,60 +447,20 @@ class MarketResearchService:
             f"{industry} competitive landscape analysis"
         ]
         
-        try:
-            competitor_tasks = [self.search_market_data(query, location) for query in queries]
-            competitor_results = await asyncio.gather(*competitor_tasks, return_exceptions=True)
-            
-            combined_competitor_data = {
-                "competitor_search": [r for r in competitor_results if not isinstance(r, Exception)],
+        def combine(results: List[Any]) -> Dict:
+            return {
+                "competitor_search": [r for r in results if not isinstance(r, Exception)],
                 "company": company_name,
                 "industry": industry
             }
-            
-            analysis_prompt = f"""
-            Perform a detailed competitor analysis for {company_name} in the {industry} industry.
-            
-            Based on the search results provided, create a comprehensive analysis with the following structure:
-            
-            1. Market Overview: Current state of the {industry} market and {company_name}'s position
-            2. Key Insights: 5-7 critical findings about the competitive landscape
-            3. Market Size: Information about market size, growth rate, and {company_name}'s market share
-            4. Direct Competitors: List of main competitors with brief descriptions
-            5. Market Trends: Current trends affecting the competitive landscape
-            6. Business Opportunities: Gaps and opportunities for competitive advantage
-            7. Challenges: Key competitive challenges and threats
-            8. Strategic Recommendations: Actionable recommendations for competitive positioning
-            
-            Provide specific, actionable insights based on the data. Focus on competitive intelligence.
-            
-            Search Data: {json.dumps(combined_competitor_data, indent=2)}
-            """
-            
-            competitor_analysis = await self.parse_market_data_with_gemini(
-                combined_competitor_data, 
-                f"competitor analysis for {company_name}"
-            )
-            
-            return {
-                "query": f"{company_name} competitors in {industry}",
-                "location": location,
-                "timestamp": asyncio.get_event_loop().time(),
-                "raw_data": combined_competitor_data,
-                "competitor_analysis": competitor_analysis,
-                "metadata": {
-                    "search_results_count": sum(len(r.get("organic", [])) for r in competitor_results if not isinstance(r, Exception)),
-                    "news_results_count": 0,
-                    "image_results_count": 0
-                }
-            }
-            
-        except Exception as e:
-            raise Exception(f"Competitor analysis failed: {str(e)}")
+        
+        return ResearchPlan(
+            "competitor_analysis", f"{company_name} competitors in {industry}",
+            [("search", query) for query in queries], "competitor_analysis",
+            f"competitor analysis for {company_name}", combine
+        )
     
-    async def trend_analysis(self, industry: str, time_period: str = "recent", location: str = "us") -> Dict:
-        """
-        Analyze industry trends and future predictions
-        """
+    def _trend_plan(self, industry: str, time_period: str) -> "ResearchPlan":
         trend_queries = [
             f"{industry} trends 2025 predictions",
             f"{industry} market forecast future",
@@ -339,38 +468,159 @@ class MarketResearchService:
             f"{industry} consumer behavior changes",
             f"{industry} regulatory changes impact"
         ]
+        # Web and news searches go out together; news is limited to the first three queries
+        searches = [("search", query) for query in trend_queries] + [("news", query) for query in trend_queries[:3]]
         
-        try:
-            trend_tasks = [self.search_market_data(query, location) for query in trend_queries]
-            news_tasks = [self.search_news_data(query, location) for query in trend_queries[:3]]  # Limit news queries
-            
-            trend_results = await asyncio.gather(*trend_tasks, return_exceptions=True)
-            news_results = await asyncio.gather(*news_tasks, return_exceptions=True)
-            
-            combined_trend_data = {
-                "trend_search": [r for r in trend_results if not isinstance(r, Exception)],
-                "trend_news": [r for r in news_results if not isinstance(r, Exception)],
+        def combine(results: List[Any]) -> Dict:
+            return {
+                "trend_search": [r for r in results[:len(trend_queries)] if not isinstance(r, Exception)],
+                "trend_news": [r for r in results[len(trend_queries):] if not isinstance(r, Exception)],
                 "industry": industry,
                 "time_period": time_period
             }
-            
-            trend_analysis = await self.parse_market_data_with_gemini(
-                combined_trend_data,
-                f"trend analysis for {industry} industry"
+        
+        return ResearchPlan(
+            "trend_analysis", f"{industry} trends and predictions", searches, "trend_analysis",
+            f"trend analysis for {industry} industry", combine
+        )
+    
+    @staticmethod
+    def _metadata(plan: "ResearchPlan", results: List[Any]) -> Dict:
+        counts = {"search": 0, "news": 0, "images": 0}
+        for (endpoint, _), result in zip(plan.searches, results):
+            if not isinstance(result, Exception):
+                counts[endpoint] += len(result.get(SERPER_RESULT_KEYS[endpoint], []))
+        return {
+            "search_results_count": counts["search"],
+            "news_results_count": counts["news"],
+            "image_results_count": counts["images"]
+        }
+    
+    async def _run_research(self, plan: "ResearchPlan", location: str) -> Dict:
+        """Run the plan's searches, analyze the combined results and build the report"""
+        with trace_span(f"{plan.name}.search", queries=len(plan.searches)):
+            results = await self.run_searches(plan.searches, location)
+        
+        combined_data = plan.combine(results)
+        analysis = await self.parse_market_data_with_gemini(combined_data, plan.analysis_type)
+        
+        return {
+            "query": plan.query,
+            "location": location,
+            "timestamp": asyncio.get_event_loop().time(),
+            "raw_data": combined_data,
+            plan.analysis_key: analysis,
+            "metadata": self._metadata(plan, results)
+        }
+    
+    async def _stream_research(self, plan: "ResearchPlan", location: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Streaming variant of ``_run_research``
+        
+        Yields a ``search`` event with the raw hits of each search as soon as it
+        completes, then a ``metadata`` event once all searches are in, then the
+        ``analysis`` event. An unavailable model is reported before any search is made.
+        """
+        if not self.llm.is_available():
+            raise LLMUnavailableError(
+                "AI service is temporarily unavailable, please retry shortly" if self.llm.is_configured
+                else "AI service is not configured"
+            )
+        
+        results: List[Any] = [None] * len(plan.searches)
+        # A generator can't keep a span current across yields; see utils.tracing.start_span
+        span = start_span(f"{plan.name}.search", queries=len(plan.searches))
+        try:
+            async for index, result in self.fan_out(plan.searches, location):
+                results[index] = result
+                endpoint, query = plan.searches[index]
+                event = {"index": index, "endpoint": endpoint, "query": query}
+                if isinstance(result, Exception):
+                    event["error"] = str(result)
+                else:
+                    event["results"] = result.get(SERPER_RESULT_KEYS[endpoint], [])
+                yield "search", event
+        finally:
+            if span is not None:
+                span.end()
+        
+        yield "metadata", {"query": plan.query, "location": location, **self._metadata(plan, results)}
+        
+        analysis = await self.parse_market_data_with_gemini(plan.combine(results), plan.analysis_type)
+        yield "analysis", {plan.analysis_key: analysis}
+    
+    async def comprehensive_market_research(self, 
+                                          market_query: str, 
+                                          location: str = "us",
+                                          include_news: bool = True,
+                                          include_images: bool = False) -> Dict:
+        """
+        Perform comprehensive market research combining search, news, and AI analysis
+        """
+        try:
+            return await self._run_research(
+                self._comprehensive_plan(market_query, include_news, include_images), location
             )
             
-            return {
-                "query": f"{industry} trends and predictions",
-                "location": location,
-                "timestamp": asyncio.get_event_loop().time(),
-                "raw_data": combined_trend_data,
-                "trend_analysis": trend_analysis,
-                "metadata": {
-                    "search_results_count": sum(len(r.get("organic", [])) for r in trend_results if not isinstance(r, Exception)),
-                    "news_results_count": sum(len(r.get("news", [])) for r in news_results if not isinstance(r, Exception)),
-                    "image_results_count": 0
-                }
-            }
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Comprehensive market research failed: {str(e)}")
+    
+    def comprehensive_market_research_stream(self, market_query: str, location: str = "us",
+                                             include_news: bool = True,
+                                             include_images: bool = False) -> AsyncIterator[Tuple[str, Dict]]:
+        """Streaming variant of ``comprehensive_market_research``; see ``_stream_research``"""
+        return self._stream_research(self._comprehensive_plan(market_query, include_news, include_images), location)
+    
+    async def competitor_analysis(self, company_name: str, industry: str, location: str = "us") -> Dict:
+        """
+        Perform competitor analysis for a specific company/industry
+        """
+        try:
+            return await self._run_research(self._competitor_plan(company_name, industry), location)
             
+        except LLMUnavailableError:
+            raise
         except Exception as e:
-            raise Exception(f"Trend analysis failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Competitor analysis failed: {str(e)}")
+    
+    def competitor_analysis_stream(self, company_name: str, industry: str,
+                                   location: str = "us") -> AsyncIterator[Tuple[str, Dict]]:
+        """Streaming variant of ``competitor_analysis``; see ``_stream_research``"""
+        return self._stream_research(self._competitor_plan(company_name, industry), location)
+    
+    async def trend_analysis(self, industry: str, time_period: str = "recent", location: str = "us") -> Dict:
+        """
+        Analyze industry trends and future predictions
+        """
+        try:
+            return await self._run_research(self._trend_plan(industry, time_period), location)
+            
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Trend analysis failed: {str(e)}")
+    
+    def trend_analysis_stream(self, industry: str, time_period: str = "recent",
+                              location: str = "us") -> AsyncIterator[Tuple[str, Dict]]:
+        """Streaming variant of ``trend_analysis``; see ``_stream_research``"""
+        return self._stream_research(self._trend_plan(industry, time_period), location)
+
+
+class ResearchPlan:
+    """
+    The searches behind one market research report and how their results feed the analysis
+    
+    ``combine`` turns the search results (in ``searches`` order, exceptions for failed
+    searches) into the data given to the model and returned as ``raw_data``.
+    """
+    
+    def __init__(self, name: str, query: str, searches: List[Tuple[str, str]],
+                 analysis_key: str, analysis_type: str, combine: Callable[[List[Any]], Dict]):
+        self.name = name
+        self.query = query
+        self.searches = searches
+        self.analysis_key = analysis_key
+        self.analysis_type = analysis_type
+        self.combine = combine
@@ -0,0 +1,136 @@
+"""
+Process-wide registry of shared service instances.
+
+Heavy services (knowledge base indexes, Gemini clients, reportlab stylesheets) are built
+at most once per worker, either by the background warm-up task started from the app
+lifespan or on first use, and shared by every router through FastAPI dependencies.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+from services.bill_parser_service import BillParserService
+from services.chatbot_rag import ChatbotRAGService
+from services.legal_service import LegalService
+from services.market_research_service import MarketResearchService
+
+logger = logging.getLogger(__name__)
+
+SERVICE_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "chatbot": ChatbotRAGService,
+    "legal": LegalService,
+    "market_research": MarketResearchService,
+    "bill_parser": BillParserService,
+}
+
+_instances: Dict[str, Any] = {}
+_build_seconds: Dict[str, float] = {}
+_build_errors: Dict[str, str] = {}
+_lock = threading.Lock()
+_warm_up_task: Optional[asyncio.Task] = None
+_warm_up_state = {"status": "pending", "seconds": None}
+
+
+def _get_or_create(name: str) -> Any:
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                started = time.perf_counter()
+                instance = SERVICE_FACTORIES[name]()
+                _build_seconds[name] = round(time.perf_counter() - started, 4)
+                _instances[name] = instance
+                _build_errors.pop(name, None)  # A retry after a failed warm-up succeeded
+                logger.info(f"Initialized shared {name} service in {_build_seconds[name]}s")
+    return instance
+
+
+async def _get_or_create_async(name: str) -> Any:
+    instance = _instances.get(name)
+    if instance is None:
+        # Construction parses files and configures clients; keep it off the event loop
+        instance = await asyncio.to_thread(_get_or_create, name)
+    return instance
+
+
+async def get_chatbot_service() -> ChatbotRAGService:
+    """FastAPI dependency returning the shared ChatbotRAGService"""
+    service = await _get_or_create_async("chatbot")
+    service.start_auto_refresh()
+    return service
+
+
+async def get_legal_service() -> LegalService:
+    """FastAPI dependency returning the shared LegalService"""
+    return await _get_or_create_async("legal")
+
+
+async def get_market_research_service() -> MarketResearchService:
+    """FastAPI dependency returning the shared MarketResearchService"""
+    return await _get_or_create_async("market_research")
+
+
+async def get_bill_parser_service() -> BillParserService:
+    """FastAPI dependency returning the shared BillParserService"""
+    return await _get_or_create_async("bill_parser")
+
+
+async def warm_up() -> None:
+    """Build every registered service in the background so first requests don't pay for it"""
+    _warm_up_state["status"] = "warming_up"
+    started = time.perf_counter()
+
+    for name in SERVICE_FACTORIES:
+        try:
+            await _get_or_create_async(name)
+        except Exception as e:
+            _build_errors[name] = str(e)
+            logger.error(f"Error warming up {name} service: {str(e)}")
+
+    if "chatbot" in _instances:
+        _instances["chatbot"].start_auto_refresh()
+
+    _warm_up_state["seconds"] = round(time.perf_counter() - started, 4)
+    _warm_up_state["status"] = "ready"
+    logger.info(f"Service warm-up finished in {_warm_up_state['seconds']}s")
+
+
+def readiness() -> Dict[str, Any]:
+    """Report warm-up progress and per-service construction times"""
+    return {
+        "ready": _warm_up_state["status"] == "ready",
+        "warm_up": dict(_warm_up_state),
+        "services": {
+            name: "ready" if name in _instances else ("failed" if name in _build_errors else "pending")
+            for name in SERVICE_FACTORIES
+        },
+        "build_seconds": dict(_build_seconds),
+        "errors": dict(_build_errors)
+    }
+
+
+async def startup() -> None:
+    """Start the background warm-up, or mark the worker ready for on-first-use construction"""
+    global _warm_up_task
+    if settings.warm_up_services:
+        _warm_up_task = asyncio.create_task(warm_up())
+    else:
+        _warm_up_state["status"] = "ready"
+
+
+async def shutdown() -> None:
+    """Stop the warm-up task and background work of every service built so far"""
+    if _warm_up_task is not None and not _warm_up_task.done():
+        _warm_up_task.cancel()
+
+    chatbot_service = _instances.get("chatbot")
+    if chatbot_service is not None:
+        await chatbot_service.stop_auto_refresh()
+
+    market_research_service = _instances.get("market_research")
+    if market_research_service is not None:
+        await market_research_service.close()
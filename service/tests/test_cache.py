@@ -0,0 +1,102 @@
+import pytest
+
+import utils.cache as cache_module
+from utils.cache import TwoTierCache, make_cache_key, normalize_text
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TwoTierCache("test", ttl_seconds=10)
+    cache.set("key", "value")
+
+    clock.now += 9.9
+    assert cache.get("key") == "value"
+    clock.now += 0.2
+    assert cache.get("key") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = TwoTierCache("test", ttl_seconds=10)
+    cache.set("short", "value", ttl_seconds=1)
+    cache.set("long", "value")
+
+    clock.now += 5
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TwoTierCache("test", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_instances_share_the_sqlite_tier(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = TwoTierCache("answers", disk_path=path)
+    reader = TwoTierCache("answers", disk_path=path)
+    other = TwoTierCache("other", disk_path=path)
+
+    writer.set("key", {"answer": [1, 2]})
+
+    assert reader.get("key") == {"answer": [1, 2]}
+    assert reader.stats()["disk_hits"] == 1
+    assert reader.get("key") == {"answer": [1, 2]}
+    assert reader.stats()["hits"] == 1
+    assert other.get("key") is None
+
+
+def test_expired_disk_entries_are_not_served(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    TwoTierCache("answers", ttl_seconds=10, disk_path=path).set("key", "value")
+
+    clock.now += 11
+    assert TwoTierCache("answers", disk_path=path).get("key") is None
+
+
+def test_unusable_disk_path_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = TwoTierCache("test", disk_path=str(blocker / "cache.db"))
+
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    assert cache.stats()["disk_backed"] is False
+
+
+@pytest.mark.parametrize("variant", [
+    "How do I raise a seed round?",
+    "how do i raise a SEED round",
+    "  How do I   raise a\nseed round?? ",
+])
+def test_normalized_questions_share_a_key(variant):
+    expected = make_cache_key("ask", normalize_text("how do I raise a seed round"))
+    assert make_cache_key("ask", normalize_text(variant)) == expected
+
+
+def test_key_depends_on_every_part():
+    assert make_cache_key("ask", "question", None) != make_cache_key("ask", "question", "saas")
+    assert make_cache_key({"b": 1, "a": 2}) == make_cache_key({"a": 2, "b": 1})
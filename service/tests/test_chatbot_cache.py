@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services.chatbot_rag import ChatbotRAGService
+from utils.cache import TwoTierCache
+from utils.semantic_cache import SemanticCache, question_embedder
+
+
+class FakeLLM:
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(text=self.text)
+
+    async def stream(self, prompt, **kwargs):
+        self.calls += 1
+        for part in self.text.split(" "):
+            yield SimpleNamespace(text=part)
+
+
+def make_service(text: str) -> ChatbotRAGService:
+    # Only the caching path is exercised, so the knowledge base is never loaded
+    service = ChatbotRAGService.__new__(ChatbotRAGService)
+    service.llm = FakeLLM(text)
+    service.response_cache = TwoTierCache("test")
+    service.semantic_cache = SemanticCache(question_embedder())
+    return service
+
+
+async def collect(stream) -> str:
+    return "".join([chunk async for chunk in stream])
+
+
+@pytest.mark.asyncio
+async def test_answers_are_cached():
+    service = make_service("Vesting runs four years")
+
+    assert await service._generate_response("prompt", "key", ("How does vesting work?", "scope")) == "Vesting runs four years"
+    assert await service._generate_response("prompt", "key", ("How does vesting work?", "scope")) == "Vesting runs four years"
+    assert await service._generate_response("prompt", "other", ("how does vesting work", "scope")) == "Vesting runs four years"
+    assert service.llm.calls == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("text", ["", "   "])
+async def test_empty_answers_are_not_cached(text):
+    service = make_service(text)
+
+    await service._generate_response("prompt", "key", ("How does vesting work?", "scope"))
+    await collect(service._generate_response_stream("prompt", "key", ("How does vesting work?", "scope")))
+
+    assert service.llm.calls == 2
+    assert service.response_cache.get("key") is None
+    assert service.semantic_cache.get("How does vesting work?", "scope") is None
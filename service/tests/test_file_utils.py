@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from utils.file_utils import DocumentProcessor
+
+original_process_document = DocumentProcessor.process_document
+
+
+def slow_process_document(self, file_path):
+    # Runs inside pool workers, which inherit this patch when forked
+    if "stuck" in os.path.basename(file_path):
+        with open(file_path + ".pid", "w") as pid_file:
+            pid_file.write(str(os.getpid()))
+        time.sleep(60)
+    return original_process_document(self, file_path)
+
+
+def is_running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def write_documents(directory, names):
+    for name in names:
+        (directory / name).write_text(f"Contents of {name}")
+
+
+def test_sequential_and_parallel_ingestion_agree(tmp_path):
+    write_documents(tmp_path, ["a.txt", "b.txt", "c.txt", "skip.md"])
+    processor = DocumentProcessor()
+
+    sequential = processor.batch_process_documents(str(tmp_path))
+    parallel = processor.batch_process_documents(str(tmp_path), max_workers=2, timeout=30)
+
+    assert sorted(doc["content"] for doc in sequential) == ["Contents of a.txt", "Contents of b.txt", "Contents of c.txt"]
+    assert sorted(doc["content"] for doc in parallel) == sorted(doc["content"] for doc in sequential)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork" or not os.path.isdir("/proc"),
+                    reason="needs forked workers and /proc")
+def test_stuck_document_times_out_and_its_worker_is_killed(tmp_path, monkeypatch):
+    monkeypatch.setattr(DocumentProcessor, "process_document", slow_process_document)
+    write_documents(tmp_path, ["stuck.txt", "a.txt", "b.txt", "c.txt"])
+
+    started = time.monotonic()
+    docs = DocumentProcessor().batch_process_documents(str(tmp_path), max_workers=2, timeout=1)
+
+    assert time.monotonic() - started < 20
+    assert sorted(doc["content"] for doc in docs) == ["Contents of a.txt", "Contents of b.txt", "Contents of c.txt"]
+    stuck_pid = int((tmp_path / "stuck.txt.pid").read_text())
+    deadline = time.monotonic() + 5
+    while is_running(stuck_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not is_running(stuck_pid)
@@ -0,0 +1,69 @@
+import pytest
+
+from utils.json_repair import extract_json, strip_code_fences
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', {"a": 1}),
+    ('  [1, 2, 3]\n', [1, 2, 3]),
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('```\n{"a": 1}\n```', {"a": 1}),
+    ('Here is the analysis:\n```json\n{"a": 1}\n```\nLet me know if you need more.', {"a": 1}),
+    ('Sure! {"a": 1} Hope this helps.', {"a": 1}),
+    ('```json\n{"a": 1', {"a": 1}),
+], ids=["plain", "array", "json-fence", "bare-fence", "fence-after-prose", "prose-around", "unclosed-fence"])
+def test_fenced_and_unfenced(text, expected):
+    assert extract_json(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ('{"a": [1, 2 , ] }', {"a": [1, 2]}),
+    ('{"a": True, "b": False, "c": None}', {"a": True, "b": False, "c": None}),
+    ('{"note": "True, False and None stay text", "ok": True}', {"note": "True, False and None stay text", "ok": True}),
+], ids=["trailing-commas", "spaced-trailing-comma", "python-literals", "literals-in-strings"])
+def test_repairs_syntax(text, expected):
+    assert extract_json(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1, "b": {"c": [1, 2', {"a": 1, "b": {"c": [1, 2]}}),
+    ('{"a": 1, "b": "cut off mid sen', {"a": 1, "b": "cut off mid sen"}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('{"a": 1, "b"', {"a": 1}),
+    ('{"a": 1,', {"a": 1}),
+    ('[{"a": 1}, {"b": 2', [{"a": 1}, {"b": 2}]),
+], ids=["open-array", "open-string", "dangling-colon", "dangling-key", "dangling-comma", "list-of-objects"])
+def test_truncated_objects_are_closed(text, expected):
+    assert extract_json(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"quote": "He said “grow fast” twice"}', {"quote": "He said “grow fast” twice"}),
+    ('{“quote”: “He said \\"hi\\"”, "n": 1,}', {"quote": 'He said "hi"', "n": 1}),
+    ('{“title”: “Market size”}', {"title": "Market size"}),
+    ('{"quote": "a “b” c", "x": [1,]}', {"quote": "a “b” c", "x": [1]}),
+], ids=["curly-in-valid-json", "curly-delimiters", "curly-only", "curly-in-value-needing-repair"])
+def test_curly_quotes(text, expected):
+    assert extract_json(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"code": "```python\\nprint(1)\\n```"}', {"code": "```python\nprint(1)\n```"}),
+    ('{"code": "use ```json``` fences", "ok": true}', {"code": "use ```json``` fences", "ok": True}),
+    ('```json\n{"code": "```sh\\nls\\n```"}\n```', {"code": "```sh\nls\n```"}),
+    ('{"code": "```bash\\nls\\n```", "n": 1,}', {"code": "```bash\nls\n```", "n": 1}),
+], ids=["fence-in-value", "inline-fence-in-value", "fence-in-fenced-value", "fence-in-value-needing-repair"])
+def test_backticks_inside_strings(text, expected):
+    assert extract_json(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "```\njust prose\n```"])
+def test_no_json_raises(text):
+    with pytest.raises(ValueError):
+        extract_json(text)
+
+
+def test_strip_code_fences_leaves_plain_text():
+    assert strip_code_fences("  plain  ") == "plain"
+    assert strip_code_fences("Intro\n```yaml\na: 1\n```") == "a: 1"
@@ -0,0 +1,45 @@
+import pytest
+
+from services import registry
+
+
+class FlakyService:
+    attempts = 0
+
+    def __init__(self):
+        FlakyService.attempts += 1
+        if FlakyService.attempts == 1:
+            raise RuntimeError("knowledge base not mounted yet")
+
+
+@pytest.fixture
+def flaky_registry(monkeypatch):
+    FlakyService.attempts = 0
+    monkeypatch.setattr(registry, "SERVICE_FACTORIES", {"flaky": FlakyService})
+    monkeypatch.setattr(registry, "_instances", {})
+    monkeypatch.setattr(registry, "_build_seconds", {})
+    monkeypatch.setattr(registry, "_build_errors", {})
+    monkeypatch.setattr(registry, "_warm_up_state", {"status": "pending", "seconds": None})
+
+
+@pytest.mark.asyncio
+async def test_failed_warm_up_is_reported(flaky_registry):
+    await registry.warm_up()
+
+    status = registry.readiness()
+    assert status["ready"] is True
+    assert status["services"] == {"flaky": "failed"}
+    assert status["errors"] == {"flaky": "knowledge base not mounted yet"}
+
+
+@pytest.mark.asyncio
+async def test_successful_rebuild_clears_the_warm_up_error(flaky_registry):
+    await registry.warm_up()
+
+    service = await registry._get_or_create_async("flaky")
+
+    assert isinstance(service, FlakyService)
+    status = registry.readiness()
+    assert status["services"] == {"flaky": "ready"}
+    assert status["errors"] == {}
+    assert "flaky" in status["build_seconds"]
@@ -0,0 +1,187 @@
+import asyncio
+import random
+
+import pytest
+
+import utils.resilience as resilience
+from utils.resilience import CircuitBreaker, backoff_delay, hedged, is_retryable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, "time", clock)
+    return clock
+
+
+def test_circuit_breaker_cycle(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.is_open()
+    assert not breaker.allow()
+
+    clock.now += 29.9
+    assert not breaker.allow()
+    clock.now += 0.1
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # Only one trial call at a time
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+    assert breaker.stats() == {"state": "closed", "consecutive_failures": 0, "times_opened": 1}
+
+
+def test_failed_trial_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.times_opened == 2
+    assert not breaker.allow()
+
+
+def test_abandoned_trial_is_given_up_after_reset(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+
+    clock.now += 9
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_success_resets_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+class FakeCalls:
+    """Calls that block until released, so hedging never depends on real timing"""
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+        self.release = {}
+
+    async def __call__(self):
+        self.started += 1
+        number = self.started
+        self.release[number] = asyncio.get_running_loop().create_future()
+        try:
+            return await self.release[number]
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_hedge_starts_when_capacity_is_spare():
+    calls = FakeCalls()
+    task = asyncio.ensure_future(hedged(calls, hedge_after=0, can_hedge=lambda: True))
+    await settle()
+    assert calls.started == 2
+
+    calls.release[2].set_result("hedge")
+
+    assert await task == "hedge"
+    await settle()
+    assert calls.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_spare_capacity():
+    calls = FakeCalls()
+    task = asyncio.ensure_future(hedged(calls, hedge_after=0, can_hedge=lambda: False))
+    await settle()
+    assert calls.started == 1
+
+    calls.release[1].set_result("first")
+    assert await task == "first"
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_disabled():
+    calls = FakeCalls()
+    task = asyncio.ensure_future(hedged(calls, hedge_after=None))
+    await settle()
+    calls.release[1].set_result("first")
+    assert await task == "first"
+    assert calls.started == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_survives_one_failed_attempt():
+    calls = FakeCalls()
+    task = asyncio.ensure_future(hedged(calls, hedge_after=0))
+    await settle()
+
+    calls.release[1].set_exception(ConnectionError("reset"))
+    await settle()
+    assert not task.done()
+    calls.release[2].set_result("hedge")
+    assert await task == "hedge"
+
+
+@pytest.mark.asyncio
+async def test_hedge_raises_when_every_attempt_fails():
+    calls = FakeCalls()
+    task = asyncio.ensure_future(hedged(calls, hedge_after=0))
+    await settle()
+
+    calls.release[1].set_exception(ConnectionError("first"))
+    calls.release[2].set_exception(ConnectionError("second"))
+    with pytest.raises(ConnectionError):
+        await task
+
+
+@pytest.mark.parametrize("attempt, ceiling", [(0, 0.5), (1, 1.0), (2, 2.0), (3, 4.0), (10, 8.0)])
+def test_backoff_delay_jitter_bounds(monkeypatch, attempt, ceiling):
+    random.seed(attempt)
+    delays = [backoff_delay(attempt, base_seconds=0.5, max_seconds=8.0) for _ in range(200)]
+    assert all(0 <= delay <= ceiling for delay in delays)
+    assert len(set(delays)) > 1
+
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: (low, high))
+    assert backoff_delay(attempt, base_seconds=0.5, max_seconds=8.0) == (0, ceiling)
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+@pytest.mark.parametrize("error, expected", [
+    (ResourceExhausted("429"), True),
+    (asyncio.TimeoutError(), True),
+    (ConnectionResetError(), True),
+    (ValueError("bad request"), False),
+])
+def test_is_retryable(error, expected):
+    assert is_retryable(error) is expected
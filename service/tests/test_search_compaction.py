@@ -0,0 +1,85 @@
+import json
+
+from utils.search_compaction import compact_search_data
+
+
+def organic(link: str, snippet: str, title: str = "Result") -> dict:
+    return {"title": title, "link": link, "snippet": snippet, "position": 1, "sitelinks": [{"title": "x"}]}
+
+
+def test_context_keeps_scalar_fields():
+    data = {"company": "Acme", "year": 2024, "search": {"organic": []}}
+    assert compact_search_data(data)["context"] == {"company": "Acme", "year": 2024}
+
+
+def test_compact_items_drop_unused_fields():
+    data = {"search": {"organic": [organic("https://www.acme.com/about", "Acme makes rockets", "Acme")]}}
+
+    assert compact_search_data(data)["results"] == [
+        {"type": "web", "title": "Acme", "snippet": "Acme makes rockets", "source": "acme.com"}
+    ]
+
+
+def test_duplicate_urls_are_dropped_across_queries():
+    data = {
+        "first": {"organic": [organic("https://www.acme.com/news/", "Acme raised a round")]},
+        "second": {"organic": [organic("http://acme.com/news", "Acme closed its round")]},
+    }
+
+    results = compact_search_data(data)["results"]
+    assert [result["snippet"] for result in results] == ["Acme raised a round"]
+
+
+def test_duplicate_snippets_are_dropped_across_urls():
+    data = {
+        "first": {"news": [organic("https://a.com/story", "Acme Raises Seed Round")]},
+        "second": {"news": [organic("https://b.com/syndicated", "acme raises   seed round")]},
+    }
+
+    assert len(compact_search_data(data)["results"]) == 1
+
+
+def test_token_budget_is_respected():
+    items = [organic(f"https://site{index}.com", f"Snippet number {index} " + "word " * 40) for index in range(50)]
+    data = {"search": {"organic": items}}
+
+    results = compact_search_data(data, token_budget=200)["results"]
+    size = sum(len(json.dumps(result, ensure_ascii=False, separators=(",", ":"))) + 1 for result in results)
+
+    assert 0 < len(results) < 50
+    assert size <= 200 * 4
+    # Highest-ranked results survive
+    assert results[0]["snippet"].startswith("Snippet number 0 ")
+
+
+def test_long_snippets_are_cut_at_a_word():
+    data = {"search": {"organic": [organic("https://a.com", "growth " * 100)]}}
+
+    snippet = compact_search_data(data, snippet_chars=50)["results"][0]["snippet"]
+    assert len(snippet) <= 51
+    assert snippet.endswith("growth…")
+
+
+def test_snippets_with_figures_rank_higher():
+    data = {
+        "first": {"organic": [
+            organic("https://a.com", "The market is growing quickly"),
+            organic("https://b.com", "Analysts expect strong demand"),
+            organic("https://c.com", "The market will reach $4.2 billion"),
+        ]},
+        "second": {"organic": [organic("https://d.com", "Revenue grew 35% last year")]},
+    }
+
+    results = compact_search_data(data)["results"]
+    assert [result["source"] for result in results] == ["d.com", "a.com", "c.com", "b.com"]
+
+
+def test_answer_box_outranks_organic_results():
+    data = {"search": {
+        "organic": [organic("https://a.com", "General overview")],
+        "answerBox": {"title": "Market size", "answer": "About 12 billion dollars"},
+    }}
+
+    results = compact_search_data(data)["results"]
+    assert results[0]["type"] == "answer"
+    assert results[0]["snippet"] == "About 12 billion dollars"
@@ -0,0 +1,52 @@
+import pytest
+
+from utils.search_index import BM25Index, tokenize
+
+CORPUS = {
+    "vesting": "Founder vesting schedules usually run four years with a one year cliff.",
+    "safe": "A SAFE converts into equity at the next priced round. SAFE notes have no interest.",
+    "seed": "Seed rounds are often raised on a SAFE or a convertible note.",
+    "hiring": "Hire slowly and fire quickly; early employees shape the culture.",
+}
+
+
+@pytest.fixture
+def index() -> BM25Index:
+    index = BM25Index()
+    index.build(CORPUS)
+    return index
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("What is a SAFE, and how does it convert?") == ["safe", "convert"]
+
+
+def test_ranks_by_term_frequency_and_rarity(index):
+    results = index.search("SAFE equity")
+
+    assert [doc_id for doc_id, _ in results] == ["safe", "seed"]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_rare_term_outranks_common_term(index):
+    assert index.search("vesting SAFE", top_k=1)[0][0] == "vesting"
+
+
+@pytest.mark.parametrize("query", ["what is the", "how do I", "", "!!!"])
+def test_stopword_only_queries_return_nothing(index, query):
+    assert index.search(query) == []
+
+
+def test_top_k_truncates(index):
+    query = "SAFE vesting hire seed"
+    assert len(index.search(query, top_k=10)) == 4
+    assert len(index.search(query, top_k=2)) == 2
+    assert index.search(query, top_k=2) == index.search(query, top_k=10)[:2]
+    assert index.search(query, top_k=0) == []
+
+
+def test_empty_index_returns_nothing():
+    index = BM25Index()
+    index.build({})
+    assert len(index) == 0
+    assert index.search("safe") == []
@@ -0,0 +1,41 @@
+from utils.semantic_cache import SemanticCache, question_embedder, question_tokens
+
+
+def make_cache(**kwargs) -> SemanticCache:
+    return SemanticCache(question_embedder(), **kwargs)
+
+
+def test_question_tokens_stem_and_drop_filler():
+    assert question_tokens("Can you explain how vesting works?") == ["how", "vest", "work"]
+    assert question_tokens("how does vesting work") == ["how", "vest", "work"]
+
+
+def test_paraphrase_hits():
+    cache = make_cache()
+    cache.set("How does vesting work?", "scope", "answer")
+
+    assert cache.get("Can you tell me how vesting works", "scope") == "answer"
+    assert cache.get("how does vesting work", "other scope") is None
+
+
+def test_changed_meaning_word_misses():
+    cache = make_cache()
+    cache.set("Should I raise a SAFE before revenue?", "scope", "answer")
+
+    assert cache.get("Should I raise a SAFE after revenue?", "scope") is None
+    assert cache.get("Shouldn't I raise a SAFE before revenue?", "scope") is None
+    assert cache.get("Should I raise a SAFE before revenue", "scope") == "answer"
+
+
+def test_different_content_words_miss():
+    cache = make_cache()
+    cache.set("How do I price a seed round?", "scope", "answer")
+
+    assert cache.get("How do I price a series A round?", "scope") is None
+
+
+def test_expired_entries_miss():
+    cache = make_cache(ttl_seconds=-1)
+    cache.set("How does vesting work?", "scope", "answer")
+
+    assert cache.get("How does vesting work?", "scope") is None
@@ -0,0 +1,63 @@
+import pytest
+
+from config import settings
+from utils.text_chunker import chunk_text
+
+PARAGRAPHS = [
+    f"Paragraph {index} explains one part of raising a round. " * (index % 3 + 1)
+    for index in range(12)
+]
+DOCUMENT = "\n\n".join(paragraph.strip() for paragraph in PARAGRAPHS)
+
+
+def test_chunks_fit_the_configured_size():
+    chunks = chunk_text(DOCUMENT, "doc", settings.rag_chunk_size, settings.rag_chunk_overlap)
+
+    assert len(chunks) > 1
+    assert all(len(chunk["text"]) <= settings.rag_chunk_size for chunk in chunks)
+
+
+def test_offsets_round_trip_to_the_source():
+    chunks = chunk_text(DOCUMENT, "doc", 200, 60)
+
+    for number, chunk in enumerate(chunks):
+        assert chunk["id"] == f"doc#{number}"
+        assert chunk["source"] == "doc"
+        assert DOCUMENT[chunk["start"]:chunk["end"]] == chunk["text"]
+
+
+def test_boundaries_fall_on_paragraph_breaks():
+    chunks = chunk_text(DOCUMENT, "doc", 200, 60)
+    paragraph_starts = {0} | {index + 2 for index in range(len(DOCUMENT)) if DOCUMENT.startswith("\n\n", index)}
+    paragraph_ends = {index for index in range(len(DOCUMENT)) if DOCUMENT.startswith("\n\n", index)} | {len(DOCUMENT)}
+
+    for chunk in chunks:
+        assert chunk["start"] in paragraph_starts
+        assert chunk["end"] in paragraph_ends
+
+
+def test_consecutive_chunks_overlap():
+    chunks = chunk_text(DOCUMENT, "doc", 200, 60)
+
+    assert chunks[0]["start"] == 0
+    assert chunks[-1]["end"] == len(DOCUMENT)
+    for previous, current in zip(chunks, chunks[1:]):
+        # Each window starts inside the previous one but still moves forward
+        assert previous["start"] < current["start"] <= previous["end"] + 2
+    assert any(current["start"] < previous["end"] for previous, current in zip(chunks, chunks[1:]))
+
+
+def test_oversized_paragraph_is_split_at_whitespace():
+    paragraph = " ".join(f"word{index}" for index in range(300))
+    chunks = chunk_text(paragraph, "doc", 100, 20)
+
+    assert all(len(chunk["text"]) <= 100 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current["start"] < previous["end"]
+        assert paragraph[current["start"] - 1] == " "
+        assert paragraph[previous["end"]] == " "
+
+
+@pytest.mark.parametrize("text", ["", "   ", "\n\n\n"])
+def test_blank_text_has_no_chunks(text):
+    assert chunk_text(text, "doc") == []
@@ -0,0 +1,135 @@
+"""
+TTL + LRU cache with an optional SQLite tier shared between worker processes
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serialisable parts"""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form of free text used in cache keys"""
+    return " ".join((text or "").lower().split()).rstrip("?!. ")
+
+
+class TwoTierCache:
+    """
+    In-process LRU cache with per-entry expiry, optionally backed by SQLite.
+
+    The memory tier answers repeated lookups without I/O. When ``disk_path`` is set,
+    entries are also written to a SQLite database in WAL mode so every worker on the host
+    shares them; a memory miss that hits on disk is promoted into the memory tier.
+    Values must be JSON-serialisable.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl_seconds: float = 3600,
+                 disk_path: Optional[str] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        self._db = None
+        self._writes_since_purge = 0
+
+        if disk_path:
+            try:
+                Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(disk_path, timeout=5, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_entries "
+                    "(cache TEXT, key TEXT, value TEXT, expires_at REAL, PRIMARY KEY (cache, key))"
+                )
+            except Exception as e:
+                logger.error(f"Error opening {name} disk cache at {disk_path}, using memory only: {str(e)}")
+                self._db = None
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, expires_at FROM cache_entries WHERE cache = ? AND key = ? AND expires_at > ?",
+                        (self.name, key, now)
+                    ).fetchone()
+                except Exception as e:
+                    logger.warning(f"Error reading {self.name} disk cache: {str(e)}")
+                    row = None
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self._stats["disk_hits"] += 1
+                    CACHE_REQUESTS.inc(cache=self.name, result="disk_hit")
+                    return value
+
+            self._stats["misses"] += 1
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value in both tiers"""
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._stats["sets"] += 1
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache_entries (cache, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                        (self.name, key, json.dumps(value), expires_at)
+                    )
+                    self._writes_since_purge += 1
+                    if self._writes_since_purge >= 256:
+                        self._db.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+                        self._writes_since_purge = 0
+                except Exception as e:
+                    logger.warning(f"Error writing {self.name} disk cache: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round((self._stats["hits"] + self._stats["disk_hits"]) / lookups, 4) if lookups else 0.0,
+                "disk_backed": self._db is not None
+            }
@@ -0,0 +1,173 @@
+"""
+Dense vector retrieval backed by a contiguous float32 matrix persisted as .npy
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class HashingEmbedder:
+    """
+    Deterministic offline embedder using the hashing trick.
+
+    Unigrams and bigrams are hashed into a fixed number of signed buckets and the
+    result is L2-normalised, so cosine similarity is a plain dot product. No model
+    download is required and the same text always maps to the same vector.
+    """
+
+    def __init__(self, dimension: int = 384, tokenizer: Callable[[str], List[str]] = tokenize):
+        self.dimension = dimension
+        self.tokenizer = tokenizer
+        self.name = f"hashing-v1-{dimension}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = self.tokenizer(text)
+        return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts into an ``(n, dimension)`` float32 matrix"""
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                matrix[row, digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+
+class DenseVectorIndex:
+    """
+    Cosine-similarity index over a single ``(n, dim)`` float32 matrix.
+
+    Vectors are persisted under ``store_dir`` as an ``embeddings-<version>.npy`` matrix
+    plus a JSON manifest naming it and listing the content hashes of its rows. On
+    rebuild, rows whose text hash is already in the store are reused, so restarting over
+    an unchanged corpus embeds nothing; the matrix is then opened memory-mapped so
+    workers share the OS page cache.
+    """
+
+    def __init__(self, embedder: HashingEmbedder, store_dir: Optional[Path] = None):
+        self.embedder = embedder
+        self.store_dir = Path(store_dir) if store_dir else None
+        self.doc_ids: List[str] = []
+        self.matrix = np.zeros((0, embedder.dimension), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.store_dir / "embeddings.json"
+
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _load_store(self) -> Tuple[Dict[str, int], Optional[np.ndarray]]:
+        """Return the persisted ``content_hash -> row`` map and matrix, if compatible"""
+        if not self.store_dir or not self._manifest_path.exists():
+            return {}, None
+
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            hashes = manifest.get("hashes", [])
+            if manifest.get("embedder") != self.embedder.name or not manifest.get("matrix"):
+                logger.info("Embedding store is stale or incompatible, re-embedding")
+                return {}, None
+            matrix = np.load(self.store_dir / manifest["matrix"], mmap_mode="r")
+            if matrix.shape != (len(hashes), self.embedder.dimension):
+                logger.info("Embedding store is stale or incompatible, re-embedding")
+                return {}, None
+            return {content_hash: row for row, content_hash in enumerate(hashes)}, matrix
+        except Exception as e:
+            logger.error(f"Error loading embedding store: {str(e)}")
+            return {}, None
+
+    def _save_store(self, hashes: List[str], matrix: np.ndarray) -> Path:
+        """
+        Persist the matrix and manifest so concurrent workers never see a mismatched pair.
+
+        The matrix goes to a file named after the hash of its rows and is never rewritten;
+        replacing the manifest, which names that file, is the single commit point.
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        version = hashlib.sha1(json.dumps([self.embedder.name, hashes]).encode("utf-8")).hexdigest()[:16]
+        matrix_path = self.store_dir / f"embeddings-{version}.npy"
+
+        if not matrix_path.exists():
+            matrix_tmp = matrix_path.with_name(matrix_path.name + suffix)
+            with open(matrix_tmp, "wb") as f:
+                np.save(f, matrix)
+            os.replace(matrix_tmp, matrix_path)
+
+        manifest_tmp = self._manifest_path.with_name(self._manifest_path.name + suffix)
+        with open(manifest_tmp, "w", encoding="utf-8") as f:
+            json.dump({"embedder": self.embedder.name, "matrix": matrix_path.name, "hashes": hashes}, f)
+        os.replace(manifest_tmp, self._manifest_path)
+
+        # Matrices no manifest names any more; workers that still map one keep their open handle
+        for old_path in self.store_dir.glob("embeddings*.npy"):
+            if old_path != matrix_path:
+                try:
+                    old_path.unlink()
+                except OSError:
+                    pass
+        return matrix_path
+
+    def build(self, documents: Dict[str, str]) -> None:
+        """(Re)build the index from ``{doc_id: text}``, embedding only unseen texts"""
+        doc_ids = list(documents.keys())
+        hashes = [self._content_hash(documents[doc_id]) for doc_id in doc_ids]
+        stored_rows, stored_matrix = self._load_store()
+
+        missing = [i for i, content_hash in enumerate(hashes) if content_hash not in stored_rows]
+        if not missing and stored_matrix is not None and len(stored_rows) == len(hashes) \
+                and all(stored_rows[content_hash] == i for i, content_hash in enumerate(hashes)):
+            # Store matches the corpus row for row; serve it directly from the memory map
+            self.doc_ids = doc_ids
+            self.matrix = stored_matrix
+            logger.info(f"Loaded {len(doc_ids)} embeddings from {self.store_dir}")
+            return
+
+        matrix = np.empty((len(doc_ids), self.embedder.dimension), dtype=np.float32)
+        reused = [i for i, content_hash in enumerate(hashes) if content_hash in stored_rows]
+        if reused:
+            matrix[reused] = stored_matrix[[stored_rows[hashes[i]] for i in reused]]
+        if missing:
+            matrix[missing] = self.embedder.embed([documents[doc_ids[i]] for i in missing])
+        logger.info(f"Embedded {len(missing)} passages, reused {len(reused)} stored embeddings")
+
+        self.doc_ids = doc_ids
+        self.matrix = matrix
+        if self.store_dir and doc_ids:
+            try:
+                self.matrix = np.load(self._save_store(hashes, matrix), mmap_mode="r")
+            except Exception as e:
+                logger.error(f"Error persisting embedding store: {str(e)}")
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """Return up to ``top_k`` ``(doc_id, cosine_similarity)`` pairs with positive similarity"""
+        if not self.doc_ids or top_k <= 0:
+            return []
+
+        scores = self.matrix @ self.embedder.embed_one(query)
+        k = min(top_k, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [(self.doc_ids[i], float(scores[i])) for i in ranked if scores[i] > 0]
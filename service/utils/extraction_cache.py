@@ -0,0 +1,62 @@
+"""
+On-disk cache of extracted document text keyed by file content hash
+"""
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCache:
+    """
+    Stores extracted text and page offsets as one gzip-compressed JSON file per content hash.
+
+    Entries are keyed by the SHA-256 of the source file, so renamed or touched files still
+    hit, and every worker and restart pointing at the same directory shares the cache.
+    Writes go to a temporary file followed by an atomic rename, so concurrent workers never
+    read a partial entry.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self.cache_dir / f"{content_hash}.json.gz"
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return ``{"text", "page_offsets"}`` for a content hash, or None on a miss"""
+        path = self._entry_path(content_hash)
+        if not path.exists():
+            return None
+
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry.get("version") != self.VERSION:
+                return None
+            return entry
+        except Exception as e:
+            logger.warning(f"Discarding unreadable extraction cache entry {path.name}: {str(e)}")
+            return None
+
+    def put(self, content_hash: str, text: str, page_offsets: List[int]) -> None:
+        """Persist the extraction for a content hash"""
+        path = self._entry_path(content_hash)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        entry = {"version": self.VERSION, "text": text, "page_offsets": page_offsets}
+
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing extraction cache entry {path.name}: {str(e)}")
+            if tmp_path.exists():
+                tmp_path.unlink()
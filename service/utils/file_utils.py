@@ -1,9 +1,12 @@
-import PyPDF2
-import docx
 import os
+import time
+import signal
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from queue import Empty
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,31 +17,110 @@ class PDFProcessor:
     Utility class for processing PDF documents
     """
     
-    def extract_text(self, pdf_path: str) -> str:
+    def iter_pages(self, pdf_path: str, max_pages: Optional[int] = None,
+                   max_chars: Optional[int] = None) -> Iterator[Tuple[int, str]]:
         """
-        Extract text content from a PDF file
+        Lazily extract a PDF page by page
         
         Args:
             pdf_path: Path to the PDF file
+            max_pages: Stop after this many pages (default: all pages)
+            max_chars: Stop once this many characters have been yielded (default: no limit)
+            
+        Yields:
+            (page_number, text) tuples, with page numbers starting at 1
+        """
+        import PyPDF2
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            yield from self._iter_reader_pages(pdf_reader, max_pages, max_chars)
+    
+    def _iter_reader_pages(self, pdf_reader, max_pages: Optional[int] = None,
+                           max_chars: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        remaining = max_chars
+        for page_number, page in enumerate(pdf_reader.pages, start=1):
+            if max_pages is not None and page_number > max_pages:
+                return
+            if remaining is not None and remaining <= 0:
+                return
+            page_text = page.extract_text() or ""
+            if remaining is not None:
+                page_text = page_text[:remaining]
+                remaining -= len(page_text)
+            yield page_number, page_text
+    
+    def _reader_metadata(self, pdf_reader) -> Dict[str, Any]:
+        metadata = pdf_reader.metadata or {}
+        return {
+            "title": metadata.get("/Title", ""),
+            "author": metadata.get("/Author", ""),
+            "subject": metadata.get("/Subject", ""),
+            "creator": metadata.get("/Creator", ""),
+            "producer": metadata.get("/Producer", ""),
+            "creation_date": metadata.get("/CreationDate", ""),
+            "modification_date": metadata.get("/ModDate", ""),
+            "pages": len(pdf_reader.pages)
+        }
+    
+    def extract_document(self, pdf_path: str, max_pages: Optional[int] = None,
+                         max_chars: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Extract text, page offsets and metadata from a PDF in a single parse
+        
+        Args:
+            pdf_path: Path to the PDF file
+            max_pages: Stop after this many pages (default: all pages)
+            max_chars: Stop after this many characters of text (default: no limit)
             
         Returns:
-            Extracted text content
+            Dictionary with "text", per-page "page_offsets" and "metadata"
         """
         try:
-            text = ""
+            import PyPDF2
+            parts = []
+            page_offsets = []
+            position = 0
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
+                metadata = self._reader_metadata(pdf_reader)
                 
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
+                for _, page_text in self._iter_reader_pages(pdf_reader, max_pages, max_chars):
+                    page_offsets.append(position)
+                    parts.append(page_text)
+                    parts.append("\n")
+                    position += len(page_text) + 1
             
             logger.info(f"Successfully extracted text from {pdf_path}")
-            return text.strip()
+            return {"text": "".join(parts).rstrip(), "page_offsets": page_offsets, "metadata": metadata}
             
         except Exception as e:
             logger.error(f"Error extracting text from PDF {pdf_path}: {str(e)}")
-            return ""
+            return {"text": "", "page_offsets": [], "metadata": {}}
+    
+    def extract_text(self, pdf_path: str) -> str:
+        """
+        Extract text content from a PDF file
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Extracted text content
+        """
+        return self.extract_document(pdf_path)["text"].strip()
+    
+    def extract_text_with_offsets(self, pdf_path: str) -> Dict[str, Any]:
+        """
+        Extract text content from a PDF file along with the offset where each page starts
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Dictionary with the extracted "text" and per-page "page_offsets"
+        """
+        document = self.extract_document(pdf_path)
+        return {"text": document["text"], "page_offsets": document["page_offsets"]}
     
     def extract_metadata(self, pdf_path: str) -> Dict[str, Any]:
         """
@@ -51,24 +133,21 @@ class PDFProcessor:
             Dictionary containing metadata
         """
         try:
+            import PyPDF2
             with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                metadata = pdf_reader.metadata
-                
-                return {
-                    "title": metadata.get("/Title", ""),
-                    "author": metadata.get("/Author", ""),
-                    "subject": metadata.get("/Subject", ""),
-                    "creator": metadata.get("/Creator", ""),
-                    "producer": metadata.get("/Producer", ""),
-                    "creation_date": metadata.get("/CreationDate", ""),
-                    "modification_date": metadata.get("/ModDate", ""),
-                    "pages": len(pdf_reader.pages)
-                }
+                return self._reader_metadata(PyPDF2.PdfReader(file))
         except Exception as e:
             logger.error(f"Error extracting metadata from PDF {pdf_path}: {str(e)}")
             return {}
 
+def _process_document_in_worker(file_path: str) -> Dict[str, Any]:
+    """Entry point for pool workers; module level so it can be pickled"""
+    return DocumentProcessor().process_document(file_path)
+
+def _report_worker_pid(worker_pids: "multiprocessing.Queue") -> None:
+    """Pool initializer telling the parent which processes it may have to kill"""
+    worker_pids.put(os.getpid())
+
 class DocumentProcessor:
     """
     Utility class for processing various document formats
@@ -105,12 +184,11 @@ class DocumentProcessor:
     
     def _process_pdf(self, file_path: str) -> Dict[str, Any]:
         """Process PDF document"""
-        text = self.pdf_processor.extract_text(file_path)
-        metadata = self.pdf_processor.extract_metadata(file_path)
+        document = self.pdf_processor.extract_document(file_path)
         
         return {
-            "content": text,
-            "metadata": metadata,
+            "content": document["text"].strip(),
+            "metadata": document["metadata"],
             "file_type": "pdf",
             "file_path": file_path
         }
@@ -118,6 +196,7 @@ class DocumentProcessor:
     def _process_word(self, file_path: str) -> Dict[str, Any]:
         """Process Word document"""
         try:
+            import docx
             doc = docx.Document(file_path)
             text = ""
             
@@ -184,37 +263,147 @@ class DocumentProcessor:
                 "error": str(e)
             }
     
+    def _collect_documents(self, directory_path: str, file_extensions: Optional[List[str]]) -> List[str]:
+        """List document paths under a directory matching the given extensions"""
+        if file_extensions is None:
+            file_extensions = ['.pdf', '.docx', '.txt']
+        
+        directory = Path(directory_path)
+        if not directory.exists() or not directory.is_dir():
+            raise ValueError(f"Invalid directory path: {directory_path}")
+        
+        return [
+            str(file_path) for file_path in directory.rglob('*')
+            if file_path.is_file() and file_path.suffix.lower() in file_extensions
+        ]
+    
     def batch_process_documents(self, directory_path: str, 
-                              file_extensions: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+                              file_extensions: Optional[List[str]] = None,
+                              max_workers: Optional[int] = None,
+                              timeout: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Process multiple documents in a directory
         
         Args:
             directory_path: Path to the directory containing documents
             file_extensions: List of file extensions to process (default: ['.pdf', '.docx', '.txt'])
+            max_workers: Number of worker processes; above 1 enables parallel ingestion
+            timeout: Per-file timeout in seconds (parallel ingestion only)
             
         Returns:
             List of processed document dictionaries
         """
-        if file_extensions is None:
-            file_extensions = ['.pdf', '.docx', '.txt']
-        
-        directory = Path(directory_path)
-        if not directory.exists() or not directory.is_dir():
-            raise ValueError(f"Invalid directory path: {directory_path}")
+        if max_workers and max_workers > 1:
+            return list(self.iter_process_documents(directory_path, file_extensions, max_workers, timeout))
         
         processed_docs = []
         
-        for file_path in directory.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in file_extensions:
-                try:
-                    doc_data = self.process_document(str(file_path))
-                    processed_docs.append(doc_data)
-                    logger.info(f"Processed document: {file_path}")
-                except Exception as e:
-                    logger.error(f"Error processing document {file_path}: {str(e)}")
+        for file_path in self._collect_documents(directory_path, file_extensions):
+            try:
+                doc_data = self.process_document(file_path)
+                processed_docs.append(doc_data)
+                logger.info(f"Processed document: {file_path}")
+            except Exception as e:
+                logger.error(f"Error processing document {file_path}: {str(e)}")
         
         return processed_docs
+    
+    def iter_process_documents(self, directory_path: str,
+                               file_extensions: Optional[List[str]] = None,
+                               max_workers: Optional[int] = None,
+                               timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Process documents in a directory on a process pool, yielding results as they finish
+        
+        At most ``max_workers`` files are in flight at once, so memory stays bounded on large
+        corpora and a file's timeout starts roughly when a worker picks it up. Files that fail
+        or exceed ``timeout`` are logged and skipped, as in sequential processing.
+        
+        Args:
+            directory_path: Path to the directory containing documents
+            file_extensions: List of file extensions to process (default: ['.pdf', '.docx', '.txt'])
+            max_workers: Number of worker processes (default: CPU count)
+            timeout: Per-file timeout in seconds (default: no timeout)
+            
+        Yields:
+            Processed document dictionaries in completion order
+        """
+        file_paths = iter(self._collect_documents(directory_path, file_extensions))
+        max_workers = max_workers or os.cpu_count() or 1
+        worker_pids = multiprocessing.Queue()
+        
+        def new_pool() -> ProcessPoolExecutor:
+            return ProcessPoolExecutor(max_workers=max_workers, initializer=_report_worker_pid,
+                                       initargs=(worker_pids,))
+        
+        pool = new_pool()
+        pending = {}
+        
+        def submit(file_path: str) -> None:
+            pending[pool.submit(_process_document_in_worker, file_path)] = (file_path, time.monotonic())
+        
+        def fill() -> None:
+            while len(pending) < max_workers:
+                file_path = next(file_paths, None)
+                if file_path is None:
+                    return
+                submit(file_path)
+        
+        try:
+            fill()
+            while pending:
+                done, _ = wait(pending, timeout=1.0 if timeout else None, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    file_path, _ = pending.pop(future)
+                    try:
+                        doc_data = future.result()
+                        logger.info(f"Processed document: {file_path}")
+                    except Exception as e:
+                        logger.error(f"Error processing document {file_path}: {str(e)}")
+                        continue
+                    yield doc_data
+                
+                now = time.monotonic()
+                expired = [future for future, (_, started) in pending.items()
+                           if timeout and now - started > timeout]
+                if expired:
+                    for future in expired:
+                        file_path, _ = pending.pop(future)
+                        logger.error(f"Timed out processing document {file_path} after {timeout}s")
+                    
+                    # A running task can't be cancelled, so replace the pool and requeue
+                    # the files that were still in flight alongside the stuck one
+                    survivors = [file_path for file_path, _ in pending.values()]
+                    pending.clear()
+                    self._terminate_pool(pool, worker_pids)
+                    pool = new_pool()
+                    for file_path in survivors:
+                        submit(file_path)
+                
+                fill()
+        finally:
+            self._terminate_pool(pool, worker_pids)
+            worker_pids.close()
+    
+    @staticmethod
+    def _terminate_pool(pool: ProcessPoolExecutor, worker_pids: "multiprocessing.Queue") -> None:
+        """
+        Shut a pool down without waiting on workers that may be stuck
+        
+        ``worker_pids`` holds the PIDs reported by the pool's initializer; every pool
+        drains it when terminated, so it only ever holds the current pool's workers.
+        """
+        pool.shutdown(wait=False, cancel_futures=True)
+        while True:
+            try:
+                pid = worker_pids.get(timeout=0.1)
+            except Empty:
+                break
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass  # Already exited
 
 class FileValidator:
     """
@@ -0,0 +1,126 @@
+"""
+Local extraction and repair of JSON returned by language models.
+
+Models asked for JSON still wrap it in markdown fences, add a sentence before or after,
+leave trailing commas, use Python literals or stop mid-object when they hit the token
+limit. ``extract_json`` fixes those cases in-process, which is far cheaper than asking
+the model to reformat its own answer.
+"""
+import json
+import re
+from typing import Any, List
+
+# A fence opening the text, or one on a line of its own after some prose; never a
+# triple backtick inside a string value
+_LEADING_FENCE = re.compile(r"\A```[A-Za-z]*[ \t]*\n?(.*?)(?:\n?```\s*\Z|\Z)", re.S)
+_FENCED_BLOCK = re.compile(r"^```[A-Za-z]*[ \t]*\n(.*?)\n```[ \t]*$", re.S | re.M)
+_SMART_QUOTES = "“”"
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def strip_code_fences(text: str) -> str:
+    """
+    Contents of the markdown code block holding the answer, or the text itself.
+
+    A fence at the very start wins (also when the response was cut off before the
+    closing fence); otherwise the first block whose fences sit on their own lines.
+    """
+    text = text.strip()
+    match = _LEADING_FENCE.match(text) if text.startswith("```") else _FENCED_BLOCK.search(text)
+    return match.group(1).strip() if match else text
+
+
+def _repair(fragment: str) -> str:
+    """
+    Rewrite a JSON-like fragment starting at its first bracket: drop trailing commas,
+    map Python literals to JSON, treat curly quotes around keys and values as string
+    delimiters, stop after the outermost value and close whatever strings, arrays and
+    objects a truncated response left open. Text inside strings is left alone.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    smart_string = False
+    escaped = False
+    i = 0
+    while i < len(fragment):
+        char = fragment[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif smart_string and char in _SMART_QUOTES:
+                char = '"'
+                in_string = False
+            elif char == '"':
+                if smart_string:
+                    char = '\\"'
+                else:
+                    in_string = False
+            out.append(char)
+            i += 1
+            continue
+
+        if char == '"' or char in _SMART_QUOTES:
+            in_string = True
+            smart_string = char != '"'
+            char = '"'
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            # Trailing comma before a closing bracket
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                break
+            i += 1
+            continue
+        elif char.isalpha():
+            word = re.match(r"[A-Za-z]+", fragment[i:]).group(0)
+            out.append(_PYTHON_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        out.append(char)
+        i += 1
+
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    # Drop a dangling key or separator the response stopped at, then close what is open
+    tail = "".join(out).rstrip()
+    if stack and stack[-1] == "}":
+        tail = re.sub(r'(?<=[{,])\s*"[^"]*"\s*:?$', "", tail)
+    tail = re.sub(r"[,:]\s*$", "", tail)
+    return tail + "".join(reversed(stack))
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the JSON object or array in a model response, repairing it if needed.
+
+    Raises ``ValueError`` when the text holds nothing that can be read as JSON.
+    """
+    text = (text or "").strip()
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        pass
+
+    text = strip_code_fences(text)
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        pass
+
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        raise ValueError("No JSON object or array found in response")
+    return json.loads(_repair(text[min(starts):]), strict=False)
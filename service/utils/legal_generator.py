@@ -8,10 +8,7 @@ import base64
 import os
 from pathlib import Path
 from datetime import datetime
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+from utils.metrics import time_stage
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +18,8 @@ class LegalDocumentGenerator:
     """
     
     def __init__(self):
+        # reportlab is imported lazily so importing this module stays cheap at worker start
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         self.styles = getSampleStyleSheet()
         self.title_style = ParagraphStyle(
             'CustomTitle',
@@ -96,6 +95,8 @@ class LegalDocumentGenerator:
     
     def _add_document_header(self, story, content_structure: Dict[str, Any], doc_title: str, logo_path: Optional[str] = None):
         """Add document header with optional logo, title and generation date"""
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer, Image
 
         if logo_path:
             try:
@@ -174,6 +175,10 @@ class LegalDocumentGenerator:
     def _create_formatted_document(self, content_structure: Dict[str, Any], output_path: str, 
                                    title: str, logo_data: Optional[str] = None) -> str:
         """Template method for creating consistently formatted documents with optional logo"""
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        
         try:
             output_dir = os.path.dirname(output_path)
             if output_dir:
@@ -215,7 +220,8 @@ class LegalDocumentGenerator:
                                     story.append(Paragraph(subsection['content'], self.normal_style))
                                     story.append(Spacer(1, 8))
             
-            doc.build(story)
+            with time_stage("pdf_render"):
+                doc.build(story)
             
             if logo_path:
                 try:
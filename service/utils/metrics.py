@@ -0,0 +1,255 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are plain dicts keyed by label values behind a lock,
+so recording a sample costs a dict lookup and a few additions. ``render()`` produces
+the text format served at ``/metrics``.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from utils.tracing import trace_span
+
+# Seconds; spans sub-millisecond helpers up to multi-second LLM and Serper calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Longest prefix first; used to label requests before routing has happened
+ROUTER_PREFIXES = (
+    ("/api/v1/legal", "legal"),
+    ("/api/v1/market-research", "market_research"),
+    ("/api/v1/bill-parser", "bill_parser"),
+    ("/api/v1/fund-management", "fund_management"),
+    ("/api/v1/", "chatbot"),
+    ("/health", "health"),
+    ("/metrics", "metrics"),
+)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down, e.g. requests in flight"""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted((key, [list(series[0]), series[1], series[2]]) for key, series in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {round(total, 6)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "foundx_http_requests_total", "HTTP requests by router, method and status", ("router", "method", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "foundx_http_request_duration_seconds", "HTTP request latency including streamed bodies", ("router",)))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "foundx_http_requests_in_flight", "HTTP requests currently being served", ("router",)))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "foundx_stage_duration_seconds", "Latency of pipeline stages", ("stage",)))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "foundx_cache_requests_total", "Cache lookups by cache and result", ("cache", "result")))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "foundx_llm_tokens_total", "LLM tokens by direction (in/out) and endpoint", ("direction", "endpoint")))
+ERRORS = REGISTRY.register(Counter(
+    "foundx_errors_total", "Errors by component and type", ("component", "type")))
+
+
+def router_for_path(path: str) -> str:
+    """Router label for a request path"""
+    for prefix, router in ROUTER_PREFIXES:
+        if path.startswith(prefix):
+            return router
+    return "other"
+
+
+@contextmanager
+def time_stage(stage: str, **attributes: Any) -> Iterator[None]:
+    """
+    Record the duration of the enclosed block (also when it raises) under ``stage``.
+
+    Inside a traced request the block is also a span named after the stage, carrying
+    ``attributes``.
+    """
+    started = time.perf_counter()
+    with trace_span(stage, **attributes):
+        try:
+            yield
+        finally:
+            STAGE_LATENCY.observe(time.perf_counter() - started, stage=stage)
+
+
+def record_llm_tokens(endpoint: str, prompt_chars: int, output_chars: int, usage: Optional[object] = None) -> None:
+    """
+    Count tokens of one LLM exchange.
+
+    Uses the provider's ``usage_metadata`` when present and otherwise estimates four
+    characters per token, which is close enough for trend lines.
+    """
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or prompt_chars // 4
+    output_tokens = getattr(usage, "candidates_token_count", None) or output_chars // 4
+    LLM_TOKENS.inc(prompt_tokens, direction="in", endpoint=endpoint)
+    LLM_TOKENS.inc(output_tokens, direction="out", endpoint=endpoint)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware counting requests, in-flight requests and latency per router.
+
+    Unlike ``BaseHTTPMiddleware`` it doesn't buffer or re-wrap the response, so streamed
+    responses keep flowing and their full duration is measured.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        router = router_for_path(scope.get("path", ""))
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(router=router)
+        started = time.perf_counter()
+        error_type = None
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            error_type = type(e).__name__
+            raise
+        finally:
+            HTTP_IN_FLIGHT.dec(router=router)
+            HTTP_LATENCY.observe(time.perf_counter() - started, router=router)
+            HTTP_REQUESTS.inc(router=router, method=scope.get("method", ""), status=str(status["code"]))
+            if error_type is None and status["code"] >= 400:
+                error_type = f"status_{status['code']}"
+            if error_type is not None:
+                ERRORS.inc(component="http", type=error_type)
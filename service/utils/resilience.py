@@ -0,0 +1,134 @@
+"""
+Deadlines, jittered retries, hedging and circuit breaking for upstream calls
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Exception class names (google.api_core, aiohttp, builtins) worth retrying
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "Aborted", "TimeoutError", "ConnectionError",
+    "ConnectionResetError", "ServerDisconnectedError", "ClientConnectorError",
+}
+
+
+class LLMUnavailableError(Exception):
+    """The model provider is unconfigured, degraded or did not answer within the deadline"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient (rate limiting, 5xx, timeouts, dropped connections)"""
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+def backoff_delay(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Full-jitter exponential backoff for the given zero-based retry attempt"""
+    return random.uniform(0, min(max_seconds, base_seconds * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float, min_samples: int = 20) -> Optional[float]:
+        """Latency at ``fraction`` (e.g. 0.95), or None until enough samples were seen"""
+        if len(self.samples) < min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Fails fast after ``failure_threshold`` consecutive failures.
+
+    While open, calls are rejected for ``reset_seconds``; then a single trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now"""
+        if self.state == "closed":
+            return True
+        now = time.monotonic()
+        if self.state == "open" and now - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            self._trial_started = None
+        # A trial that never reported back (e.g. cancelled) is given up after reset_seconds
+        if self.state == "half_open" and (self._trial_started is None or now - self._trial_started >= self.reset_seconds):
+            self._trial_started = now
+            return True
+        return False
+
+    def is_open(self) -> bool:
+        return self.state == "open" and time.monotonic() - self.opened_at < self.reset_seconds
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_started = None
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened
+        }
+
+
+async def hedged(make_call: Callable[[], Awaitable[Any]], hedge_after: Optional[float],
+                 can_hedge: Callable[[], bool] = lambda: True) -> Any:
+    """
+    Await ``make_call()``; if it hasn't finished after ``hedge_after`` seconds and
+    ``can_hedge()`` allows it, start a second identical call and return whichever
+    succeeds first, cancelling the other.
+    """
+    tasks = [asyncio.ensure_future(make_call())]
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done and can_hedge():
+                tasks.append(asyncio.ensure_future(make_call()))
+
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # Cancels the losing hedge, or every attempt if the caller was cancelled
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()  # Mark a failed loser's error as retrieved
@@ -0,0 +1,124 @@
+"""
+Compaction of Serper responses before they are sent to the model.
+
+Raw responses carry sitelinks, thumbnails, positions and the same story syndicated
+under several URLs, and market research merges up to eight of them. ``compact_search_data``
+keeps only the fields worth reading (title, snippet, date, source), drops repeated URLs
+and snippets across all queries, ranks what is left and stops at a token budget.
+"""
+import json
+import re
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib.parse import urlsplit
+
+# Result lists in a Serper response, the type they are reported as and a base weight
+RESULT_SECTIONS = (
+    ("answerBox", "answer", 3.0),
+    ("knowledgeGraph", "fact", 3.0),
+    ("organic", "web", 1.0),
+    ("news", "news", 1.0),
+    ("peopleAlsoAsk", "question", 0.5),
+    ("images", "image", 0.2),
+)
+
+# Snippets quoting figures (sizes, growth rates, prices, years) are what the analysis needs most
+_FIGURE = re.compile(r"(\d[\d,.]*\s*(%|percent|[kmb]n?\b|million|billion|trillion))|([$€£¥]\s?\d)|\b(19|20)\d{2}\b", re.I)
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def _source_of(item: Dict[str, Any]) -> str:
+    if item.get("source"):
+        return str(item["source"])
+    host = urlsplit(item.get("link") or "").netloc
+    return host[4:] if host.startswith("www.") else host
+
+
+def _iter_responses(data: Any) -> Iterator[Dict[str, Any]]:
+    """Serper responses anywhere in the (possibly nested) data handed to the prompt"""
+    if isinstance(data, dict):
+        if any(section in data for section, _, _ in RESULT_SECTIONS):
+            yield data
+            return
+        for value in data.values():
+            yield from _iter_responses(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _iter_responses(value)
+
+
+def _candidates(response: Dict[str, Any], snippet_chars: int) -> Iterator[Tuple[float, Dict[str, Any], str]]:
+    """``(score, compact item, url)`` for every result in one Serper response"""
+    for section, kind, weight in RESULT_SECTIONS:
+        items = response.get(section)
+        if isinstance(items, dict):
+            items = [items]
+        if not isinstance(items, list):
+            continue
+        for rank, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            snippet = item.get("snippet") or item.get("answer") or item.get("description") or ""
+            title = item.get("title") or item.get("question") or ""
+            if not (title or snippet):
+                continue
+            snippet = " ".join(str(snippet).split())
+            if len(snippet) > snippet_chars:
+                snippet = snippet[:snippet_chars].rsplit(" ", 1)[0] + "…"
+
+            compact = {"type": kind, "title": str(title)}
+            if snippet:
+                compact["snippet"] = snippet
+            if item.get("date"):
+                compact["date"] = str(item["date"])
+            source = _source_of(item)
+            if source:
+                compact["source"] = source
+
+            # Reciprocal rank keeps every query's top results near the top of the merged list
+            score = weight / (rank + 1) + (0.5 if _FIGURE.search(snippet) else 0.0)
+            yield score, compact, item.get("link") or item.get("imageUrl") or ""
+
+
+def compact_search_data(data: Dict[str, Any], token_budget: int = 2500, snippet_chars: int = 300) -> Dict[str, Any]:
+    """
+    Reduce the data for an analysis prompt to its most useful search results.
+
+    Top-level scalar fields (company, industry, time period...) are kept as ``context``.
+    Results are deduplicated by URL and by snippet across every query, ordered by
+    score and added until their compact JSON reaches ``token_budget`` tokens (estimated
+    at four characters per token).
+    """
+    context = {key: value for key, value in data.items() if isinstance(value, (str, int, float, bool))}
+
+    candidates = []
+    for response in _iter_responses(data):
+        candidates.extend(_candidates(response, snippet_chars))
+    # Stable sort: ties keep query order
+    candidates.sort(key=lambda candidate: -candidate[0])
+
+    results: List[Dict[str, Any]] = []
+    seen_urls = set()
+    seen_snippets = set()
+    char_budget = token_budget * 4
+    used = 0
+    for _, compact, url in candidates:
+        url_key = _normalize_url(url) if url else None
+        snippet_key = compact.get("snippet", "").lower() or None
+        if (url_key and url_key in seen_urls) or (snippet_key and snippet_key in seen_snippets):
+            continue
+        size = len(json.dumps(compact, ensure_ascii=False, separators=(",", ":"))) + 1
+        if used + size > char_budget:
+            continue
+        used += size
+        results.append(compact)
+        if url_key:
+            seen_urls.add(url_key)
+        if snippet_key:
+            seen_snippets.add(snippet_key)
+
+    return {"context": context, "results": results}
@@ -0,0 +1,90 @@
+"""
+In-memory inverted index with BM25 ranking for knowledge base retrieval
+"""
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics and drop stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a tokenized inverted index.
+
+    The index is built once from a ``{doc_id: text}`` mapping; queries only touch the
+    postings lists of their own terms, so lookup cost is independent of document length.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.doc_lengths: List[int] = []
+        self.avg_doc_length = 0.0
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.idf: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def build(self, documents: Dict[str, str]) -> None:
+        """(Re)build the index from a mapping of document id to text"""
+        doc_ids: List[str] = []
+        doc_lengths: List[int] = []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+
+        for doc_index, (doc_id, text) in enumerate(documents.items()):
+            term_counts = Counter(tokenize(text))
+            doc_ids.append(doc_id)
+            doc_lengths.append(sum(term_counts.values()))
+            for term, frequency in term_counts.items():
+                postings.setdefault(term, []).append((doc_index, frequency))
+
+        total_docs = len(doc_ids)
+        self.idf = {
+            term: math.log(1 + (total_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in postings.items()
+        }
+        self.doc_ids = doc_ids
+        self.doc_lengths = doc_lengths
+        self.avg_doc_length = (sum(doc_lengths) / total_docs) if total_docs else 0.0
+        self.postings = postings
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """Return up to ``top_k`` ``(doc_id, score)`` pairs ranked by BM25 score"""
+        if not self.doc_ids or top_k <= 0:
+            return []
+
+        k1, b = self.k1, self.b
+        avg_length = self.avg_doc_length or 1.0
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf[term]
+            for doc_index, frequency in plist:
+                length_norm = k1 * (1 - b + b * self.doc_lengths[doc_index] / avg_length)
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * frequency * (k1 + 1) / (frequency + length_norm)
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self.doc_ids[doc_index], score) for doc_index, score in best]
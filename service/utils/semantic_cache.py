@@ -0,0 +1,146 @@
+"""
+Similarity-based answer cache for paraphrased questions
+"""
+import itertools
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from utils.embeddings import HashingEmbedder
+from utils.metrics import CACHE_REQUESTS
+from utils.search_index import STOPWORDS, TOKEN_PATTERN
+
+# Stopwords for retrieval that still change what a question asks: negations, question
+# words, time and order, comparisons and modality ("should I" vs "can I")
+MEANING_WORDS = frozenset("""
+not no nor never without against what when where which who whom why how before after during
+until while since then now again once more most less least few only all any same other over
+under above below should could would can will must may might
+""".split())
+
+# Request phrasing that asks for an answer without changing the question
+FILLER_WORDS = frozenset("explain describe tell please".split())
+
+_NEGATED_CONTRACTION = re.compile(r"n[’']t\b")
+_POLITE_REQUEST = re.compile(r"\b(?:can|could|would|will)\s+you\b")
+_SUFFIXES = ("ies", "ing", "ed", "es", "s")
+
+
+def _stem(token: str) -> str:
+    """Crude suffix stripping: "works", "worked" and "working" all become work"""
+    if token in MEANING_WORDS or token.endswith("ss"):
+        return token
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)] + ("y" if suffix == "ies" else "")
+    return token[:-1] if token.endswith("e") and len(token) > 4 else token
+
+
+def question_tokens(text: str) -> List[str]:
+    """
+    Stemmed tokens used to compare questions: the retrieval tokens plus ``MEANING_WORDS``,
+    minus ``FILLER_WORDS`` and "can you"/"could you" requests.
+
+    "don't"/"isn't" contribute "not", so "Should I raise a SAFE?" and "Shouldn't I
+    raise a SAFE?" never look alike.
+    """
+    text = _NEGATED_CONTRACTION.sub(" not", text.lower())
+    text = _POLITE_REQUEST.sub(" ", text)
+    return [_stem(token) for token in TOKEN_PATTERN.findall(text)
+            if (token not in STOPWORDS or token in MEANING_WORDS) and token not in FILLER_WORDS]
+
+
+def meaning_terms(text: str) -> frozenset:
+    """The ``MEANING_WORDS`` of a question, which two questions must share to match"""
+    return frozenset(token for token in question_tokens(text) if token in MEANING_WORDS)
+
+
+def question_embedder(dimension: int = 384) -> HashingEmbedder:
+    """Hashing embedder over ``question_tokens`` for the semantic cache"""
+    return HashingEmbedder(dimension, tokenizer=question_tokens)
+
+
+class SemanticCache:
+    """
+    Answer cache matched by cosine similarity of question embeddings.
+
+    Question vectors live in one preallocated ``(max_entries, dim)`` float32 matrix, so a
+    lookup is a single matrix-vector product. An entry only matches when its ``scope`` is
+    identical (callers pass a key of the retrieved passages and any other prompt inputs),
+    so a paraphrase is never answered from a different context. It must also share the
+    same ``meaning_terms``: a hashed vector barely moves when "before" becomes "after" or
+    "not" is added, so those words are compared exactly and similarity only judges the
+    remaining content words. When full, the least recently used entry is overwritten.
+
+    The embedder should tokenize with ``question_tokens``; ``question_embedder`` builds one.
+    """
+
+    def __init__(self, embedder: HashingEmbedder, max_entries: int = 512,
+                 threshold: float = 0.9, ttl_seconds: float = 3600):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.matrix = np.zeros((max_entries, embedder.dimension), dtype=np.float32)
+        self.scopes = [None] * max_entries
+        self.terms = [None] * max_entries
+        self.answers = [None] * max_entries
+        self.expires_at = np.zeros(max_entries, dtype=np.float64)
+        self.last_used = np.zeros(max_entries, dtype=np.int64)
+        self.size = 0
+        self._clock = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+    def get(self, question: str, scope: str) -> Optional[Any]:
+        """Return the answer of the most similar live question in ``scope``, if above the threshold"""
+        vector = self.embedder.embed_one(question)
+        terms = meaning_terms(question)
+        now = time.time()
+        with self._lock:
+            if self.size:
+                scores = self.matrix[:self.size] @ vector
+                for slot in np.argsort(-scores):
+                    if scores[slot] < self.threshold:
+                        break
+                    if self.scopes[slot] == scope and self.terms[slot] == terms and self.expires_at[slot] > now:
+                        self.last_used[slot] = next(self._clock)
+                        self._stats["hits"] += 1
+                        CACHE_REQUESTS.inc(cache="semantic", result="hit")
+                        return self.answers[slot]
+            self._stats["misses"] += 1
+            CACHE_REQUESTS.inc(cache="semantic", result="miss")
+            return None
+
+    def set(self, question: str, scope: str, answer: Any) -> None:
+        """Remember an answer, overwriting the least recently used entry when full"""
+        vector = self.embedder.embed_one(question)
+        with self._lock:
+            if self.size < self.max_entries:
+                slot = self.size
+                self.size += 1
+            else:
+                slot = int(np.argmin(self.last_used))
+                self._stats["evictions"] += 1
+            self.matrix[slot] = vector
+            self.scopes[slot] = scope
+            self.terms[slot] = meaning_terms(question)
+            self.answers[slot] = answer
+            self.expires_at[slot] = time.time() + self.ttl_seconds
+            self.last_used[slot] = next(self._clock)
+            self._stats["sets"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": self.size,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,46 @@
+"""
+Server-sent events helpers for streaming endpoints
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    # Stop nginx-style proxies from buffering the stream and hiding the first tokens
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Encode one SSE frame; ``data`` is JSON-encoded so newlines in text stay on one line"""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _guarded(first_frame: str, events: AsyncIterator[str]) -> AsyncIterator[str]:
+    yield first_frame
+    try:
+        async for frame in events:
+            yield frame
+    except Exception as e:
+        # Headers are already sent, so failures are reported in-band
+        logger.error(f"Error while streaming response: {str(e)}")
+        yield format_sse({"detail": str(e)}, event="error")
+
+
+async def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """
+    Wrap an async iterator of SSE frames in a streaming HTTP response.
+
+    The first frame is produced before the response starts, so failures that happen
+    before any output (e.g. the model being unavailable) propagate to the endpoint and
+    can still be turned into a proper HTTP status.
+    """
+    first_frame = await events.__anext__()
+    return StreamingResponse(_guarded(first_frame, events), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,99 @@
+"""
+Split documents into overlapping, paragraph-aligned passages for retrieval
+"""
+import re
+from typing import Any, Dict, Iterator, List, Tuple
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def _paragraph_spans(text: str, chunk_size: int, overlap: int) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) offsets of non-blank paragraphs, hard-splitting oversized ones"""
+    position = 0
+    for match in list(PARAGRAPH_BREAK.finditer(text)) + [None]:
+        end = match.start() if match else len(text)
+        start = position
+        position = match.end() if match else len(text)
+
+        # Trim surrounding whitespace while keeping offsets into the original text
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start >= end:
+            continue
+
+        if end - start <= chunk_size:
+            yield start, end
+            continue
+
+        step = max(1, chunk_size - overlap)
+        piece_start = start
+        while piece_start < end:
+            piece_end = min(end, piece_start + chunk_size)
+            if piece_end < end:
+                # Prefer to cut at whitespace rather than mid-word
+                cut = text.rfind(" ", piece_start + step, piece_end)
+                if cut > piece_start:
+                    piece_end = cut
+            yield piece_start, piece_end
+            if piece_end >= end:
+                break
+            piece_start = max(piece_start + 1, piece_end - overlap)
+            if not text[piece_start - 1].isspace():
+                boundary = text.find(" ", piece_start, piece_end)
+                if boundary != -1:
+                    piece_start = boundary
+            while piece_start < end and text[piece_start].isspace():
+                piece_start += 1
+
+
+def chunk_text(text: str, source: str, chunk_size: int = 800, overlap: int = 150) -> List[Dict[str, Any]]:
+    """
+    Group paragraphs into windows of at most ``chunk_size`` characters.
+
+    Consecutive windows share the trailing paragraphs that fall within ``overlap``
+    characters of the previous window's end. Each chunk records its ``start``/``end``
+    offsets into ``text`` so a passage can always be traced back to its source file.
+
+    Args:
+        text: Full document text
+        source: Identifier of the source document
+        chunk_size: Maximum number of characters per chunk
+        overlap: Number of trailing characters repeated at the start of the next chunk
+
+    Returns:
+        List of chunk dictionaries with id, source, text, start and end
+    """
+    spans = list(_paragraph_spans(text, chunk_size, overlap))
+    chunks = []
+    index = 0
+
+    while index < len(spans):
+        start, end = spans[index]
+        last = index
+        while last + 1 < len(spans) and spans[last + 1][1] - start <= chunk_size:
+            last += 1
+            end = spans[last][1]
+
+        chunks.append({
+            "id": f"{source}#{len(chunks)}",
+            "source": source,
+            "text": text[start:end],
+            "start": start,
+            "end": end
+        })
+
+        if last + 1 >= len(spans):
+            break
+
+        # Step back over paragraphs within the overlap, as long as the next window
+        # can still reach past this one
+        next_index = last + 1
+        while (next_index - 1 > index
+               and end - spans[next_index - 1][0] <= overlap
+               and spans[last + 1][1] - spans[next_index - 1][0] <= chunk_size):
+            next_index -= 1
+        index = next_index
+
+    return chunks
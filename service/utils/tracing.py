@@ -0,0 +1,350 @@
+"""
+Lightweight request tracing with spans propagated through async calls.
+
+The current span lives in a ``ContextVar``; asyncio copies the context into every task
+it creates, so the coroutines of an ``asyncio.gather`` become children of the span
+that was current when the gather started, and concurrent siblings never see each
+other's spans. Outside a request (no root span) every helper is a no-op.
+
+Finished traces can be exported as JSON lines to a local file or as OTLP/HTTP JSON to
+a collector, from a background thread so the event loop never blocks on export.
+"""
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Spans beyond this many per trace are dropped, bounding memory for runaway fan-outs
+MAX_SPANS_PER_TRACE = 1000
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ("trace", "name", "span_id", "parent", "attributes", "children", "started", "ended", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        # Random high bits keep ids unique across workers when traces are merged in a collector
+        self.span_id = f"{trace.span_id_prefix}{next(_span_ids) & 0xffffffff:08x}"
+        self.parent = parent
+        self.attributes = attributes
+        self.children: List[Span] = []
+        self.started = time.perf_counter()
+        self.ended: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.ended is None:
+            self.ended = time.perf_counter()
+            if error is not None:
+                self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return round((self.ended - self.started) * 1000, 3) if self.ended is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Span tree rooted at this span, with start offsets relative to the trace start"""
+        node = {
+            "name": self.name,
+            "start_ms": round((self.started - self.trace.root.started) * 1000, 3),
+            "duration_ms": self.duration_ms
+        }
+        if self.attributes:
+            node["attributes"] = self.attributes
+        if self.error:
+            node["error"] = self.error
+        if self.children:
+            node["children"] = [child.to_dict() for child in sorted(self.children, key=lambda s: s.started)]
+        return node
+
+
+class Trace:
+    """All spans of one request, rooted at the span opened by ``TracingMiddleware``"""
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = os.urandom(16).hex()
+        self.span_id_prefix = os.urandom(4).hex()
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self.root = self._add(name, None, attributes or {})
+
+    def _add(self, name: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Optional[Span]:
+        if len(self.spans) >= MAX_SPANS_PER_TRACE:
+            return None
+        span = Span(self, name, parent, attributes)
+        self.spans.append(span)
+        if parent is not None:
+            parent.children.append(span)
+        return span
+
+    def wall_time(self, perf_time: float) -> float:
+        return self.started_at + (perf_time - self.root.started)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "duration_ms": self.root.duration_ms,
+            "span_count": len(self.spans),
+            "root": self.root.to_dict()
+        }
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """
+    Create a child of the current span without making it current; the caller ends it.
+
+    Meant for async generators, which may be resumed from a different task than the one
+    that started them and so must not leave context changes behind.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return parent.trace._add(name, parent, attributes)
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Run the enclosed block in a child span of the current span (no-op outside a trace)"""
+    span = start_span(name, **attributes)
+    if span is None:
+        yield None
+        return
+
+    token = _current_span.set(span)
+    error = None
+    try:
+        yield span
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        span.end(error)
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Exited from another context than it was entered in
+            _current_span.set(span.parent)
+
+
+def annotate(**attributes: Any) -> None:
+    """Add attributes to the current span, if any"""
+    span = _current_span.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace.trace_id if span is not None else None
+
+
+class JsonlExporter:
+    """Appends one JSON line per trace (the full span tree) to a local file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, trace: Trace) -> None:
+        record = {"started_at": trace.started_at, **trace.to_dict()}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter:
+    """Posts traces in the OTLP/HTTP JSON encoding to a collector's ``/v1/traces`` endpoint"""
+
+    def __init__(self, endpoint: str, service_name: str = "foundx-genai-service", timeout_seconds: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout_seconds = timeout_seconds
+
+    def _span(self, span: Span) -> Dict[str, Any]:
+        ended = span.ended if span.ended is not None else time.perf_counter()
+        otlp_span = {
+            "traceId": span.trace.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 2 if span.parent is None else 1,  # SERVER for the request, INTERNAL otherwise
+            "startTimeUnixNano": str(int(span.trace.wall_time(span.started) * 1e9)),
+            "endTimeUnixNano": str(int(span.trace.wall_time(ended) * 1e9)),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+        }
+        if span.parent is not None:
+            otlp_span["parentSpanId"] = span.parent.span_id
+        return otlp_span
+
+    def export(self, trace: Trace) -> None:
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "foundx.tracing"}, "spans": [self._span(span) for span in trace.spans]}]
+        }]}
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout_seconds):
+            pass
+
+
+class BackgroundExporter:
+    """Exports finished traces from a daemon thread; drops traces when the queue is full"""
+
+    def __init__(self, exporter: Any, max_queue: int = 1000):
+        self.exporter = exporter
+        self.dropped = 0
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            trace = self._queue.get()
+            try:
+                self.exporter.export(trace)
+            except Exception as e:
+                logger.warning(f"Error exporting trace {trace.trace_id}: {str(e)}")
+
+
+def build_exporter(kind: str, path: str, otlp_endpoint: str) -> Optional[BackgroundExporter]:
+    """Exporter for the ``tracing_exporter`` setting: "" (none), "jsonl" or "otlp" """
+    if kind == "jsonl":
+        return BackgroundExporter(JsonlExporter(path))
+    if kind == "otlp":
+        return BackgroundExporter(OtlpHttpExporter(otlp_endpoint))
+    if kind:
+        logger.warning(f"Unknown tracing exporter '{kind}', traces will not be exported")
+    return None
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening the root span of every HTTP request.
+
+    Every response carries an ``X-Trace-Id`` header. When the request sends
+    ``X-Debug-Trace: 1`` (and ``debug_header`` is enabled) the span tree is returned
+    inline: under a ``_trace`` key for JSON object bodies, as a final ``trace`` event for
+    server-sent event streams, and in an ``X-Debug-Trace`` response header otherwise.
+    """
+
+    def __init__(self, app, exporter: Optional[BackgroundExporter] = None,
+                 sample_rate: float = 1.0, debug_header: bool = False):
+        self.app = app
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.debug_header = debug_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        debug = self.debug_header and any(
+            name == b"x-debug-trace" and value.lower() in (b"1", b"true") for name, value in scope.get("headers", [])
+        )
+        trace = Trace(f"{scope.get('method', '')} {scope.get('path', '')}", {
+            "http.method": scope.get("method", ""), "http.path": scope.get("path", "")
+        })
+        root = trace.root
+        state = {"start": None, "body": [], "kind": None}
+
+        async def send_traced(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                headers = list(message.get("headers", [])) + [(b"x-trace-id", trace.trace_id.encode())]
+                message = {**message, "headers": headers}
+                if not debug:
+                    await send(message)
+                    return
+                content_type = dict(headers).get(b"content-type", b"")
+                if content_type.startswith(b"application/json"):
+                    state["kind"] = "json"
+                    state["start"] = message
+                    return
+                if content_type.startswith(b"text/event-stream"):
+                    state["kind"] = "sse"
+                    await send(message)
+                    return
+                root.end()
+                tree = json.dumps(trace.to_dict(), separators=(",", ":"), default=str)
+                await send({**message, "headers": headers + [(b"x-debug-trace", tree.encode())]})
+                return
+
+            if message["type"] == "http.response.body" and state["kind"] is not None:
+                more_body = message.get("more_body", False)
+                if state["kind"] == "json":
+                    state["body"].append(message.get("body", b""))
+                    if not more_body:
+                        await self._send_json_with_trace(send, state, trace)
+                    return
+                if not more_body:
+                    await send({**message, "more_body": True})
+                    root.end()
+                    frame = f"event: trace\ndata: {json.dumps(trace.to_dict(), default=str)}\n\n"
+                    await send({"type": "http.response.body", "body": frame.encode(), "more_body": False})
+                    return
+            await send(message)
+
+        token = _current_span.set(root)
+        error = None
+        try:
+            await self.app(scope, receive, send_traced)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            root.end(error)
+            _current_span.reset(token)
+            if self.exporter is not None and (debug or random.random() < self.sample_rate):
+                self.exporter.submit(trace)
+
+    @staticmethod
+    async def _send_json_with_trace(send, state: Dict[str, Any], trace: Trace) -> None:
+        body = b"".join(state["body"])
+        trace.root.end()
+        try:
+            payload = json.loads(body)
+            if isinstance(payload, dict):
+                payload["_trace"] = trace.to_dict()
+                body = json.dumps(payload, default=str).encode("utf-8")
+        except ValueError:
+            pass
+        headers = [(name, value) for name, value in state["start"]["headers"] if name != b"content-length"]
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({**state["start"], "headers": headers})
+        await send({"type": "http.response.body", "body": body, "more_body": False})